@@ -6,19 +6,26 @@ Probly implements random variables and methods to aid in their manipulation and
 from .core import *
 from .distr import *
 from .lib import *
+from .process import *
 
 __all__ = []
 
-__all__ += ['seed']
+__all__ += ['seed', 'set_dtype']
+__all__ += ['ThreadedEvaluator', 'BatchEvaluator', 'CachedEvaluator']
+__all__ += ['ParallelSampler']
+__all__ += ['Executor', 'InProcessExecutor', 'ThreadExecutor', 'ProcessExecutor', 'SocketExecutor', 'serve']
+__all__ += ['Kernel', 'jit']
+__all__ += ['grad_mean']
 
 __all__ += ['array']
-__all__ += ['const', 'hist', 'lift', 'iid']
-__all__ += ['mean', 'variance', 'cdf']
+__all__ += ['const', 'hist', 'lift', 'iid', 'iid_sum', 'footprint']
+__all__ += ['mean', 'variance', 'cdf', 'quantile', 'kde', 'summarize']
+__all__ += ['Reducer', 'Sum', 'Moments', 'MinMax', 'Histogram', 'ECDF', 'Quantiles', 'reduce']
 
 # Discrete random variables
 __all__ == ['Distribution', 'model']
 __all__ += ['RandInt']
-__all__ += ['Multinomial', 'Bin', 'Ber']
+__all__ += ['Multinomial', 'Bin', 'Ber', 'Categorical']
 __all__ += ['NegBin', 'Geom']
 __all__ += ['HyperGeom', 'Pois']
 
@@ -32,3 +39,13 @@ __all__ += ['Laplace', 'Logistic', 'VonMises']
 
 # Random matrices
 __all__ += ['Wigner', 'Wishart']
+
+# Exact and numerical distributions
+__all__ += ['exact']
+__all__ += ['Tabulated', 'density']
+
+# Stochastic processes
+__all__ += ['Process', 'HittingTime']
+__all__ += ['RandomWalk', 'BrownianMotion']
+__all__ += ['PoissonProcess', 'CompoundPoisson']
+__all__ += ['OrnsteinUhlenbeck']
@@ -1,3 +1,12 @@
-from .random_variables import seed
+from .random_variables import seed, set_dtype
+from .evaluators import ThreadedEvaluator, BatchEvaluator, CachedEvaluator, ParallelSampler
+from .executors import Executor, InProcessExecutor, ThreadExecutor, ProcessExecutor, SocketExecutor, serve
+from .kernels import Kernel, jit
+from .gradients import grad_mean
 
-__all__ = ['seed']
+__all__ = ['seed', 'set_dtype']
+__all__ += ['ThreadedEvaluator', 'BatchEvaluator', 'CachedEvaluator']
+__all__ += ['ParallelSampler']
+__all__ += ['Executor', 'InProcessExecutor', 'ThreadExecutor', 'ProcessExecutor', 'SocketExecutor', 'serve']
+__all__ += ['Kernel', 'jit']
+__all__ += ['grad_mean']
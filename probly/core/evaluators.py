@@ -0,0 +1,556 @@
+"""
+Alternative strategies for evaluating the computational graph of a random variable.
+
+Evaluating `rv(seed)` recursively visits the graph of `rv` depth first. The
+evaluators defined here instead flatten the graph into a list of tasks and
+schedule these tasks themselves.
+"""
+
+import concurrent.futures
+import multiprocessing
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from .random_variables import Array, Constant, Index, RandomVariable, Ufunc
+
+
+class Task:
+    """
+    The evaluation of a single node with a given seed.
+
+    :param node: RandomVariable
+    :param seed: int
+        The seed of the node (i.e. already adjusted by the node's offset).
+    :param parents: tuple of keys
+        The keys of the tasks evaluating the node's parents.
+    """
+
+    def __init__(self, node, seed, parents):
+        self.node = node
+        self.seed = seed
+        self.parents = parents
+        self.children = []
+
+    def run(self, inputs):
+        if self.node.op is None:
+            return self.node._default_op(self.seed)
+        elif not self.node.parents:
+            return self.node.op(self.seed)
+        return self.node.op(*inputs)
+
+
+def tasks(rv, seed):
+    """
+    Flattens the evaluation of `rv(seed)` into tasks.
+
+    Nodes without an operation (such as distributions and conditional random
+    variables) are not expanded, since their samplers evaluate the nodes they
+    depend on themselves.
+
+    :return: dict
+        Tasks keyed by node and seed, in topological order, and the key of the task
+        evaluating `rv`.
+    """
+    root = _key(rv, seed)
+    graph = {}
+    order = []
+
+    # Iterative depth first search, recording nodes in post-order
+    stack = [(root, rv, False)]
+    while stack:
+        key, node, expanded = stack.pop()
+        if expanded:
+            order.append(key)
+            continue
+        if key in graph:
+            continue
+
+        parents = node.parents if node.op is not None else ()
+        graph[key] = Task(node, key[1], tuple(_key(p, key[1]) for p in parents))
+        stack.append((key, node, True))
+        for (p, p_key) in zip(parents, graph[key].parents):
+            if p_key not in graph:
+                stack.append((p_key, p, False))
+
+    for key in order:
+        for parent in set(graph[key].parents):
+            graph[parent].children.append(key)
+    return {key: graph[key] for key in order}, root
+
+
+def _key(node, seed):
+    return id(node), (seed + node._offset) % node._max_seed
+
+
+class ThreadedEvaluator:
+    """
+    Evaluates independent branches of a random variable's graph concurrently.
+
+    Operations whose inputs are arrays (such as a lifted `np.linalg.det` applied to a
+    random matrix) are run on a thread pool as soon as their inputs are available,
+    so that NumPy routines that release the GIL run in parallel. Sampling from
+    distributions relies on NumPy's global random state and is therefore always
+    serialized, as are cheap scalar operations.
+
+    Produces the same samples as calling the random variable directly.
+
+    Example
+    -------
+    Compute the determinants of two Wigner matrices on two threads.
+
+    >>> import probly as pr
+    >>> import numpy as np
+    >>> Det = pr.lift(np.linalg.det)
+    >>> X = Det(pr.Wigner(300)) + Det(pr.Wigner(300))
+    >>> pr.ThreadedEvaluator(max_workers=2)(X, seed=1)
+
+    :param max_workers: int, optional
+        The number of threads. Default is that of `concurrent.futures.ThreadPoolExecutor`.
+    """
+
+    # Guards NumPy's global random state (and node memos) across evaluators
+    _lock = threading.RLock()
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+
+    def __call__(self, rv, seed=None):
+        graph, root = tasks(rv, rv._seed(seed))
+        values = {}
+        waiting = {key: len(set(task.parents)) for (key, task) in graph.items()}
+        ready = [key for (key, count) in waiting.items() if count == 0]
+
+        with concurrent.futures.ThreadPoolExecutor(self.max_workers) as pool:
+            running = {}
+            while ready or running:
+                while ready:
+                    key = ready.pop()
+                    task = graph[key]
+                    inputs = [values[p] for p in task.parents]
+                    if self._inline(task, inputs):
+                        values[key] = self._run(task, inputs)
+                        ready.extend(self._release(graph, waiting, key))
+                    else:
+                        running[pool.submit(task.run, inputs)] = key
+
+                if running:
+                    done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        key = running.pop(future)
+                        values[key] = future.result()
+                        ready.extend(self._release(graph, waiting, key))
+
+        return values[root]
+
+    def _run(self, task, inputs):
+        if task.node.op is None or not task.node.parents:
+            with self._lock:
+                return task.run(inputs)
+        return task.run(inputs)
+
+    @staticmethod
+    def _inline(task, inputs):
+        # Run in the scheduling thread unless the task may release the GIL for long
+        node = task.node
+        if node.op is None or not node.parents or isinstance(node, (Constant, Array, Index)):
+            return True
+        return isinstance(node, Ufunc) and all(np.ndim(x) == 0 for x in inputs)
+
+    @staticmethod
+    def _release(graph, waiting, key):
+        released = []
+        for child in graph[key].children:
+            waiting[child] -= 1
+            if waiting[child] == 0:
+                released.append(child)
+        return released
+
+
+class BatchEvaluator:
+    """
+    Evaluates batches of samples of a random variable in bounded memory.
+
+    Sampling `rv.sample(n)` keeps the batch of every node of the graph of `rv`
+    until the end of the evaluation. This evaluator instead runs the nodes in
+    topological order and frees each intermediate batch after its last consumer
+    has run. Elementwise operations write their results into the batch of an
+    input that is no longer needed (through the `out` argument of the ufunc), so
+    that chains of arithmetic allocate no new arrays. Peak memory is thus
+    proportional to the width of the graph (the number of batches needed at once)
+    rather than to its size.
+
+    Produces the same samples as `rv.sample(n, seed)`.
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> X = pr.Normal()
+    >>> Y = ((X + 1) ** 2 - 3 * X) / 2 + pr.Exp()
+    >>> pr.BatchEvaluator()(Y, 10 ** 7, seed=1)
+
+    Attributes
+    ----------
+    reused : int
+        The number of results written into existing buffers by the last evaluation.
+    """
+
+    def __init__(self):
+        self.reused = 0
+
+    def __call__(self, rv, n, seed=None):
+        """
+        Returns `n` independent samples of `rv`.
+
+        :param rv: RandomVariable
+        :param n: int
+        :param seed: int, optional
+        """
+        graph, root = tasks(rv, rv._seed(seed))
+        order = list(graph)
+
+        # The position of the last consumer of each batch
+        last = {key: i for (i, key) in enumerate(order)}
+        for (i, key) in enumerate(order):
+            for parent in graph[key].parents:
+                last[parent] = i
+        last[root] = len(order)
+
+        values = {}
+        owners = {}     # Number of live batches by underlying buffer
+        fresh = set()   # Batches allocated by this evaluation, which may be overwritten
+        self.reused = 0
+
+        for (i, key) in enumerate(order):
+            task = graph[key]
+            node = task.node
+            dying = {p for p in task.parents if last[p] == i}
+
+            inputs = [values[p] for p in task.parents]
+            if node.op is not None and node.parents and isinstance(node, Ufunc) and node.method == '__call__':
+                value = self._ufunc(node, n, inputs, [p for p in task.parents if p in dying and p in fresh],
+                                    values, owners)
+                if isinstance(value, np.ndarray):
+                    fresh.add(key)
+            else:
+                value = _run_batch(task, n, inputs)
+
+            values[key] = value
+            _retain(owners, value, 1)
+            for parent in dying:
+                _retain(owners, values.pop(parent), -1)
+                fresh.discard(parent)
+
+        return values[root]
+
+    def _ufunc(self, node, n, inputs, candidates, values, owners):
+        batched, inputs = _ufunc_inputs(node, inputs)
+        if not any(batched) or node.kwargs or node.ufunc.nout != 1 or node._fast_power(inputs, batched):
+            return node._call(n, inputs, batched)
+
+        # The result may overwrite an input of the same shape and dtype that is not
+        # needed later and whose buffer is not shared with another live batch
+        aligned = node._aligned(n, inputs, batched)
+        shape = np.broadcast_shapes(*(np.shape(x) for x in aligned))
+        dtype = None
+        for key in candidates:
+            out = values[key]
+            if out.shape != shape or not out.flags.writeable or owners[_base_id(out)] != 1:
+                continue
+            if dtype is None:
+                # Probing one entry of each batch resolves the dtype as in the full call
+                dtype = node.ufunc(*(np.reshape(x, -1)[:1] if b else x
+                                     for (x, b) in zip(aligned, batched))).dtype
+            if out.dtype == dtype:
+                self.reused += 1
+                return node.ufunc(*aligned, out=out)
+        return node._call(n, inputs, batched)
+
+
+class CachedEvaluator:
+    """
+    Evaluates batches of samples of random variables, reusing those of unchanged nodes.
+
+    The batch of every node is kept after an evaluation. When a random variable
+    is evaluated again with the same number of samples and seed, only the nodes
+    downstream of a node whose attributes (such as the parameters of a
+    distribution) have changed since are recomputed. Distributions whose
+    parameters change are resampled from the same seed, so that results before
+    and after the change are compared under common random numbers. This makes
+    repeated what-if analyses of large models nearly as cheap as the part of the
+    model they modify.
+
+    Only the batches of the most recent evaluation are kept. Produces the same
+    samples as `rv.sample(n, seed)`.
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> X = pr.Normal()
+    >>> Y = pr.Gamma(2) * pr.Exp() + X
+    >>> evaluator = pr.CachedEvaluator()
+    >>> evaluator.mean(Y, 10 ** 6)
+    >>> X.mu = 1
+    >>> evaluator.mean(Y, 10 ** 6)  # Only resamples X and recomputes the sum
+
+    :param seed: int, optional
+        The seed of evaluations for which none is given. Default is random but
+        fixed for the evaluator.
+
+    Attributes
+    ----------
+    computed : int
+        The number of nodes computed (rather than reused) by the last evaluation.
+    """
+
+    # Attributes that record the scalar memo and not the state of a node
+    _ignored = ('_current_seed', '_current_val')
+
+    def __init__(self, seed=None):
+        self.seed = RandomVariable._seed(seed)
+        self.computed = 0
+        self._cache = {}
+        self._states = {}
+        self._clock = 0
+
+    def __call__(self, rv, n, seed=None):
+        """
+        Returns `n` independent samples of `rv`.
+
+        The returned array is shared with the cache and is therefore read-only.
+
+        :param rv: RandomVariable
+        :param n: int
+        :param seed: int, optional
+            Default is the seed of the evaluator.
+        """
+        self._clock += 1
+        graph, root = tasks(rv, self.seed if seed is None else seed)
+        stamps = {}
+        cache = {}
+        self.computed = 0
+
+        for (key, task) in graph.items():
+            node = task.node
+            stamp = self._stamp(node, stamps)
+            entry = self._cache.get(key + (n,))
+            if entry is not None and entry[0] is node and entry[1] >= stamp:
+                cache[key + (n,)] = entry
+                continue
+
+            value = _run_batch(task, n, [cache[p + (n,)][2] for p in task.parents])
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+            cache[key + (n,)] = (node, self._clock, value)
+            self.computed += 1
+
+        self._cache = cache
+        return cache[root + (n,)][2]
+
+    def mean(self, rv, n, seed=None):
+        """
+        Returns the mean of `n` samples of `rv`.
+
+        :param rv: RandomVariable
+        :param n: int
+        :param seed: int, optional
+            Default is the seed of the evaluator.
+        """
+        return np.mean(self(rv, n, seed), axis=0)
+
+    def clear(self):
+        """Discards all cached batches."""
+        self._cache = {}
+        self._states = {}
+
+    def _stamp(self, node, stamps):
+        # The last evaluation at which the attributes of `node` or of a node it
+        # depends on changed
+        if id(node) in stamps:
+            return stamps[id(node)]
+
+        state = {name: _snapshot(getattr(node, name)) for name in _attribute_names(node)
+                 if name not in self._ignored and hasattr(node, name)}
+        known = self._states.get(id(node))
+        if known is None or known[0] is not node or not _same(known[1], state):
+            self._states[id(node)] = (node, state, self._clock)
+        stamp = self._states[id(node)][2]
+
+        stamps[id(node)] = stamp
+        for dependency in node._dependencies():
+            stamp = max(stamp, self._stamp(dependency, stamps))
+        stamps[id(node)] = stamp
+        return stamp
+
+
+class ParallelSampler:
+    """
+    Samples large batches of a random variable on a pool of processes.
+
+    The batch is split into chunks of `chunk_size` samples, where chunk `k` is
+    sampled from the seed `seed + k * chunk_size` as in `RandomVariable.stream`,
+    so that the result does not depend on the number of processes or on the
+    order in which chunks complete. Workers write their chunks directly into a
+    memory-mapped output array, so that samples are never sent back through pipes,
+    and the caller receives a view of the same memory without copying.
+
+    Where available, workers are forked, so that random variables need not be
+    picklable.
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> X = pr.Normal() * pr.Exp()
+    >>> samples = pr.ParallelSampler(processes=4)(X, 10 ** 8, seed=1)
+
+    :param processes: int, optional
+        The number of worker processes. Default is the number of CPUs.
+    :param chunk_size: int, optional
+        The number of samples per chunk.
+    :param dir: str, optional
+        The directory of the files backing output arrays. Default is a directory
+        in memory (`/dev/shm`) where available and the temporary directory otherwise.
+    """
+
+    def __init__(self, processes=None, chunk_size=2 ** 16, dir=None):
+        self.processes = processes or os.cpu_count()
+        self.chunk_size = chunk_size
+        if dir is None and os.path.isdir('/dev/shm'):
+            dir = '/dev/shm'
+        self.dir = dir
+
+    def __call__(self, rv, n, seed=None, out=None):
+        """
+        Returns the first `n` samples of `rv.stream(chunk_size, seed)`.
+
+        :param rv: RandomVariable
+        :param n: int
+        :param seed: int, optional
+        :param out: numpy.memmap, optional
+            A file-backed array of `n` samples into which to write. Default is a
+            new array, backed by a file that is removed once mapped.
+        :return: numpy.memmap
+        """
+        seed = rv._seed(seed)
+        num_chunks = -(-n // self.chunk_size)
+
+        # The first chunk determines the shape and dtype of samples
+        first = rv.sample(self.chunk_size, seed)[:n]
+        path = None
+        if out is None:
+            out, path = self._allocate((n,) + first.shape[1:], first.dtype)
+        elif out.shape != (n,) + first.shape[1:] or not isinstance(out, np.memmap) or out.filename is None:
+            raise ValueError('Output must be a file-backed array of shape {}'.format((n,) + first.shape[1:]))
+
+        try:
+            out[:len(first)] = first
+            if num_chunks > 1:
+                layout = (out.filename, out.dtype, out.offset, out.shape)
+                context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods()
+                                                      else None)
+                with context.Pool(min(self.processes, num_chunks - 1), _start_worker,
+                                  (rv, seed, self.chunk_size, layout)) as pool:
+                    for _ in pool.imap_unordered(_fill_chunk, range(1, num_chunks)):
+                        pass
+        finally:
+            # The file is removed even if sampling fails. The mapping outlives the
+            # file on POSIX systems, where the memory is released with the array.
+            # Elsewhere the file remains until then.
+            if path is not None:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return out
+
+    def _allocate(self, shape, dtype):
+        fd, path = tempfile.mkstemp(suffix='.probly', dir=self.dir)
+        os.close(fd)
+        try:
+            return np.memmap(path, dtype=dtype, mode='w+', shape=shape), path
+        except BaseException:
+            os.remove(path)
+            raise
+
+
+# The state of a worker of a ParallelSampler
+_worker = {}
+
+
+def _start_worker(rv, seed, chunk_size, layout):
+    filename, dtype, offset, shape = layout
+    _worker.update(rv=rv, seed=seed, chunk_size=chunk_size,
+                   out=np.memmap(filename, dtype=dtype, mode='r+', offset=offset, shape=shape))
+
+
+def _fill_chunk(k):
+    rv, chunk_size, out = _worker['rv'], _worker['chunk_size'], _worker['out']
+    start = k * chunk_size
+    samples = rv.sample(chunk_size, (_worker['seed'] + start) % rv._max_seed)
+    out[start:start + chunk_size] = samples[:len(out) - start]
+    out.flush()
+    return k
+
+
+def _run_batch(task, n, inputs):
+    # Computes the batch of a task from the batches of its parents
+    node = task.node
+    if node.op is None or not node.parents:
+        return node._batch_call(task.seed, n, {})
+    elif isinstance(node, Ufunc) and node.method == '__call__':
+        batched, inputs = _ufunc_inputs(node, inputs)
+        return node._call(n, inputs, batched)
+    return node._batch_op(*inputs)
+
+
+def _ufunc_inputs(node, inputs):
+    # Constants are left unbatched, as in `Ufunc._batch_call`
+    batched = [not isinstance(p, Constant) for p in node.parents]
+    return batched, [x if b else p.value for (x, b, p) in zip(inputs, batched, node.parents)]
+
+
+def _attribute_names(obj):
+    names = set(getattr(obj, '__dict__', ()))
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        names.update((slots,) if isinstance(slots, str) else slots)
+    return names - {'__dict__', '__weakref__'}
+
+
+def _snapshot(value):
+    # Arrays and lists may be changed in place, so they are copied
+    if isinstance(value, np.ndarray):
+        return np.array(value)
+    elif isinstance(value, list):
+        return [_snapshot(x) for x in value]
+    return value
+
+
+def _same(a, b):
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    elif isinstance(a, (list, tuple)):
+        return type(a) is type(b) and len(a) == len(b) and all(_same(x, y) for (x, y) in zip(a, b))
+    elif isinstance(a, np.ndarray):
+        return isinstance(b, np.ndarray) and a.dtype == b.dtype and np.array_equal(a, b)
+    elif isinstance(a, (int, float, complex, str, np.generic)):
+        # Other objects (such as random variables) are compared by identity
+        return type(a) is type(b) and bool(a == b)
+    return a is b
+
+
+def _base_id(a):
+    # Identifies the buffer underlying an array and its views
+    while isinstance(getattr(a, 'base', None), np.ndarray):
+        a = a.base
+    return id(a)
+
+
+def _retain(owners, value, count):
+    if isinstance(value, np.ndarray):
+        base = _base_id(value)
+        owners[base] = owners.get(base, 0) + count
+        if owners[base] == 0:
+            del owners[base]
@@ -0,0 +1,503 @@
+"""
+Backends that distribute the sampling of random variables over workers.
+
+An executor splits `n` samples of a random variable into chunks of `chunk_size`
+samples, chunk `k` being sampled from the seed `seed + k * chunk_size` as in
+`RandomVariable.stream`, and hands the chunks out to its workers. The result
+therefore depends neither on the executor nor on the number of workers.
+
+Each worker is initially assigned a contiguous range of chunks. A worker that
+has finished its own range steals half of the remaining chunks of the most
+loaded worker, so that chunks of uneven cost (such as those of conditional
+random variables sampled by rejection) do not leave workers idle.
+
+Workers in other processes or on other machines receive the random variable
+serialized (by `cloudpickle` where installed, which also handles lambdas, and
+by `pickle` otherwise) and return either samples or partially reduced results
+(see `probly.Reducer`), which are merged in chunk order.
+"""
+
+import collections
+import concurrent.futures
+import copy
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import subprocess
+import sys
+import threading
+
+import numpy as np
+
+try:
+    import cloudpickle
+except ImportError:  # pragma: no cover
+    cloudpickle = None
+
+
+class Job:
+    """
+    The sampling of chunks of a random variable.
+
+    :param rv: RandomVariable
+    :param n: int
+        The total number of samples.
+    :param seed: int
+    :param chunk_size: int
+    :param reducers: list of Reducer, optional
+        If given, chunks are reduced by copies of these reducers rather than returned.
+    """
+
+    def __init__(self, rv, n, seed, chunk_size, reducers=None):
+        self.rv = rv
+        self.n = n
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.reducers = reducers
+
+    @property
+    def num_chunks(self):
+        return -(-self.n // self.chunk_size)
+
+    def run(self, k):
+        """Returns the samples of chunk `k`, or reducers updated with them."""
+        start = k * self.chunk_size
+        samples = self.rv.sample(self.chunk_size, (self.seed + start) % self.rv._max_seed)[:self.n - start]
+        if self.reducers is None:
+            return samples
+        return [copy.deepcopy(reducer).update(samples) for reducer in self.reducers]
+
+
+class Executor:
+    """
+    The base class for executors.
+
+    Subclassing
+    -----------
+    A subclass should implement `_workers(self)`, which returns its workers. A
+    worker has methods `start(job)`, called before the chunks of a job are
+    submitted, and `submit(k)`, which returns a `concurrent.futures.Future`
+    resolving to the result of chunk `k` of the current job. Executors with
+    resources to release should also override `close(self)`.
+
+    Attributes
+    ----------
+    stolen : int
+        The number of chunks stolen by idle workers during the last job.
+    """
+
+    stolen = 0
+
+    # The number of chunks submitted to each worker ahead of their results
+    _depth = 2
+
+    def sample(self, rv, n, seed=None, chunk_size=2 ** 16):
+        """
+        Returns the first `n` samples of `rv.stream(chunk_size, seed)`.
+
+        :param rv: RandomVariable
+        :param n: int
+        :param seed: int, optional
+        :param chunk_size: int, optional
+        """
+        job = Job(rv, n, rv._seed(seed), chunk_size)
+        out = None
+        for (k, samples) in self._run(job):
+            if out is None:
+                out = np.empty((n,) + samples.shape[1:], dtype=samples.dtype)
+            out[k * chunk_size:k * chunk_size + len(samples)] = samples
+        return out
+
+    def reduce(self, rv, n, *reducers, seed=None, chunk_size=2 ** 16):
+        """
+        Feeds `n` samples of `rv` to reducers.
+
+        Each chunk is reduced by a copy of each reducer on a worker, and the
+        partial results are merged into `reducers` in chunk order. The reducers
+        should therefore be newly created.
+
+        Example
+        -------
+        >>> import probly as pr
+        >>> X = pr.Normal().given(pr.Normal() > 2)
+        >>> with pr.ProcessExecutor(4) as executor:
+        ...     moments = executor.reduce(X, 10 ** 6, pr.Moments())
+
+        :param rv: RandomVariable
+        :param n: int
+        :param reducers: Reducer
+        :param seed: int, optional
+        :param chunk_size: int, optional
+        :return: The reducers, if more than one is passed, or else the reducer.
+        """
+        # Chunks are reduced by copies of the reducers as they are before any merging
+        job = Job(rv, n, rv._seed(seed), chunk_size, copy.deepcopy(list(reducers)))
+        for (_, partial) in self._run(job):
+            for (reducer, other) in zip(reducers, partial):
+                reducer.merge(other)
+        return reducers if len(reducers) != 1 else reducers[0]
+
+    def mean(self, rv, n, seed=None, chunk_size=2 ** 16):
+        """
+        Returns the mean of `n` samples of `rv`.
+
+        :param rv: RandomVariable
+        :param n: int
+        :param seed: int, optional
+        :param chunk_size: int, optional
+        """
+        from ..lib.streaming import Sum
+        total = self.reduce(rv, n, Sum(), seed=seed, chunk_size=chunk_size)
+        return total.result() / total.count
+
+    def close(self):
+        """Releases the workers of the executor."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _workers(self):
+        raise NotImplementedError("_workers not defined")
+
+    def _run(self, job):
+        # Yields the results of the chunks of `job` in order
+        workers = self._workers()
+        for worker in workers:
+            worker.start(job)
+        scheduler = Scheduler(job.num_chunks, len(workers))
+
+        running = {}
+        done = {}
+        following = 0
+
+        def submit(i):
+            k = scheduler.next(i)
+            if k is not None:
+                running[workers[i].submit(k)] = (i, k)
+
+        for i in range(len(workers)):
+            for _ in range(self._depth):
+                submit(i)
+
+        try:
+            while running:
+                finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    i, k = running.pop(future)
+                    done[k] = future.result()
+                    submit(i)
+                while following in done:
+                    yield following, done.pop(following)
+                    following += 1
+        finally:
+            # Outstanding chunks are awaited so that workers are ready for the next job
+            concurrent.futures.wait(running)
+        self.stolen = scheduler.stolen
+
+
+class Scheduler:
+    """
+    Assigns chunks to workers with work stealing.
+
+    :param num_chunks: int
+    :param num_workers: int
+
+    Attributes
+    ----------
+    stolen : int
+        The number of chunks stolen so far.
+    """
+
+    def __init__(self, num_chunks, num_workers):
+        bounds = np.linspace(0, num_chunks, num_workers + 1).astype(int)
+        self.queues = [collections.deque(range(a, b)) for (a, b) in zip(bounds[:-1], bounds[1:])]
+        self.stolen = 0
+
+    def next(self, i):
+        """Returns the next chunk for worker `i`, or None if no chunks remain."""
+        queue = self.queues[i]
+        if not queue:
+            victim = max(self.queues, key=len)
+            count = -(-len(victim) // 2)
+            stolen = [victim.pop() for _ in range(count)]
+            queue.extend(reversed(stolen))
+            self.stolen += count
+        return queue.popleft() if queue else None
+
+
+class InProcessExecutor(Executor):
+    """
+    Runs all chunks in the calling thread.
+
+    Useful as a reference, and for debugging the random variables passed to
+    other executors.
+    """
+
+    def __init__(self):
+        self._worker = _PoolWorker(None)
+
+    def _workers(self):
+        return [self._worker]
+
+
+class ThreadExecutor(Executor):
+    """
+    Runs chunks on a pool of threads.
+
+    Threads share memory, so that random variables are not serialized, and run
+    in parallel while NumPy releases the GIL. Samplers that are not vectorized
+    rely on NumPy's global random state, which is not thread-safe; random
+    variables involving them should be sampled by a `ProcessExecutor`.
+
+    :param workers: int, optional
+        The number of threads. Default is the number of CPUs.
+    """
+
+    def __init__(self, workers=None):
+        workers = workers or os.cpu_count()
+        self._pool = concurrent.futures.ThreadPoolExecutor(workers)
+        self._pool_workers = [_PoolWorker(self._pool) for _ in range(workers)]
+
+    def _workers(self):
+        return self._pool_workers
+
+    def close(self):
+        self._pool.shutdown()
+
+
+class ProcessExecutor(Executor):
+    """
+    Runs chunks on a pool of persistent worker processes.
+
+    Workers are forked where possible, and otherwise spawned.
+
+    :param workers: int, optional
+        The number of processes. Default is the number of CPUs.
+    """
+
+    def __init__(self, workers=None):
+        workers = workers or os.cpu_count()
+        context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods()
+                                              else None)
+        pipes = [context.Pipe() for _ in range(workers)]
+        processes = [context.Process(target=_serve_connection, args=(child,), daemon=True)
+                     for (_, child) in pipes]
+        for process in processes:
+            process.start()
+        for (_, child) in pipes:
+            child.close()
+        self._connections = [_ConnectionWorker(parent, process)
+                             for ((parent, _), process) in zip(pipes, processes)]
+
+    def _workers(self):
+        return self._connections
+
+    def close(self):
+        for worker in self._connections:
+            worker.close()
+
+
+class SocketExecutor(Executor):
+    """
+    Runs chunks on workers listening on sockets, which may be on other machines.
+
+    Workers are started by `probly.serve`, for instance by running
+
+    .. code-block:: bash
+
+        python -c "import probly; probly.serve(('0.0.0.0', 6000), b'secret')"
+
+    on each machine. Workers authenticate the executor with the shared key
+    `authkey` before unpickling anything it sends, but connections are not
+    encrypted and should be confined to trusted networks.
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> with pr.SocketExecutor.spawn(2) as executor:
+    ...     executor.mean(pr.Normal() ** 2, 10 ** 6)
+
+    :param addresses: list of tuples
+        The `(host, port)` addresses of the workers.
+    :param authkey: bytes
+        The key shared with the workers.
+    """
+
+    def __init__(self, addresses, authkey):
+        self._connections = [_ConnectionWorker(multiprocessing.connection.Client(address, authkey=authkey))
+                             for address in addresses]
+        self._processes = []
+
+    @classmethod
+    def spawn(cls, workers=None, host='localhost'):
+        """
+        Returns an executor for new local worker processes listening on sockets.
+
+        The workers are terminated when the executor is closed.
+
+        :param workers: int, optional
+            The number of workers. Default is the number of CPUs.
+        :param host: str, optional
+        """
+        authkey = os.urandom(32)
+        code = 'import sys, probly; probly.serve((sys.argv[1], 0), bytes.fromhex(sys.argv[2]), once=True)'
+        processes = [subprocess.Popen([sys.executable, '-c', code, host, authkey.hex()], stdout=subprocess.PIPE)
+                     for _ in range(workers or os.cpu_count())]
+        try:
+            # Each worker reports the port on which it listens
+            addresses = [(host, int(process.stdout.readline())) for process in processes]
+            executor = cls(addresses, authkey)
+        except BaseException:
+            for process in processes:
+                process.kill()
+            raise
+        executor._processes = processes
+        return executor
+
+    def _workers(self):
+        return self._connections
+
+    def close(self):
+        for worker in self._connections:
+            worker.close()
+        for process in self._processes:
+            process.wait()
+            process.stdout.close()
+
+
+def serve(address, authkey, once=False):
+    """
+    Runs a worker of a `SocketExecutor`.
+
+    Executors are served one at a time. On start, the port on which the worker
+    listens is printed on a line of standard output (which is useful when `0` is
+    passed for the operating system to choose a port).
+
+    :param address: tuple
+        The `(host, port)` address on which to listen.
+    :param authkey: bytes
+        The key shared with executors.
+    :param once: bool, optional
+        If True, stops after serving a single executor.
+    """
+    with multiprocessing.connection.Listener(address, authkey=authkey) as listener:
+        print(listener.address[1], flush=True)
+        while True:
+            try:
+                connection = listener.accept()
+            except multiprocessing.AuthenticationError:
+                continue
+            _serve_connection(connection)
+            if once:
+                return
+
+
+def _serve_connection(connection):
+    # Runs jobs until the executor closes the connection
+    job = None
+    with connection:
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                return
+            if message[0] == 'job':
+                job = pickle.loads(message[1])
+            elif message[0] == 'chunk':
+                try:
+                    connection.send(('result', job.run(message[1])))
+                except Exception as e:
+                    connection.send(('error', _picklable(e)))
+            else:
+                # Forked workers share each other's descriptors, so the end of the
+                # connection is acknowledged rather than signalled by closing it
+                connection.send(('closed', None))
+                return
+
+
+def _picklable(e):
+    try:
+        pickle.dumps(e)
+        return e
+    except Exception:
+        return RuntimeError(repr(e))
+
+
+def _dumps(obj):
+    return (cloudpickle or pickle).dumps(obj)
+
+
+class _PoolWorker:
+    # Runs chunks on a thread pool, or in the calling thread if there is none
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.job = None
+
+    def start(self, job):
+        self.job = job
+
+    def submit(self, k):
+        if self.pool is not None:
+            return self.pool.submit(self.job.run, k)
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(self.job.run(k))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class _ConnectionWorker:
+    # Sends chunks to a worker over a connection and resolves their results in order
+
+    def __init__(self, connection, process=None):
+        self.connection = connection
+        self.process = process
+        self.pending = collections.deque()
+        self.lock = threading.Lock()
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def start(self, job):
+        self.connection.send(('job', _dumps(job)))
+
+    def submit(self, k):
+        future = concurrent.futures.Future()
+        with self.lock:
+            self.pending.append(future)
+            self.connection.send(('chunk', k))
+        return future
+
+    def close(self):
+        try:
+            self.connection.send(('close',))
+        except OSError:
+            pass
+        self.reader.join()
+        self.connection.close()
+        if self.process is not None:
+            self.process.join()
+
+    def _read(self):
+        while True:
+            try:
+                kind, value = self.connection.recv()
+            except (EOFError, OSError):
+                break
+            if kind == 'closed':
+                break
+            with self.lock:
+                future = self.pending.popleft()
+            if kind == 'result':
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+        with self.lock:
+            while self.pending:
+                self.pending.popleft().set_exception(ConnectionError('Worker disconnected'))
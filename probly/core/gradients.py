@@ -0,0 +1,148 @@
+"""
+Pathwise (reparameterization) estimates of derivatives of expectations.
+
+A sample of a reparameterizable distribution is a differentiable function of
+its parameters for fixed underlying randomness. Differentiating samples of a
+random variable along its graph with respect to the parameters of its leaves
+(forward-mode differentiation, one tangent per parameter), and averaging the
+derivatives over a single batch of samples, estimates the derivatives of the
+mean of the random variable with respect to all parameters at once.
+"""
+
+import numpy as np
+
+from .random_variables import Constant, Ufunc
+
+
+# Partial derivatives of ufuncs with respect to each input, given the inputs and output
+_partials = {
+    np.add: (lambda x, y, out: 1, lambda x, y, out: 1),
+    np.subtract: (lambda x, y, out: 1, lambda x, y, out: -1),
+    np.multiply: (lambda x, y, out: y, lambda x, y, out: x),
+    np.true_divide: (lambda x, y, out: 1 / y, lambda x, y, out: -out / y),
+    np.power: (lambda x, y, out: y * x ** (y - 1), lambda x, y, out: out * np.log(x)),
+    np.maximum: (lambda x, y, out: x >= y, lambda x, y, out: x < y),
+    np.minimum: (lambda x, y, out: x <= y, lambda x, y, out: x > y),
+    np.negative: (lambda x, out: -1,),
+    np.positive: (lambda x, out: 1,),
+    np.absolute: (lambda x, out: np.sign(x),),
+    np.square: (lambda x, out: 2 * x,),
+    np.sqrt: (lambda x, out: 0.5 / out,),
+    np.exp: (lambda x, out: out,),
+    np.expm1: (lambda x, out: out + 1,),
+    np.log: (lambda x, out: 1 / x,),
+    np.log1p: (lambda x, out: 1 / (1 + x),),
+    np.sin: (lambda x, out: np.cos(x),),
+    np.cos: (lambda x, out: -np.sin(x),),
+    np.tan: (lambda x, out: 1 + out ** 2,),
+    np.arctan: (lambda x, out: 1 / (1 + x ** 2),),
+    np.tanh: (lambda x, out: 1 - out ** 2,),
+}
+
+# Piecewise constant ufuncs, whose derivatives vanish almost everywhere
+_constant = {np.greater, np.greater_equal, np.less, np.less_equal, np.equal, np.not_equal,
+             np.logical_and, np.logical_or, np.logical_not, np.floor, np.ceil, np.sign}
+
+
+def grad_mean(rv, params, num_samples=10 ** 5, seed=None):
+    """
+    Returns pathwise estimates of the derivatives of the mean of `rv`.
+
+    All derivatives are estimated from a single batch of samples, by
+    differentiating each sample with respect to the parameters of the
+    distributions on which `rv` depends. This requires that these distributions
+    be reparameterizable in the given parameters (`Normal`, `Unif`, `Exp`,
+    `Laplace` and `Logistic` explicitly, and other continuous distributions
+    implementing `cdf` and `pdf`, such as `Gamma`, implicitly) and that `rv`
+    be obtained from them by differentiable ufuncs. Comparisons and other
+    piecewise constant functions have vanishing derivatives, so that estimates
+    of derivatives of probabilities of events are biased.
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> X, Y = pr.Normal(1, 2), pr.Gamma(3, 1)
+    >>> Z = X ** 2 + Y
+    >>> pr.grad_mean(Z, [(X, 'mu'), (X, 'cov'), (Y, 'shape')])  # approximately [2, 1, 1]
+
+    :param rv: RandomVariable
+    :param params: list
+        Pairs of a distribution and the name of one of its (scalar) parameters.
+    :param num_samples: int, optional
+    :param seed: int, optional
+    :return: numpy.ndarray
+        The derivatives of the mean with respect to each parameter, stacked
+        along the first axis.
+    """
+    seed = rv._seed(seed)
+    leaves = {}
+    for (k, (node, name)) in enumerate(params):
+        leaves.setdefault(id(node), []).append((k, name))
+
+    memo = {}
+    values = rv._batch(seed, num_samples, memo)
+    tangents = _Tangents(leaves, len(params), num_samples, memo).of(rv, seed)
+    if tangents is None:
+        return np.zeros((len(params),) + np.shape(values)[1:])
+    return np.mean(tangents, axis=1)
+
+
+class _Tangents:
+    # Propagates derivatives of batches of samples with respect to parameters
+
+    def __init__(self, leaves, size, n, memo):
+        self.leaves = leaves
+        self.size = size
+        self.n = n
+        self.memo = memo
+        self.tangents = {}
+        self.variable = {}
+
+    def of(self, node, seed):
+        # Returns the derivatives of the batch of `node` evaluated at `seed`, of shape
+        # `(len(params), n, ...)`, or None if they vanish
+        if not self.depends(node):
+            return None
+        value = node._batch(seed, self.n, self.memo)
+        seed = (seed + node._offset) % node._max_seed
+        key = (id(node), seed)
+        if key not in self.tangents:
+            self.tangents[key] = self.compute(node, seed, value)
+        return self.tangents[key]
+
+    def depends(self, node):
+        # Whether `node` depends on some parameter
+        if id(node) not in self.variable:
+            self.variable[id(node)] = id(node) in self.leaves or any(self.depends(p) for p in node._dependencies())
+        return self.variable[id(node)]
+
+    def compute(self, node, seed, value):
+        if id(node) in self.leaves:
+            tangents = np.zeros((self.size,) + np.shape(value))
+            for (k, name) in self.leaves[id(node)]:
+                derivative = node._pathwise(value, name) if hasattr(node, '_pathwise') else None
+                if derivative is None:
+                    raise NotImplementedError('{} is not reparameterizable in {}'.format(node, name))
+                tangents[k] = derivative
+            return tangents
+        elif not isinstance(node, Ufunc) or node.method != '__call__' or node.kwargs:
+            raise NotImplementedError('Cannot differentiate through {}'.format(type(node).__name__))
+        elif node.ufunc in _constant:
+            return None
+        elif node.ufunc not in _partials:
+            raise NotImplementedError('No derivative of {}'.format(node.ufunc.__name__))
+
+        # Inputs are aligned as in `Ufunc._call`
+        batched = [not isinstance(p, Constant) for p in node.parents]
+        inputs = [p._batch(seed, self.n, self.memo) if b else p.value for (p, b) in zip(node.parents, batched)]
+        ndim = np.ndim(value) - 1
+        shapes = [(self.n,) + (1,) * (ndim + 1 - np.ndim(x)) + np.shape(x)[1:] if b else None
+                  for (x, b) in zip(inputs, batched)]
+        inputs = [np.reshape(x, shape) if b else x for (x, shape, b) in zip(inputs, shapes, batched)]
+
+        out = np.zeros((self.size,) + np.shape(value))
+        for (partial, parent, x, shape) in zip(_partials[node.ufunc], node.parents, inputs, shapes):
+            tangent = self.of(parent, seed) if shape is not None else None
+            if tangent is not None:
+                out += partial(*inputs, value) * np.reshape(tangent, (self.size,) + shape)
+        return out
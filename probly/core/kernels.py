@@ -0,0 +1,297 @@
+"""
+Compilation of random variables to native sampling kernels.
+
+A kernel produces all samples of a random variable in a single loop, in which
+each node of the graph is a scalar expression. The loop is compiled with Numba
+if it is installed. Nodes that cannot be expressed in the loop (such as lifted
+functions and random arrays) are sampled by batch sampling beforehand and
+passed to the kernel as inputs.
+"""
+
+import math
+
+import numpy as np
+
+from .._exceptions import ConditionError
+from .random_variables import Conditional, Constant, Ufunc
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+# Expressions for supported ufuncs
+_ufuncs = {
+    np.add: '({} + {})', np.subtract: '({} - {})', np.multiply: '({} * {})',
+    np.true_divide: '({} / {})', np.floor_divide: '({} // {})', np.mod: '({} % {})',
+    np.power: '({} ** {})', np.negative: '(-{})', np.positive: '(+{})',
+    np.absolute: 'abs({})', np.maximum: 'max({}, {})', np.minimum: 'min({}, {})',
+    np.exp: 'np.exp({})', np.expm1: 'np.expm1({})', np.log: 'np.log({})', np.log1p: 'np.log1p({})',
+    np.sqrt: 'np.sqrt({})', np.sin: 'np.sin({})', np.cos: 'np.cos({})', np.tan: 'np.tan({})',
+    np.arctan: 'np.arctan({})', np.tanh: 'np.tanh({})', np.floor: 'np.floor({})', np.ceil: 'np.ceil({})',
+    np.greater: '({} > {})', np.greater_equal: '({} >= {})', np.less: '({} < {})',
+    np.less_equal: '({} <= {})', np.equal: '({} == {})', np.not_equal: '({} != {})',
+    np.logical_and: '({} and {})', np.logical_or: '({} or {})', np.logical_not: '(not {})',
+}
+
+_comparisons = {np.greater, np.greater_equal, np.less, np.less_equal, np.equal, np.not_equal,
+                np.logical_and, np.logical_or, np.logical_not}
+_floats = {np.true_divide, np.exp, np.expm1, np.log, np.log1p, np.sqrt, np.sin, np.cos, np.tan,
+           np.arctan, np.tanh, np.floor, np.ceil}
+_discrete = {'randint', 'binomial', 'negative_binomial', 'geometric', 'hypergeometric', 'poisson'}
+
+
+class Kernel:
+    """
+    A random variable compiled to a sampling kernel.
+
+    Supported nodes are arithmetic, elementary functions and comparisons of
+    scalar random variables, scalar constants, the built-in univariate
+    distributions, and conditional random variables depending only on supported
+    nodes. Other nodes are sampled as usual and passed to the kernel.
+
+    If Numba is not installed, or no node of the graph is supported, sampling
+    falls back to `RandomVariable.sample`. Kernels draw from Numba's random
+    state, so their samples differ from those of `RandomVariable.sample`
+    (although they have the same distribution).
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> X, Y = pr.Normal(), pr.Unif()
+    >>> Z = (X ** 2 + Y).given(Y > 0.5)
+    >>> kernel = pr.jit(Z)
+    >>> kernel.sample(10 ** 7)
+
+    :param rv: RandomVariable
+    """
+
+    def __init__(self, rv):
+        self.rv = rv
+        self.inputs = []
+        lowering = _Lowering(rv, self.inputs)
+        self.source = lowering.source()
+        self._dtype = lowering.dtype
+
+        self.function = None
+        if self.source is not None:
+            namespace = {'np': np, 'ConditionError': ConditionError}
+            exec(self.source, namespace)
+            self.function = namespace['kernel']
+
+        self._compiled = None
+        if self.function is not None and numba is not None:
+            self._compiled = numba.njit(cache=False)(self.function)
+
+    @property
+    def backend(self):
+        """`'numba'` if samples are produced by a compiled kernel, else `'python'`."""
+        return 'python' if self._compiled is None else 'numba'
+
+    def sample(self, n, seed=None):
+        """
+        Returns `n` samples, stacked along the first axis.
+
+        :param n: int
+        :param seed: int, optional
+        """
+        if self._compiled is None:
+            return self.rv.sample(n, seed)
+        return self._run(self._compiled, n, self.rv._seed(seed))
+
+    def _run(self, function, n, seed):
+        memo = {}
+        inputs = [node._batch((seed + offset) % node._max_seed, n, memo) for (node, offset) in self.inputs]
+        if any(np.ndim(x) != 1 for x in inputs):
+            # Inputs must be scalar-valued
+            return self.rv.sample(n, seed)
+        out = np.empty(n, dtype=self._dtype)
+        function(n, seed, out, *inputs)
+        return out
+
+
+class _Lowering:
+    # Generates the source of the kernel of a random variable
+
+    def __init__(self, rv, inputs):
+        self.rv = rv
+        self.inputs = inputs
+        self.lines = []
+        self.count = 0
+        self.kinds = {}
+        self.opaque = _opaque(rv)
+        self.dtype = None
+
+    def source(self):
+        if id(self.rv) in self.opaque:
+            return None
+        out = self.emit(self.rv, 0, {}, 2)
+        self.dtype = {'b': np.bool_, 'i': np.int64, 'f': np.float64}[self.kinds[out]]
+        arguments = ''.join(', in{}'.format(k) for k in range(len(self.inputs)))
+        return '\n'.join(['def kernel(n, seed, out{}):'.format(arguments),
+                          '    np.random.seed(seed)',
+                          '    for i in range(n):']
+                         + self.lines + ['        out[i] = {}'.format(out), ''])
+
+    def variable(self, kind):
+        name = 'v{}'.format(self.count)
+        self.count += 1
+        self.kinds[name] = kind
+        return name
+
+    def emit(self, node, offset, names, depth):
+        # Emits the evaluation of `node` with seeds shifted by `offset` and returns
+        # the name of the variable holding its value
+        offset = (offset + node._offset) % node._max_seed
+        key = (id(node), offset)
+        if key in names:
+            return names[key]
+
+        indent = '    ' * depth
+        if id(node) in self.opaque:
+            name = self.variable('f')
+            self.inputs.append((node, (offset - node._offset) % node._max_seed))
+            self.lines.append('{}{} = in{}[i]'.format(indent, name, len(self.inputs) - 1))
+        elif isinstance(node, Constant):
+            name = self.variable(_kind(node.value))
+            self.lines.append('{}{} = {}'.format(indent, name, _literal(node.value)))
+        elif isinstance(node, Ufunc):
+            args = [self.emit(p, offset, names, depth) for p in node.parents]
+            expression = _ufuncs[node.ufunc].format(*args)
+            if node.ufunc in _comparisons:
+                kind = 'b'
+            elif node.ufunc in _floats:
+                kind = 'f'
+            else:
+                kind = max((self.kinds[a] for a in args), key='bif'.index)
+                if kind == 'b':
+                    # Arithmetic of booleans is logical in NumPy
+                    expression = 'bool({})'.format(expression)
+            name = self.variable(kind)
+            self.lines.append('{}{} = {}'.format(indent, name, expression))
+        elif isinstance(node, Conditional):
+            name = self.emit_conditional(node, offset, depth)
+        else:
+            family, *params = node._kernel()
+            name = self.variable('i' if family in _discrete else 'f')
+            self.lines.append('{}{} = np.random.{}({})'.format(indent, name, family,
+                                                                ', '.join(map(_literal, params))))
+        names[key] = name
+        return name
+
+    def emit_conditional(self, node, offset, depth):
+        # Redraws the nodes of the conditional random variable until the conditions hold
+        indent = '    ' * depth
+        attempts = self.variable('i')
+        self.lines += ['{}{} = 0'.format(indent, attempts), '{}while True:'.format(indent)]
+        start = len(self.lines)
+        names = {}
+        conditions = [self.emit(c, offset, names, depth + 1) for c in node.conditions]
+        value = self.emit(node.rv, offset, names, depth + 1)
+
+        # The result is initialized before the loop so that its type is known there
+        name = self.variable(self.kinds[value])
+        self.lines.insert(start - 1, '{}{} = {}'.format(indent, name, {'b': 'False', 'i': '0', 'f': '0.0'}[self.kinds[value]]))
+        self.lines += ['{}    if {}:'.format(indent, ' and '.join(conditions) or 'True'),
+                       '{}        {} = {}'.format(indent, name, value),
+                       '{}        break'.format(indent),
+                       '{}    {} += 1'.format(indent, attempts),
+                       '{}    if {} > {}:'.format(indent, attempts, node._max_attempts),
+                       "{}        raise ConditionError('Failed to meet condition')".format(indent)]
+        return name
+
+
+def _opaque(rv):
+    # Returns the ids of the nodes that must be sampled outside the kernel
+
+    # Nodes reachable from `rv`, not looking inside conditionals
+    graph = _closure([rv], expand=lambda node: type(node) is not Conditional and _supported(node))
+    opaque = {key for (key, node) in graph.items() if not _supported(node)}
+
+    while True:
+        # Nodes on which opaque nodes depend are also sampled outside the kernel so
+        # that they take the same values throughout
+        tainted = _closure([p for key in opaque for p in graph[key]._dependencies()])
+        changed = False
+        for (key, node) in graph.items():
+            if key in opaque:
+                continue
+            if key in tainted or (type(node) is Conditional and not _isolated(node, rv, tainted)):
+                opaque.add(key)
+                changed = True
+        if not changed:
+            return opaque
+
+
+def _isolated(node, rv, tainted):
+    # Whether a conditional may be redrawn in the kernel: all nodes it depends on
+    # must be supported and used nowhere else
+    inner = _closure(node._dependencies())
+    if any(not _supported(x) or type(x) is Conditional for x in inner.values()) or inner.keys() & tainted:
+        return False
+    outer = _closure([rv], expand=lambda x: x is not node)
+    return not inner.keys() & outer.keys()
+
+
+def _closure(nodes, expand=lambda node: True):
+    # Nodes reachable from `nodes` by id, expanding the dependencies of those satisfying `expand`
+    seen = {}
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if id(node) not in seen:
+            seen[id(node)] = node
+            if expand(node):
+                stack.extend(node._dependencies())
+    return seen
+
+
+def _supported(node):
+    if type(node) is Conditional:
+        return True
+    elif isinstance(node, Constant):
+        return _kind(node.value) is not None
+    elif isinstance(node, Ufunc):
+        return node.method == '__call__' and not node.kwargs and node.ufunc in _ufuncs
+    elif not hasattr(node, '_kernel') or node.op is not None:
+        return False
+    elif not issubclass(_defined_by(node, '_kernel'), _defined_by(node, '_sampler')):
+        # A subclass overriding the sampler of a supported distribution is not supported
+        return False
+    spec = node._kernel()
+    return spec is not None and all(_kind(p) is not None for p in spec[1:])
+
+
+def _defined_by(node, name):
+    return next(cls for cls in type(node).__mro__ if name in cls.__dict__)
+
+
+def _kind(value):
+    if np.ndim(value) != 0:
+        return None
+    value = np.asarray(value)
+    return {'b': 'b', 'i': 'i', 'u': 'i', 'f': 'f'}.get(value.dtype.kind)
+
+
+def _literal(value):
+    value = np.asarray(value)[()]
+    if value.dtype.kind == 'b':
+        return repr(bool(value))
+    elif value.dtype.kind in 'iu':
+        return repr(int(value))
+    elif math.isfinite(value):
+        return repr(float(value))
+    return 'np.nan' if math.isnan(value) else ('np.inf' if value > 0 else '-np.inf')
+
+
+def jit(rv):
+    """
+    Compiles a random variable to a sampling kernel.
+
+    See `Kernel` for the supported nodes.
+
+    :param rv: RandomVariable
+    :return: Kernel
+    """
+    return Kernel(rv)
@@ -8,6 +8,8 @@ class Node:
         The input nodes.
     """
 
+    __slots__ = ('op', 'parents')
+
     def __init__(self, op=None, *parents):
         self.parents = parents
         if op is not None and not callable(op):
@@ -7,9 +7,14 @@ Random variables are defined as nodes in a computational graph that obey arithme
 
 import copy
 import functools
+import inspect
+import itertools
+import math
+import operator
 import warnings
 
 import numpy as np
+import scipy.signal as signal
 from numpy.lib.mixins import NDArrayOperatorsMixin
 
 from .._exceptions import ConditionError, ConvergenceWarning
@@ -20,11 +25,16 @@ class RandomVariable(Node, NDArrayOperatorsMixin):
     """
     A random variable.
     """
+    __slots__ = ('_offset', 'shape_', '_current_seed', '_current_val')
+
     _generator = np.random.default_rng(0)
 
     # NumPy max seed
     _max_seed = 2 ** 32 - 1
 
+    # Default dtypes of batches of samples of distributions, by kind (see `set_dtype`)
+    _dtypes = {'f': np.dtype(np.float64), 'i': np.dtype(np.int64)}
+
     def __init__(self, op=None, *parents):
         super().__init__(op, *parents)
 
@@ -44,7 +54,11 @@ class RandomVariable(Node, NDArrayOperatorsMixin):
         return obj
 
     def make_independent(self):
-        self._offset = self._generator.integers(self._max_seed)
+        self._offset = int(self._generator.integers(self._max_seed))
+
+    def _dependencies(self):
+        # The random variables that samples of this random variable depend on
+        return self.parents
 
     def given(self, *conditions):
         """
@@ -80,12 +94,78 @@ class RandomVariable(Node, NDArrayOperatorsMixin):
             return seed
         return cls._generator.integers(cls._max_seed)
 
+    @classmethod
+    def _seeds(cls, seed, n):
+        # The seeds of `n` successive scalar samples starting from `seed`
+        return (seed + np.arange(n, dtype=np.int64)) % cls._max_seed
+
     def _default_op(self, *args):
         return self._sampler(*args)
 
     def _sampler(self, seed):
         raise NotImplementedError("_sampler not defined")
 
+    # --------------------------- Batch sampling --------------------------- #
+
+    def sample(self, n, seed=None):
+        """
+        Returns `n` independent samples of the random variable.
+
+        The samples are stacked along the first axis of the returned array.
+        Nodes that provide vectorized implementations are evaluated once for
+        the entire batch; all others are evaluated sample by sample.
+
+        :param n: int
+            The number of samples.
+        :param seed: int, optional
+        """
+        return self._batch(self._seed(seed), n, {})
+
+    def stream(self, chunk_size, seed=None, start=0):
+        """
+        Yields successive batches of `chunk_size` samples of the random variable.
+
+        Chunk `k` of the stream depends only on `seed` and `k`, so that a stream
+        can be resumed from any chunk by passing it as `start`. Consumed chunks
+        are not retained, so that arbitrarily many samples can be reduced in
+        constant memory (see `probly.reduce`).
+
+        :param chunk_size: int
+            The number of samples per chunk.
+        :param seed: int, optional
+        :param start: int, optional
+            The index of the first chunk.
+        """
+        seed = self._seed(seed)
+        for k in itertools.count(start):
+            yield self.sample(chunk_size, (seed + k * chunk_size) % self._max_seed)
+
+    def _batch(self, seed, n, memo):
+        seed = (seed + self._offset) % self._max_seed
+
+        # Memo is keyed by node and seed so that shared dependencies are sampled once
+        key = (id(self), seed, n)
+        if key not in memo:
+            memo[key] = self._batch_call(seed, n, memo)
+        return memo[key]
+
+    def _batch_call(self, seed, n, memo):
+        if self.op is None:
+            return self._batch_sampler(seed, n)
+        elif not self.parents:
+            return np.array([self.op(s) for s in self._seeds(seed, n)])
+        else:
+            inputs = [p._batch(seed, n, memo) for p in self.parents]
+            return self._batch_op(*inputs)
+
+    def _batch_sampler(self, seed, n):
+        # Subclasses should override with a vectorized sampler where possible
+        return np.array([self._sampler(s) for s in self._seeds(seed, n)])
+
+    def _batch_op(self, *inputs):
+        # Subclasses should override with a vectorized operation where possible
+        return np.array([self.op(*row) for row in zip(*inputs)])
+
     # ------------------------ Arrays and arithmetic ------------------------ #
 
     def __array_ufunc__(self, op, method, *inputs, **kwargs):
@@ -95,21 +175,53 @@ class RandomVariable(Node, NDArrayOperatorsMixin):
 
         # Cast inputs to RandomVariable: If not RandomVariable, treat as constant
         inputs = tuple(x if isinstance(x, RandomVariable)
-                       else RandomVariable(x) for x in inputs)
+                       else Constant(x) for x in inputs)
 
-        fcn = getattr(op, method)
-        partial = functools.partial(fcn, **kwargs)
+        return Ufunc(op, method, *inputs, **kwargs)
 
-        return RandomVariable(partial, *inputs)
+    def __array_function__(self, func, types, args, kwargs):
+        # Allows NumPy functions (e.g. np.dot or np.linalg.det) to act on
+        # RandomVariable objects, producing a single node
+        if func in _structural:
+            # Queries about shape are answered without sampling
+            args, kwargs = _substitute((args, kwargs), _placeholders((args, kwargs)))
+            return func(*args, **kwargs)
+        elif func in Reduction.names and args and isinstance(args[0], IID) and _reduces_all(func, args, kwargs):
+            # Reductions over all entries of an array of copies need not hold the array
+            return Reduction(args[0], Reduction.names[func])
+        elif func in _reductions and args and isinstance(args[0], RandomVariable):
+            arguments = _bind(func, args, kwargs)
+            a = arguments.pop('a')
+            arguments.setdefault('axis', None)
+            return Ufunc(_reductions[func], 'reduce', a, **arguments)
+        return Function(func, args, kwargs)
 
-    def __array__(self, dtype=object):
-        # Determines behaviour of np.array
-        return np.asarray(self.parents).reshape(self.shape_)
+    def __array__(self, dtype=None, copy=None):
+        # Determines behaviour of np.array: scalar random variables are entries
+        # of object arrays
+        arr = np.empty((), dtype=object)
+        arr[()] = self
+        return arr
 
     def __getitem__(self, key):
-        def op(array):
-            return array[key]
-        return RandomVariable(op, self)
+        # Indexing is pushed down towards the nodes generating the selected entries
+        # where possible, so that unselected entries are not sampled
+        taken = self._take(key)
+        return Index(self, key) if taken is None else taken
+
+    def _take(self, key):
+        # Returns a random variable whose samples are those of `self` indexed by
+        # `key` without sampling other entries, or None
+        return None
+
+    def _shape(self):
+        # Returns the shape of samples, or None if unknown
+        return None
+
+    def _sum(self, n):
+        # Returns a random variable distributed as the sum of `n` independent
+        # copies, or None if no closed form is known
+        return None
 
     # ------------------------------ Integrals ------------------------------ #
 
@@ -145,8 +257,107 @@ class RandomVariable(Node, NDArrayOperatorsMixin):
     def cdf(self, x, *args, **kwargs):
         return (self <= x).mean(*args, **kwargs)
 
+    def quantile(self, q, rel_err=0.01, num_samples=None, seed=None, chunk_size=2 ** 16):
+        """
+        Estimates quantiles from a stream of samples, in bounded memory.
+
+        By default, enough samples are drawn that the rank of each estimate is
+        within a factor of `1 + rel_err` of the rank of the true quantile,
+        counted from the nearer end of the distribution (with probability
+        about 95%). Tail quantiles thus require many samples.
+
+        :param q: float or array_like
+            Probabilities in `(0, 1)`.
+        :param rel_err: float, optional
+            The relative rank error.
+        :param num_samples: int, optional
+            The number of samples to draw.
+        :param seed: int, optional
+        :param chunk_size: int, optional
+            The number of samples held in memory at once.
+        :raises ValueError: If a probability is not in `(0, 1)`.
+        """
+        from ..lib.streaming import Quantiles, _quantile_samples, reduce
+
+        required = _quantile_samples(q, rel_err)
+        if num_samples is None:
+            num_samples = required
+        chunks = -(-num_samples // chunk_size)
+        sketch = reduce(self.stream(chunk_size, seed), Quantiles(rel_err / 2), chunks=chunks)
+        return sketch.quantile(q)
+
+    def kde(self, grid, bandwidth=None, num_samples=10 ** 6, seed=None):
+        """
+        Estimates the density on a grid by Gaussian kernel density estimation.
+
+        Samples are binned linearly onto the grid (extended by the reach of the
+        kernel) and the bin weights are convolved with the kernel by the FFT,
+        so that the estimate takes `O(n + g log g)` time for `n` samples and a
+        grid of `g` points.
+
+        Example
+        -------
+        >>> import probly as pr
+        >>> import numpy as np
+        >>> X = pr.Normal() ** 2 + pr.Exp()
+        >>> x = np.linspace(0, 10, 1001)
+        >>> f = X.kde(x)
+
+        :param grid: array_like
+            Equally spaced, increasing points.
+        :param bandwidth: float, optional
+            The (positive) standard deviation of the kernel. Default is given by
+            Silverman's rule of thumb, or the spacing of the grid if the samples
+            do not vary.
+        :param num_samples: int, optional
+        :param seed: int, optional
+        :return: numpy.ndarray
+            The estimated density at the points of the grid.
+        """
+        grid = np.asarray(grid, dtype=float)
+        if grid.ndim != 1 or len(grid) < 2:
+            raise ValueError('The grid must consist of at least two equally spaced, increasing points')
+        step = grid[1] - grid[0]
+        if not np.allclose(np.diff(grid), step) or step <= 0:
+            raise ValueError('The grid must consist of at least two equally spaced, increasing points')
+        if bandwidth is not None and not bandwidth > 0:
+            raise ValueError('The bandwidth must be positive')
+
+        x = self.sample(num_samples, seed)
+        if x.ndim != 1:
+            raise ValueError('Densities of array-valued random variables are not supported')
+        if bandwidth is None:
+            # Silverman's rule of thumb
+            spread = np.std(x)
+            iqr = np.subtract(*np.percentile(x, [75, 25])) / 1.34
+            spread = min(spread, iqr) if iqr > 0 else spread
+            bandwidth = 0.9 * spread * len(x) ** -0.2
+            if not bandwidth > 0:
+                # Samples that do not vary are spread over about one grid step
+                bandwidth = step
+
+        # Bins from `reach` steps below the grid to `reach` steps above it
+        reach = int(np.ceil(4 * bandwidth / step))
+        size = len(grid) + 2 * reach
+        position = (x - grid[0]) / step + reach
+        index = np.floor(position)
+        weight = position - index
+        keep = (index >= 0) & (index < size - 1)
+        index, weight = index[keep].astype(np.int64), weight[keep]
+        counts = (np.bincount(index, 1 - weight, minlength=size)
+                  + np.bincount(index + 1, weight, minlength=size))
+
+        offsets = np.arange(-reach, reach + 1) * step
+        kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+        # Normalized on the grid, so that mass is conserved even for small bandwidths
+        kernel /= kernel.sum() * step
+        density = signal.fftconvolve(counts, kernel, mode='same') / len(x)
+        return np.maximum(density[reach:reach + len(grid)], 0)
+
 
 class Conditional(RandomVariable):
+    __slots__ = ('rv', 'conditions')
+
     _max_attempts = 100_000
 
     def __init__(self, rv, *conditions):
@@ -154,6 +365,9 @@ class Conditional(RandomVariable):
         self.rv = rv
         self.conditions = conditions
 
+    def _dependencies(self):
+        return (self.rv,) + self.conditions
+
     def _sampler(self, seed=None):
         seed = self._seed(seed)
 
@@ -166,9 +380,648 @@ class Conditional(RandomVariable):
 
         return self.rv(seed)
 
+    def _batch_sampler(self, seed, n):
+        samples = []
+        count = 0
+        attempts = 0
+        while count < n:
+            memo = {}
+            accept = np.logical_and.reduce([rv._batch(seed, n, memo).astype(bool)
+                                            for rv in self.conditions])
+            samples.append(self.rv._batch(seed, n, memo)[accept])
+            count += samples[-1].shape[0]
+
+            seed = (seed + n) % self._max_seed
+            attempts += n
+            if count == 0 and attempts > self._max_attempts:
+                raise ConditionError("Failed to meet condition")
+
+        return np.concatenate(samples)[:n]
+
+
+class Constant(RandomVariable):
+    """
+    A constant random variable.
+
+    :param value: The constant value.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+    def _sampler(self, seed):
+        return self.value
+
+    def _batch_sampler(self, seed, n):
+        return np.broadcast_to(self.value, (n,) + np.shape(self.value))
+
+    def _shape(self):
+        return np.shape(self.value)
+
+    def _sum(self, n):
+        return Constant(n * np.asarray(self.value))
+
+
+class Array(RandomVariable):
+    """
+    An array-valued random variable whose entries are random variables.
+
+    :param shape: tuple of ints
+    :param entries: RandomVariable
+        The entries in row-major order.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, shape, *entries):
+        super().__init__(functools.partial(_entries, shape), *entries)
+        self.shape_ = shape
+
+    def _batch_op(self, *inputs):
+        stacked = np.stack(inputs, axis=1)
+        return stacked.reshape((stacked.shape[0],) + self.shape_ + stacked.shape[2:])
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.parents).reshape(self.shape_)
+
+    def _take(self, key):
+        if not _leading(key, len(self.shape_)):
+            return None
+        entries = np.empty(len(self.parents), dtype=object)
+        for (i, p) in enumerate(self.parents):
+            entries[i] = p
+        taken = entries.reshape(self.shape_)[key]
+        if not isinstance(taken, np.ndarray):
+            return _shifted(taken, self._offset)
+        arr = Array(taken.shape, *taken.flat)
+        arr._offset = self._offset
+        return arr
+
+    def _shape(self):
+        shapes = {p._shape() for p in self.parents}
+        if len(shapes) != 1 or None in shapes:
+            return None
+        return self.shape_ + shapes.pop()
+
+
+def _entries(shape, *inputs):
+    # Module level (rather than a closure) so that graphs can be pickled
+    return np.array(inputs).reshape(shape)
+
+
+class IID(RandomVariable):
+    """
+    An array of independent copies of a random variable.
+
+    Rather than storing a copy of `rv` for each entry, the offsets that
+    distinguish the copies are generated from a key and the positions of the
+    entries whenever they are needed. Evaluating an entry is equivalent to
+    evaluating the corresponding copy.
+
+    :param rv: RandomVariable
+    :param key: int
+        Determines the offsets of the copies.
+    :param shape: tuple of ints
+    :param positions: numpy.ndarray, optional
+        The (flat) positions of the entries within a larger array of copies
+        with the same key, if the array is a selection from it.
+    """
+
+    __slots__ = ('rv', 'key', 'positions')
+
+    def __init__(self, rv, key, shape, positions=None):
+        super().__init__()
+        self.rv = rv
+        self.key = key
+        self.shape_ = tuple(shape)
+        self.positions = positions
+
+    @property
+    def size(self):
+        return math.prod(self.shape_)
+
+    @property
+    def offsets(self):
+        """The offsets of the copies."""
+        return self._offsets(0, self.size).reshape(self.shape_)
+
+    def _offsets(self, start, stop):
+        # The offsets of entries `start` to `stop` in row-major order
+        if self.positions is None:
+            positions = np.arange(start, stop, dtype=np.uint64)
+        else:
+            positions = self.positions.ravel()[start:stop].astype(np.uint64)
+        return _mix(self.key, positions)
+
+    def _dependencies(self):
+        return (self.rv,)
+
+    def _sampler(self, seed):
+        samples = self._chunk_sampler(seed, 0, self.size)
+        return samples.reshape(self.shape_ + samples.shape[1:])
+
+    def _batch_sampler(self, seed, n):
+        stacked = self._chunk_batch_sampler(seed, n, 0, self.size, {})
+        return stacked.reshape((n,) + self.shape_ + stacked.shape[2:])
+
+    def _chunk_sampler(self, seed, start, stop):
+        # Bypasses the offset of `rv` in favour of those of the copies
+        return np.array([Node.__call__(self.rv, int((seed + offset) % self._max_seed))
+                         for offset in self._offsets(start, stop)])
+
+    def _chunk_batch_sampler(self, seed, n, start, stop, memo):
+        samples = [self.rv._batch_call(int((seed + offset) % self._max_seed), n, memo)
+                   for offset in self._offsets(start, stop)]
+        return np.stack(samples, axis=1)
+
+    def __array__(self, dtype=None, copy=None):
+        # Materializes the copies
+        arr = np.empty(self.shape_, dtype=object)
+        for (index, offset) in np.ndenumerate(self.offsets):
+            arr[index] = self.rv.copy()
+            arr[index]._offset = int(offset)
+        return arr
+
+    def _take(self, key):
+        if not _leading(key, len(self.shape_)):
+            return None
+
+        # Select positions without forming those of the whole array
+        coords = [np.broadcast_to(np.arange(n).reshape((-1,) + (1,) * (len(self.shape_) - d - 1)), self.shape_)[key]
+                  for (d, n) in enumerate(self.shape_)]
+        positions = np.ravel_multi_index(coords, self.shape_) if coords else np.zeros((), dtype=np.int64)
+        if self.positions is not None:
+            positions = self.positions.ravel()[positions]
+
+        if np.ndim(positions) == 0:
+            # A single copy
+            rv = self.rv.copy()
+            rv._offset = int((_mix(self.key, np.uint64(positions)) + self._offset) % self._max_seed)
+            return rv
+        iid = IID(self.rv, self.key, positions.shape, positions)
+        iid._offset = self._offset
+        return iid
+
+    def _shape(self):
+        shape = self.rv._shape()
+        return None if shape is None else self.shape_ + shape
+
+
+class Reduction(RandomVariable):
+    """
+    A reduction of all entries of an array of independent copies.
+
+    Entries are sampled and reduced in chunks, so that the array is never held
+    in memory. The result agrees with reducing the full array.
+
+    :param iid: IID
+    :param name: str
+        One of `'sum'`, `'mean'`, `'max'`, `'min'` or `'count'` (the number of
+        nonzero entries).
+    """
+
+    __slots__ = ('iid', 'name')
+
+    # The number of samples held in memory at once
+    chunk_size = 2 ** 16
+
+    names = {np.sum: 'sum', np.mean: 'mean', np.max: 'max', np.amax: 'max',
+             np.min: 'min', np.amin: 'min', np.count_nonzero: 'count'}
+
+    _partials = {'sum': np.sum, 'mean': np.sum, 'max': np.max, 'min': np.min, 'count': np.count_nonzero}
+    _combines = {'sum': np.add, 'mean': np.add, 'max': np.maximum, 'min': np.minimum, 'count': np.add}
+
+    def __init__(self, iid, name):
+        super().__init__()
+        self.iid = iid
+        self.name = name
+
+    def _dependencies(self):
+        return (self.iid,)
+
+    def _sampler(self, seed):
+        seed = (seed + self.iid._offset) % self._max_seed
+        return self._reduce(functools.partial(self.iid._chunk_sampler, seed), self.chunk_size, None)
+
+    def _batch_sampler(self, seed, n):
+        seed = (seed + self.iid._offset) % self._max_seed
+        memo = {}
+
+        def chunk_sampler(start, stop):
+            return self.iid._chunk_batch_sampler(seed, n, start, stop, memo)
+        return self._reduce(chunk_sampler, max(1, self.chunk_size // n), 1)
+
+    def _reduce(self, chunk_sampler, chunk_size, batch_axes):
+        # Reduces over all axes but the batch axis, if any
+        partial, combine = self._partials[self.name], self._combines[self.name]
+        out, count = None, 0
+        for start in range(0, self.iid.size, chunk_size):
+            chunk = chunk_sampler(start, min(start + chunk_size, self.iid.size))
+            axes = None if batch_axes is None else tuple(range(batch_axes, chunk.ndim))
+            reduced = partial(chunk, axis=axes)
+            out = reduced if out is None else combine(out, reduced)
+            count += chunk[0].size if batch_axes else chunk.size
+        if self.name == 'mean':
+            return out / count
+        return out
+
+
+def _mix(key, positions):
+    # Hashes positions to offsets (using the SplitMix64 finalizer)
+    with np.errstate(over='ignore'):
+        z = np.uint64(key) + np.asarray(positions, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z % np.uint64(RandomVariable._max_seed)).astype(np.int64)
+
+
+class Index(RandomVariable):
+    """
+    An entry or slice of an array-valued random variable.
+
+    :param rv: RandomVariable
+    :param key: Any valid NumPy index.
+    """
+
+    __slots__ = ('key',)
+
+    def __init__(self, rv, key):
+        super().__init__(operator.itemgetter(key), rv)
+        self.key = key
+
+    def _batch_op(self, array):
+        key = self.key if isinstance(self.key, tuple) else (self.key,)
+        return array[(slice(None),) + key]
+
+    def _shape(self):
+        shape = self.parents[0]._shape()
+        return None if shape is None else np.broadcast_to(0, shape)[self.key].shape
+
+
+class Ufunc(RandomVariable):
+    """
+    A random variable obtained by applying a NumPy ufunc method to random variables.
+
+    The ufunc, method and keyword arguments are kept so that the graph can be
+    inspected (e.g. to recognize comparisons with constants).
+
+    :param ufunc: numpy.ufunc
+    :param method: str
+        The ufunc method (e.g. `'__call__'` or `'reduce'`).
+    :param inputs: RandomVariable
+    """
+
+    __slots__ = ('ufunc', 'method', 'kwargs')
+
+    def __init__(self, ufunc, method, *inputs, **kwargs):
+        op = functools.partial(getattr(ufunc, method), **kwargs)
+        super().__init__(op, *inputs)
+        self.ufunc = ufunc
+        self.method = method
+        self.kwargs = kwargs
+
+    def _batch_call(self, seed, n, memo):
+        if self.method != '__call__':
+            return super()._batch_call(seed, n, memo)
+
+        # Constants are left unbatched so that NumPy can use its fast paths for scalars
+        batched = [not isinstance(p, Constant) for p in self.parents]
+        inputs = [p._batch(seed, n, memo) if b else p.value for (p, b) in zip(self.parents, batched)]
+        return self._call(n, inputs, batched)
+
+    def _batch_op(self, *inputs):
+        if self.method == '__call__':
+            return self._call(len(inputs[0]), inputs, [True] * len(inputs))
+        elif self.method in ('reduce', 'accumulate'):
+            x, = inputs
+            kwargs = dict(self.kwargs)
+            kwargs['axis'] = _shift_axis(kwargs.get('axis', 0), np.ndim(x))
+            return getattr(self.ufunc, self.method)(x, **kwargs)
+        return super()._batch_op(*inputs)
+
+    def _take(self, key):
+        # Elementwise operations commute with indexing when no input is broadcast
+        shape = self._shape()
+        if self.method != '__call__' or shape is None or not _leading(key, len(shape)):
+            return None
+
+        inputs = []
+        for p in self.parents:
+            if isinstance(p, Constant) and np.ndim(p.value) == 0:
+                inputs.append(p)
+            elif p._shape() != shape:
+                return None
+            elif isinstance(p, Constant):
+                inputs.append(Constant(np.asarray(p.value)[key]))
+            else:
+                inputs.append(p[key])
+        ufunc = Ufunc(self.ufunc, self.method, *inputs, **self.kwargs)
+        ufunc._offset = self._offset
+        return ufunc
+
+    def _shape(self):
+        shapes = [p._shape() for p in self.parents]
+        if self.method != '__call__' or None in shapes:
+            return None
+        return np.broadcast_shapes(*shapes)
+
+    @staticmethod
+    def _aligned(n, inputs, batched):
+        # Align sample shapes to the right so that they broadcast as in the scalar case
+        ndim = max(np.ndim(x) - b for (x, b) in zip(inputs, batched))
+        return [np.reshape(x, (n,) + (1,) * (ndim + 1 - np.ndim(x)) + np.shape(x)[1:]) if b else x
+                for (x, b) in zip(inputs, batched)]
+
+    def _fast_power(self, inputs, batched):
+        # The power operator is much faster than np.power for small integer exponents
+        return self.ufunc is np.power and not self.kwargs and not batched[1] and np.ndim(inputs[1]) == 0
+
+    def _call(self, n, inputs, batched):
+        inputs = self._aligned(n, inputs, batched)
+
+        if not any(batched):
+            out = self.ufunc(*inputs, **self.kwargs)
+            return np.broadcast_to(out, (n,) + np.shape(out))
+        elif self._fast_power(inputs, batched):
+            return inputs[0] ** inputs[1]
+        return self.ufunc(*inputs, **self.kwargs)
+
+
+class Function(RandomVariable):
+    """
+    A random variable obtained by applying a NumPy function to random variables.
+
+    Random variables may appear anywhere among the arguments, including inside
+    lists and tuples (as in `np.concatenate`). Batches are computed by a single
+    call to the function where it is known to act on stacked arrays (as do the
+    functions of `np.linalg`) or to take an `axis` argument, and one sample at
+    a time otherwise.
+
+    :param func: callable
+        A NumPy function.
+    :param args: tuple
+    :param kwargs: dict
+    """
+
+    __slots__ = ('func', 'args', 'kwargs')
+
+    def __init__(self, func, args, kwargs):
+        parents = []
+        _collect((args, kwargs), parents)
+        op = functools.partial(_apply, func, args, kwargs)
+        super().__init__(op, *parents)
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+    def _batch_op(self, *inputs):
+        batch_function = _batch_functions.get(self.func)
+        if batch_function is not None:
+            arguments = _bind(self.func, *_substitute((self.args, self.kwargs), iter(inputs)))
+            original = _bind(self.func, self.args, self.kwargs)
+            batched = {name for (name, value) in original.items() if _collect(value, [])}
+            out = batch_function(self.func, arguments, batched, original)
+            if out is not NotImplemented:
+                return out
+        return super()._batch_op(*inputs)
+
+
+def _apply(func, args, kwargs, *inputs):
+    args, kwargs = _substitute((args, kwargs), iter(inputs))
+    return func(*args, **kwargs)
+
+
+def _collect(obj, rvs):
+    # Appends the random variables found in nested lists, tuples and dicts
+    if isinstance(obj, RandomVariable):
+        rvs.append(obj)
+    elif isinstance(obj, (list, tuple)):
+        for x in obj:
+            _collect(x, rvs)
+    elif isinstance(obj, dict):
+        for x in obj.values():
+            _collect(x, rvs)
+    return rvs
+
+
+def _substitute(obj, inputs):
+    # Replaces the random variables found by `_collect` with successive inputs
+    if isinstance(obj, RandomVariable):
+        return next(inputs)
+    elif isinstance(obj, (list, tuple)):
+        return type(obj)(_substitute(x, inputs) for x in obj)
+    elif isinstance(obj, dict):
+        return {key: _substitute(x, inputs) for (key, x) in obj.items()}
+    return obj
+
+
+def _placeholders(obj):
+    return (np.broadcast_to(0., rv.shape_) for rv in _collect(obj, []))
+
+
+# Signatures of NumPy functions implemented in C
+_signatures = {
+    np.dot: inspect.signature(lambda a, b, out=None: None),
+    np.concatenate: inspect.signature(lambda arrays, axis=0, out=None, dtype=None, casting='same_kind': None),
+}
+
+
+def _signature(func):
+    return _signatures.get(func) or inspect.signature(func)
+
+
+def _bind(func, args, kwargs):
+    # Arguments by parameter name
+    return dict(_signature(func).bind(*args, **kwargs).arguments)
+
+
+def _invoke(func, arguments):
+    bound = _signature(func).bind(**arguments)
+    return func(*bound.args, **bound.kwargs)
+
+
+def _reduces_all(func, args, kwargs):
+    # Whether only the array, and no axis, is specified
+    arguments = _bind(func, args, kwargs)
+    return arguments.keys() <= {'a', 'axis'} and arguments.get('axis') is None
+
+
+_structural = {np.ndim, np.shape, np.size}
+
+_reductions = {
+    np.sum: np.add, np.prod: np.multiply, np.all: np.logical_and, np.any: np.logical_or,
+    np.max: np.maximum, np.amax: np.maximum, np.min: np.minimum, np.amin: np.minimum,
+}
+
+# Batched implementations, keyed by function. Each takes the function, its
+# arguments (with batches in place of random variables), the names of the
+# batched arguments, and the original arguments, and may return NotImplemented.
+_batch_functions = {}
+
+
+def _batch_function(*funcs):
+    def register(batch_function):
+        for func in funcs:
+            _batch_functions[func] = batch_function
+        return batch_function
+    return register
+
+
+@_batch_function(np.linalg.det, np.linalg.inv, np.linalg.eigvals, np.linalg.eigvalsh,
+                 np.linalg.cholesky, np.linalg.pinv, np.linalg.matrix_power)
+def _stacked(func, arguments, batched, original):
+    # These act on the last two axes
+    if batched != {'a'}:
+        return NotImplemented
+    return _invoke(func, arguments)
+
+
+@_batch_function(np.dot)
+def _dot(func, arguments, batched, original):
+    if 'out' in arguments:
+        return NotImplemented
+    a, b = arguments['a'], arguments['b']
+    ndims = (np.ndim(a) - ('a' in batched), np.ndim(b) - ('b' in batched))
+    subscripts = {(1, 1): ('i', 'i', ''), (1, 2): ('i', 'ij', 'j'),
+                  (2, 1): ('ij', 'j', 'i'), (2, 2): ('ij', 'jk', 'ik')}
+    if ndims not in subscripts:
+        return NotImplemented
+    sa, sb, out = subscripts[ndims]
+    sa = 'n' + sa if 'a' in batched else sa
+    sb = 'n' + sb if 'b' in batched else sb
+    return np.einsum('{},{}->n{}'.format(sa, sb, out), a, b)
+
+
+@_batch_function(np.mean, np.std, np.var, np.median, np.cumsum, np.cumprod, np.sort)
+def _along_axis(func, arguments, batched, original):
+    if batched != {'a'} or 'out' in arguments:
+        return NotImplemented
+    a = arguments['a']
+    axis = arguments.get('axis', _signature(func).parameters['axis'].default)
+    if axis is None and func in (np.cumsum, np.cumprod, np.sort):
+        # These act on the flattened sample
+        a, axis = np.reshape(a, (len(a), -1)), 0
+    arguments.update(a=a, axis=_shift_axis(axis, np.ndim(a)))
+    return _invoke(func, arguments)
+
+
+@_batch_function(np.concatenate, np.stack)
+def _join(func, arguments, batched, original):
+    arrays = original['arrays']
+    if batched != {'arrays'} or not all(isinstance(x, RandomVariable) for x in arrays) \
+            or 'out' in arguments:
+        return NotImplemented
+    arrays = arguments['arrays']
+    axis = arguments.get('axis', 0)
+    if axis is None:
+        arrays, axis = [np.reshape(x, (len(x), -1)) for x in arrays], 0
+    ndim = max(np.ndim(x) for x in arrays) + (func is np.stack)
+    arguments.update(arrays=arrays, axis=_shift_axis(axis, ndim))
+    return _invoke(func, arguments)
+
+
+@_batch_function(np.transpose)
+def _transpose(func, arguments, batched, original):
+    if batched != {'a'}:
+        return NotImplemented
+    a = arguments['a']
+    axes = arguments.get('axes')
+    ndim = np.ndim(a) - 1
+    axes = reversed(range(ndim)) if axes is None else (x % ndim for x in axes)
+    return np.transpose(a, (0,) + tuple(x + 1 for x in axes))
+
+
+@_batch_function(np.trace, np.diagonal)
+def _trace(func, arguments, batched, original):
+    if batched != {'a'} or 'out' in arguments:
+        return NotImplemented
+    ndim = np.ndim(arguments['a'])
+    arguments['axis1'] = _shift_axis(arguments.get('axis1', 0), ndim)
+    arguments['axis2'] = _shift_axis(arguments.get('axis2', 1), ndim)
+    return _invoke(func, arguments)
+
+
+@_batch_function(np.reshape)
+def _reshape(func, arguments, batched, original):
+    if batched != {'a'}:
+        return NotImplemented
+    a = arguments['a']
+    arguments['newshape'] = (len(a),) + tuple(np.atleast_1d(arguments['newshape']))
+    return _invoke(func, arguments)
+
+
+def _leading(key, ndim):
+    # Whether `key` only indexes (some of) the first `ndim` axes
+    key = key if isinstance(key, tuple) else (key,)
+    count = 0
+    for k in key:
+        if k is None or k is Ellipsis or isinstance(k, RandomVariable):
+            return False
+        count += np.ndim(k) if np.asarray(k).dtype == bool else 1
+    return count <= ndim
+
+
+def _shifted(rv, offset):
+    # A random variable sampled like `rv` with seeds shifted by `offset`
+    if offset == 0:
+        return rv
+    shifted = rv.copy()
+    shifted._offset = (rv._offset + offset) % rv._max_seed
+    return shifted
+
+
+def _shift_axis(axis, ndim):
+    # Maps an axis of a sample to the corresponding axis of a batch of samples
+    if axis is None:
+        return tuple(range(1, ndim))
+    elif isinstance(axis, tuple):
+        return tuple(_shift_axis(a, ndim) for a in axis)
+    return axis + 1 if axis >= 0 else axis
+
 
 def seed(seed=None):
     """
     Seeds the current Probly session.
     """
     RandomVariable._generator = np.random.default_rng(seed)
+
+
+def set_dtype(float=None, int=None):
+    """
+    Sets the dtypes of batches of samples of distributions.
+
+    Samples of continuous distributions are produced with the floating point
+    dtype `float`, and those of discrete distributions with the integer dtype
+    `int`. Single precision samples of `Gamma`, `ChiSquared`, `Exp`, `Unif`
+    and univariate `Normal` distributions are generated directly, whereas those
+    of other distributions are generated in double precision and converted.
+    The dtypes of individual distributions can be set through their `dtype`
+    attribute.
+
+    Scalar samples (i.e. those returned by calling a random variable) are not affected.
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> import numpy as np
+    >>> pr.set_dtype(float=np.float32, int='auto')
+    >>> pr.Normal().sample(10).dtype
+    dtype('float32')
+    >>> pr.Bin(100).sample(10).dtype
+    dtype('int8')
+
+    :param float: dtype, optional
+        The dtype of samples of continuous distributions. Default is unchanged.
+    :param int: dtype or str, optional
+        The dtype of samples of discrete distributions, or `'auto'` to use the
+        narrowest integer dtype that holds the support of each distribution
+        (where it is bounded). Default is unchanged.
+    """
+    if float is not None:
+        RandomVariable._dtypes['f'] = np.dtype(float)
+    if int is not None:
+        RandomVariable._dtypes['i'] = int if isinstance(int, str) and int == 'auto' else np.dtype(int)
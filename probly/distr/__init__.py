@@ -2,7 +2,7 @@ from .distributions import Distribution, model
 
 # Discrete random variables
 from .discrete import RandInt
-from .discrete import Multinomial, Bin, Ber
+from .discrete import Multinomial, Bin, Ber, Categorical
 from .discrete import NegBin, Geom
 from .discrete import HyperGeom, Pois
 
@@ -17,10 +17,14 @@ from .continuous import Laplace, Logistic, VonMises
 # Random matrices
 from .matrix import Wigner, Wishart
 
+# Exact and numerical distributions
+from .exact import exact
+from .fourier import Tabulated, density
+
 # Discrete random variables
 __all__ = ['Distribution', 'model']
 __all__ += ['RandInt']
-__all__ += ['Multinomial', 'Bin', 'Ber']
+__all__ += ['Multinomial', 'Bin', 'Ber', 'Categorical']
 __all__ += ['NegBin', 'Geom']
 __all__ += ['HyperGeom', 'Pois']
 
@@ -34,3 +38,7 @@ __all__ += ['Laplace', 'Logistic', 'VonMises']
 
 # Random matrices
 __all__ += ['Wigner', 'Wishart']
+
+# Exact and numerical distributions
+__all__ += ['exact']
+__all__ += ['Tabulated', 'density']
@@ -0,0 +1,213 @@
+"""
+Lookup tables for fast sampling from discrete distributions.
+
+Both kinds of table map uniform samples on `[0, 1)` to samples of a discrete
+distribution, so they serve the scalar and the batch sampling paths alike.
+
+Guide tables are only worth building for parameters that are sampled more than
+once. Distributions whose parameters are themselves random are constructed
+anew for every sample, so their samples are instead obtained by evaluating the
+quantile function directly, which maps uniform samples to the same outcomes.
+"""
+
+import collections
+import functools
+import threading
+
+import numpy as np
+import scipy.special as special
+import scipy.stats as stats
+
+# Tables are only built for supports of at most this size
+_max_size = 2 ** 16
+
+# Probability mass left outside the support covered by a guide table
+_tail = 1e-15
+
+
+class AliasTable:
+    """
+    Walker's alias table for a distribution on `{0, ..., k - 1}`.
+
+    Built in `O(k)` time using Vose's method; each sample then takes `O(1)` time.
+
+    :param pvals: array_like
+        Probabilities of the outcomes `0, ..., k - 1`.
+    """
+
+    def __init__(self, pvals):
+        pvals = np.asarray(pvals, dtype=float)
+        k = len(pvals)
+        scaled = list(pvals * (k / pvals.sum()))
+
+        self.prob = np.ones(k)
+        self.alias = np.arange(k)
+
+        small = [i for (i, q) in enumerate(scaled) if q < 1]
+        large = [i for (i, q) in enumerate(scaled) if q >= 1]
+        while small and large:
+            i, j = small.pop(), large.pop()
+            self.prob[i] = scaled[i]
+            self.alias[i] = j
+            scaled[j] -= 1 - scaled[i]
+            (small if scaled[j] < 1 else large).append(j)
+
+    def __len__(self):
+        return len(self.prob)
+
+    def lookup(self, u):
+        """
+        Maps uniform samples `u` to outcomes.
+
+        A single uniform sample selects both a column and whether to take its alias.
+        """
+        x = np.multiply(u, len(self))
+        i = np.floor(x).astype(np.int64)
+        return np.where(x - i < self.prob[i], i, self.alias[i])
+
+
+class GuideTable:
+    """
+    A guide table for inverse transform sampling of an integer-valued distribution.
+
+    The guide table of Chen and Asau records, for each of `m` equal subintervals
+    of `[0, 1)`, the first outcome whose cumulative probability reaches it, so
+    that each inversion takes `O(1)` expected time.
+
+    :param start: int
+        The smallest outcome covered by the table.
+    :param pmf: array_like
+        Probabilities of the outcomes `start, start + 1, ...`.
+    :param ppf: callable
+        Exact quantile function, used for the negligible mass outside the table.
+    :param lower: float, optional
+        Probability of outcomes less than `start`.
+    """
+
+    def __init__(self, start, pmf, ppf, lower=0):
+        self.start = start
+        self.ppf = ppf
+        self.lower = lower
+        self.cdf = lower + np.cumsum(pmf)
+
+        m = len(self.cdf)
+        self.guide = np.searchsorted(self.cdf, np.arange(m) / m)
+        self.guide = np.minimum(self.guide, m - 1)
+
+    def lookup(self, u):
+        """Maps uniform samples `u` to outcomes."""
+        if np.ndim(u) == 0:
+            if not self.lower < u < self.cdf[-1]:
+                return int(self.ppf(u))
+            i = self.guide[int(u * len(self.guide))]
+            while self.cdf[i] < u:
+                i += 1
+            return self.start + int(i)
+
+        u = np.asarray(u)
+        i = self.guide[(u * len(self.guide)).astype(np.int64)]
+        behind = self.cdf[i] < u
+        while behind.any():
+            i = np.minimum(i + behind, len(self.cdf) - 1)
+            behind &= self.cdf[i] < u
+        out = self.start + i
+
+        tail = (u <= self.lower) | (u >= self.cdf[-1])
+        if tail.any():
+            out[tail] = self.ppf(u[tail])
+        return out
+
+
+def _guide_table(distr, *params):
+    lo = int(distr.ppf(_tail, *params))
+    hi = int(distr.isf(_tail, *params))
+    if hi - lo >= _max_size:
+        return None
+
+    support = np.arange(lo, hi + 1)
+    lower = distr.cdf(lo - 1, *params) if lo > 0 else 0
+    return GuideTable(lo, distr.pmf(support, *params),
+                      functools.partial(_ppf, distr, params), lower)
+
+
+def _ppf(distr, params, u):
+    return distr.ppf(u, *params).astype(np.int64)
+
+
+class TableCache:
+    """
+    A cache of guide tables keyed by parameters.
+
+    A table is built the second time its parameters are requested, or the first
+    time if they are requested for a batch, so that parameters that are used
+    only once (as when they are sampled from other random variables) never pay
+    for a table.
+
+    :param build: callable
+        Builds the table for given parameters, or returns `None` if the table
+        would be too large.
+    :param maxsize: int, optional
+        The number of tables, and of parameters requested once, that are kept.
+    """
+
+    def __init__(self, build, maxsize=128):
+        self.build = build
+        self.maxsize = maxsize
+        self.tables = collections.OrderedDict()
+        self.requested = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, *params, reuse=False):
+        """
+        Returns the table for `params`, or `None` if none is available.
+
+        :param params: The parameters of the distribution.
+        :param reuse: bool, optional
+            Whether the table is known to be used more than once.
+        """
+        with self.lock:
+            if params in self.tables:
+                self.tables.move_to_end(params)
+                return self.tables[params]
+            if not reuse and params not in self.requested:
+                _remember(self.requested, params, True, self.maxsize)
+                return None
+            self.requested.pop(params, None)
+
+        table = self.build(*params)
+        with self.lock:
+            _remember(self.tables, params, table, self.maxsize)
+        return table
+
+    def clear(self):
+        with self.lock:
+            self.tables.clear()
+            self.requested.clear()
+
+
+def _remember(cache, key, value, maxsize):
+    cache[key] = value
+    if len(cache) > maxsize:
+        cache.popitem(last=False)
+
+
+binomial_tables = TableCache(functools.partial(_guide_table, stats.binom))
+poisson_tables = TableCache(functools.partial(_guide_table, stats.poisson))
+
+
+def binomial_ppf(u, n, p):
+    """The quantile function of `Bin(n, p)`, without the overhead of `scipy.stats`."""
+    if not 0 < p < 1:
+        return stats.binom.ppf(u, n, p).astype(np.int64)
+    k = np.ceil(special.bdtrik(u, n, p))
+    below = np.maximum(k - 1, 0)
+    return np.where(special.bdtr(below, n, p) >= u, below, k).astype(np.int64)
+
+
+def poisson_ppf(u, rate):
+    """The quantile function of `Pois(rate)`, without the overhead of `scipy.stats`."""
+    if not rate > 0:
+        return stats.poisson.ppf(u, rate).astype(np.int64)
+    k = np.ceil(special.pdtrik(u, rate))
+    below = np.maximum(k - 1, 0)
+    return np.where(special.pdtr(below, rate) >= u, below, k).astype(np.int64)
@@ -1,9 +1,26 @@
 import numpy as np
+import scipy.special as special
 import scipy.stats as stats
 
 from .distributions import Distribution
 
 
+def _where(condition, x, y):
+    # Like np.where, but returns scalars for scalar inputs
+    return np.where(condition, x, y)[()]
+
+
+# Generators produce single precision samples of the standard distributions directly
+
+def _single(distr):
+    return distr._dtype('f') == np.float32
+
+
+def _float32(x):
+    # Scalar parameters may have promoted samples to double precision
+    return x.astype(np.float32, copy=False)
+
+
 # ------------------------------ Gamma family ------------------------------ #
 
 class Gamma(Distribution):
@@ -23,27 +40,67 @@ class Gamma(Distribution):
         Scale parameter.
     """
 
+    __slots__ = ('shape', 'scale', 'rate')
+    _params = ('shape', 'scale')
+
     def __init__(self, shape, scale):
-        self.shape_ = shape
+        self.shape = shape
         self.scale = scale
         self.rate = 1 / scale
         super().__init__()
 
     def _sampler(self, seed):
         np.random.seed(seed)
-        return np.random.gamma(self.shape_, self.scale)
+        return np.random.gamma(self.shape, self.scale)
+
+    def _batch_sampler(self, seed, n):
+        rng = np.random.default_rng(seed)
+        if _single(self):
+            return _float32(rng.standard_gamma(self.shape, n, dtype=np.float32) * self.scale)
+        return rng.gamma(self.shape, self.scale, n)
+
+    def _kernel(self):
+        return ('gamma', self.shape, self.scale)
+
+    def _sum(self, n):
+        return Gamma(n * self.shape, self.scale)
+
+    def _pathwise(self, x, name):
+        if name == 'scale':
+            return x / self.scale
+        return super()._pathwise(x, name)
+
+    def pdf(self, x):
+        return np.exp(self.logpdf(x))
+
+    def logpdf(self, x):
+        y = np.maximum(x, 0) / self.scale
+        logp = special.xlogy(self.shape - 1, y) - y - special.gammaln(self.shape) - np.log(self.scale)
+        return _where(np.less(x, 0), -np.inf, logp)
 
     def cdf(self, x, *args, **kwargs):
-        return stats.gamma.cdf(x, self.shape_, scale=self.scale)
+        return special.gammainc(self.shape, np.maximum(x, 0) / self.scale)[()]
+
+    def sf(self, x):
+        return special.gammaincc(self.shape, np.maximum(x, 0) / self.scale)[()]
+
+    def ppf(self, q):
+        return (self.scale * special.gammaincinv(self.shape, q))[()]
+
+    def isf(self, q):
+        return (self.scale * special.gammainccinv(self.shape, q))[()]
+
+    def cf(self, t):
+        return (1 - 1j * self.scale * np.asarray(t)) ** -self.shape
 
     def mean(self, **kwargs):
-        return self.shape_ * self.scale
+        return self.shape * self.scale
 
     def variance(self, *args, **kwargs):
-        self.shape_ * self.scale ** 2
+        return self.shape * self.scale ** 2
 
     def __str__(self):
-        return 'Gamma(shape={}, scale={})'.format(self.shape_, self.scale)
+        return 'Gamma(shape={}, scale={})'.format(self.shape, self.scale)
 
 
 class ChiSquared(Gamma):
@@ -56,6 +113,8 @@ class ChiSquared(Gamma):
         Number of degrees of freedom.
     """
 
+    __slots__ = ('k',)
+
     def __init__(self, k):
         self.k = k
 
@@ -69,6 +128,18 @@ class ChiSquared(Gamma):
         np.random.seed(seed)
         return np.random.chisquare(self.k)
 
+    def _batch_sampler(self, seed, n):
+        rng = np.random.default_rng(seed)
+        if _single(self):
+            return _float32(2 * rng.standard_gamma(self.k / 2, n, dtype=np.float32))
+        return rng.chisquare(self.k, n)
+
+    def _kernel(self):
+        return ('chisquare', self.k)
+
+    def _pathwise(self, x, name):
+        return super()._pathwise(x, 'shape') / 2 if name == 'k' else None
+
     def cdf(self, x, *args, **kwargs):
         return super().cdf(x)
 
@@ -76,7 +147,7 @@ class ChiSquared(Gamma):
         return self.k
 
     def variance(self, *args, **kwargs):
-        2 * self.k
+        return 2 * self.k
 
     def __str__(self):
         return 'ChiSquared({})'.format(self.k)
@@ -92,19 +163,47 @@ class Exp(Gamma):
         Rate parameter.
     """
 
+    __slots__ = ()
+
     def __init__(self, rate=1):
         shape = 1
-        scale = 1 / float(rate)
+        scale = 1 / np.asarray(rate, dtype=float)
 
         super().__init__(shape, scale)
 
     # A bit faster than using np.random.gamma
     def _sampler(self, seed):
         np.random.seed(seed)
-        return np.random.exponential(self.rate)
+        return np.random.exponential(self.scale)
+
+    def _batch_sampler(self, seed, n):
+        rng = np.random.default_rng(seed)
+        if _single(self):
+            return _float32(rng.standard_exponential(n, dtype=np.float32) * self.scale)
+        return rng.exponential(self.scale, n)
+
+    def _kernel(self):
+        return ('exponential', self.scale)
+
+    def logpdf(self, x):
+        return _where(np.less(x, 0), -np.inf, np.log(self.rate) - self.rate * np.asarray(x))
+
+    def _pathwise(self, x, name):
+        if name == 'rate':
+            return -x / self.rate
+        return x / self.scale if name == 'scale' else None
 
     def cdf(self, x, *args, **kwargs):
-        return 1 - np.exp(-self.rate * x)
+        return -np.expm1(-self.rate * np.maximum(x, 0))[()]
+
+    def sf(self, x):
+        return np.exp(-self.rate * np.maximum(x, 0))[()]
+
+    def ppf(self, q):
+        return (-np.log1p(-np.asarray(q)) / self.rate)[()]
+
+    def isf(self, q):
+        return (-np.log(q) / self.rate)[()]
 
     def mean(self, **kwargs):
         return 1 / self.rate
@@ -130,6 +229,9 @@ class Unif(Distribution):
         Right endpoint of the support interval.
     """
 
+    __slots__ = ('a', 'b')
+    _params = ('a', 'b')
+
     def __init__(self, a=0, b=1):
         self.a = a
         self.b = b
@@ -139,19 +241,50 @@ class Unif(Distribution):
         np.random.seed(seed)
         return np.random.uniform(self.a, self.b)
 
-    def cdf(self, x, *args, **kwargs):
-        if x <= self.a:
-            return 0
-        elif x <= self.b:
+    def _batch_sampler(self, seed, n):
+        rng = np.random.default_rng(seed)
+        if _single(self):
+            return _float32(self.a + (self.b - self.a) * rng.random(n, dtype=np.float32))
+        return rng.uniform(self.a, self.b, n)
+
+    def _kernel(self):
+        return ('uniform', self.a, self.b)
+
+    def _pathwise(self, x, name):
+        if name == 'a':
+            return (self.b - x) / (self.b - self.a)
+        elif name == 'b':
             return (x - self.a) / (self.b - self.a)
-        else:
-            return 1
+
+    def pdf(self, x):
+        inside = (self.a <= np.asarray(x)) & (np.asarray(x) <= self.b)
+        return _where(inside, 1 / (self.b - self.a), 0.)
+
+    def logpdf(self, x):
+        with np.errstate(divide='ignore'):
+            return np.log(self.pdf(x))
+
+    def cdf(self, x, *args, **kwargs):
+        return np.clip((np.asarray(x) - self.a) / (self.b - self.a), 0, 1)[()]
+
+    def sf(self, x):
+        return np.clip((self.b - np.asarray(x)) / (self.b - self.a), 0, 1)[()]
+
+    def ppf(self, q):
+        return (self.a + np.asarray(q) * (self.b - self.a))[()]
+
+    def isf(self, q):
+        return (self.b - np.asarray(q) * (self.b - self.a))[()]
+
+    def cf(self, t):
+        t = np.asarray(t)
+        return np.exp(0.5j * (self.a + self.b) * t) * np.sinc((self.b - self.a) * t / (2 * np.pi))
 
     def mean(self, **kwargs):
         return (self.a + self.b) / 2
 
     def variance(self, *args, **kwargs):
-        (self.b - self.a) ** 2 / 12
+        return (self.b - self.a) ** 2 / 12
 
     def __str__(self):
         return 'Unif({}, {})'.format(self.a, self.b)
@@ -173,6 +306,9 @@ class Normal(Distribution):
         Dimension of the ambient space.
     """
 
+    __slots__ = ('mu', 'cov', 'dim', 'shape')
+    _params = ('mu', 'cov')
+
     def __init__(self, mu=0, cov=1, dim=1):
         self.dim = dim
         self.mu = mu
@@ -194,10 +330,57 @@ class Normal(Distribution):
         else:
             return np.random.multivariate_normal(self.mu, self.cov, self.dim)
 
+    def _batch_sampler(self, seed, n):
+        rng = np.random.default_rng(seed)
+        if self.dim == 1 and _single(self):
+            return _float32(self.mu + np.sqrt(self.cov) * rng.standard_normal(n, dtype=np.float32))
+        elif self.dim == 1:
+            return rng.normal(self.mu, np.sqrt(self.cov), n)
+        else:
+            return rng.multivariate_normal(self.mu, self.cov, (n, self.dim))
+
+    def _kernel(self):
+        return ('normal', self.mu, np.sqrt(self.cov)) if self.dim == 1 else None
+
+    def _pathwise(self, x, name):
+        if self.dim > 1:
+            return None
+        elif name == 'mu':
+            return np.ones_like(x)
+        elif name == 'cov':
+            return (x - self.mu) / (2 * self.cov)
+
+    def pdf(self, x):
+        return np.exp(self.logpdf(x))
+
+    def logpdf(self, x):
+        if self.dim > 1:
+            return stats.multivariate_normal.logpdf(x, self.mu, self.cov)
+        z = (np.asarray(x) - self.mu) / np.sqrt(self.cov)
+        return (-z ** 2 / 2 - np.log(np.sqrt(2 * np.pi * self.cov)))[()]
+
     def cdf(self, x, *args, **kwargs):
-        if self.dim == 1:
-            return stats.norm.cdf(x, self.mu, self.cov)
-        return stats.multivariate_normal.cdf(x, self.mu, self.cov)
+        if self.dim > 1:
+            return stats.multivariate_normal.cdf(x, self.mu, self.cov)
+        return special.ndtr((np.asarray(x) - self.mu) / np.sqrt(self.cov))[()]
+
+    # The following methods only apply to the one-dimensional case
+
+    def sf(self, x):
+        return special.ndtr((self.mu - np.asarray(x)) / np.sqrt(self.cov))[()]
+
+    def ppf(self, q):
+        return (self.mu + np.sqrt(self.cov) * special.ndtri(q))[()]
+
+    def isf(self, q):
+        return (self.mu - np.sqrt(self.cov) * special.ndtri(q))[()]
+
+    def cf(self, t):
+        t = np.asarray(t)
+        if self.dim > 1:
+            # Vectors `t` along the last axis
+            return np.exp(1j * t @ self.mu - np.einsum('...i,ij,...j->...', t, self.cov, t) / 2)
+        return np.exp(1j * self.mu * t - self.cov * t ** 2 / 2)
 
     def mean(self, **kwargs):
         return self.mu
@@ -205,6 +388,62 @@ class Normal(Distribution):
     def variance(self, *args, **kwargs):
         return self.cov
 
+    def _truncatable(self):
+        return self.dim == 1 and not self._param_shape()
+
+    def _param_shape(self):
+        # The mean and covariance of a multivariate normal are not swept
+        return super()._param_shape() if self.dim == 1 else ()
+
+    def _shape(self):
+        return self._param_shape() if self.dim == 1 else self.shape
+
+    def _sum(self, n):
+        return Normal(n * self.mu, n * self.cov) if self.dim == 1 else None
+
+    def _truncated_sampler(self, u, a, b):
+        # Inverts the survival function in log space, so that draws remain exact
+        # for intervals far out in the tails where `sf` underflows
+        sd = np.sqrt(self.cov)
+        alpha, beta = (a - self.mu) / sd, (b - self.mu) / sd
+        if alpha > 0:
+            log_hi, log_lo = special.log_ndtr(-alpha), special.log_ndtr(-beta)
+            log_q = log_hi + np.log1p(-u * -np.expm1(log_lo - log_hi))
+            return self.mu - sd * special.ndtri_exp(log_q)
+        log_hi, log_lo = special.log_ndtr(beta), special.log_ndtr(alpha)
+        log_p = log_hi + np.log1p(-u * -np.expm1(log_lo - log_hi))
+        return self.mu + sd * special.ndtri_exp(log_p)
+
+    def _truncated_cdf(self, x, a, b):
+        sd = np.sqrt(self.cov)
+        alpha, beta, z = (a - self.mu) / sd, (b - self.mu) / sd, (x - self.mu) / sd
+        if alpha > 0:
+            # P(z <= Z | alpha <= Z <= beta) = 1 - P(-beta <= -Z < -z | ...)
+            return 1 - self._log_mass_ratio(-beta, -z, -alpha)
+        return self._log_mass_ratio(alpha, z, beta)
+
+    @staticmethod
+    def _log_mass_ratio(alpha, z, beta):
+        # Returns (cdf(z) - cdf(alpha)) / (cdf(beta) - cdf(alpha)) computed in log space
+        log_alpha, log_z, log_beta = special.log_ndtr(alpha), special.log_ndtr(z), special.log_ndtr(beta)
+        num = log_z + np.log(-np.expm1(log_alpha - log_z))
+        denom = log_beta + np.log(-np.expm1(log_alpha - log_beta))
+        return np.exp(num - denom)
+
+    def _truncated_mean(self, a, b):
+        sd = np.sqrt(self.cov)
+        alpha, beta = (a - self.mu) / sd, (b - self.mu) / sd
+        if alpha > 0:
+            alpha, beta, sign = -beta, -alpha, -1
+        else:
+            sign = 1
+        # Ratio (pdf(alpha) - pdf(beta)) / (cdf(beta) - cdf(alpha)) in log space
+        log_z = special.log_ndtr(beta) + np.log(-np.expm1(special.log_ndtr(alpha) - special.log_ndtr(beta)))
+        log_pdf_alpha = -alpha ** 2 / 2 - np.log(np.sqrt(2 * np.pi))
+        log_pdf_beta = -beta ** 2 / 2 - np.log(np.sqrt(2 * np.pi))
+        ratio = np.exp(log_pdf_alpha - log_z) - np.exp(log_pdf_beta - log_z)
+        return self.mu + sign * sd * ratio
+
     def __str__(self):
         return 'Normal({}, {}, {})'.format(self.mu, self.cov, self.dim)
 
@@ -224,6 +463,9 @@ class Beta(Distribution):
         Second shape parameter.
     """
 
+    __slots__ = ('alpha', 'beta')
+    _params = ('alpha', 'beta')
+
     def __init__(self, alpha, beta):
         self.alpha = alpha
         self.beta = beta
@@ -233,6 +475,33 @@ class Beta(Distribution):
         np.random.seed(seed)
         return np.random.beta(self.alpha, self.beta)
 
+    def _batch_sampler(self, seed, n):
+        return np.random.default_rng(seed).beta(self.alpha, self.beta, n)
+
+    def _kernel(self):
+        return ('beta', self.alpha, self.beta)
+
+    def pdf(self, x):
+        return np.exp(self.logpdf(x))
+
+    def logpdf(self, x):
+        y = np.clip(x, 0, 1)
+        logp = (special.xlogy(self.alpha - 1, y) + special.xlog1py(self.beta - 1, -y)
+                - special.betaln(self.alpha, self.beta))
+        return _where((np.less(x, 0)) | (np.greater(x, 1)), -np.inf, logp)
+
+    def cdf(self, x, *args, **kwargs):
+        return special.betainc(self.alpha, self.beta, np.clip(x, 0, 1))[()]
+
+    def sf(self, x):
+        return special.betainc(self.beta, self.alpha, 1 - np.clip(x, 0, 1))[()]
+
+    def ppf(self, q):
+        return special.betaincinv(self.alpha, self.beta, q)[()]
+
+    def isf(self, q):
+        return (1 - special.betaincinv(self.beta, self.alpha, q))[()]
+
     def mean(self, **kwargs):
         return self.alpha / (self.alpha + self.beta)
 
@@ -250,6 +519,9 @@ class PowerLaw(Distribution):
         The power determining the rate of decay.
     """
 
+    __slots__ = ('power',)
+    _params = ('power',)
+
     def __init__(self, power):
         self.power = power
         super().__init__()
@@ -258,6 +530,32 @@ class PowerLaw(Distribution):
         np.random.seed(seed)
         return np.random.power(self.power)
 
+    def _batch_sampler(self, seed, n):
+        return np.random.default_rng(seed).power(self.power, n)
+
+    def _kernel(self):
+        return ('power', self.power)
+
+    def pdf(self, x):
+        return np.exp(self.logpdf(x))
+
+    def logpdf(self, x):
+        logp = np.log(self.power) + special.xlogy(self.power - 1, np.clip(x, 0, 1))
+        return _where((np.less(x, 0)) | (np.greater(x, 1)), -np.inf, logp)
+
+    def cdf(self, x, *args, **kwargs):
+        return (np.clip(x, 0, 1) ** self.power)[()]
+
+    def sf(self, x):
+        with np.errstate(divide='ignore'):
+            return -np.expm1(self.power * np.log(np.clip(x, 0, 1)))[()]
+
+    def ppf(self, q):
+        return (np.asarray(q) ** (1 / self.power))[()]
+
+    def isf(self, q):
+        return np.exp(np.log1p(-np.asarray(q)) / self.power)[()]
+
     def mean(self, **kwargs):
         return self.power / (self.power + 1)
 
@@ -279,6 +577,9 @@ class F(Distribution):
         The second degree of freedom parameter.
     """
 
+    __slots__ = ('d1', 'd2')
+    _params = ('d1', 'd2')
+
     def __init__(self, d1, d2):
         self.d1 = d1
         self.d2 = d2
@@ -288,6 +589,37 @@ class F(Distribution):
         np.random.seed(seed)
         return np.random.f(self.d1, self.d2)
 
+    def _batch_sampler(self, seed, n):
+        return np.random.default_rng(seed).f(self.d1, self.d2, n)
+
+    def _kernel(self):
+        return ('f', self.d1, self.d2)
+
+    def pdf(self, x):
+        return np.exp(self.logpdf(x))
+
+    def logpdf(self, x):
+        d1, d2 = self.d1, self.d2
+        y = np.maximum(x, 0)
+        logp = (d1 / 2 * np.log(d1) + d2 / 2 * np.log(d2) + special.xlogy(d1 / 2 - 1, y)
+                - (d1 + d2) / 2 * np.log(d2 + d1 * y) - special.betaln(d1 / 2, d2 / 2))
+        return _where(np.less(x, 0), -np.inf, logp)
+
+    def cdf(self, x, *args, **kwargs):
+        return special.fdtr(self.d1, self.d2, np.maximum(x, 0))[()]
+
+    def sf(self, x):
+        return special.fdtrc(self.d1, self.d2, np.maximum(x, 0))[()]
+
+    def ppf(self, q):
+        return special.fdtri(self.d1, self.d2, q)[()]
+
+    def isf(self, q):
+        # Inverts sf(x) = betainc(d2 / 2, d1 / 2, d2 / (d2 + d1 x)) for accuracy in the tail
+        w = special.betaincinv(self.d2 / 2, self.d1 / 2, q)
+        with np.errstate(divide='ignore'):
+            return (self.d2 * (1 - w) / (self.d1 * w))[()]
+
     def mean(self, **kwargs):
         if self.d2 <= 2:
             return float('inf')
@@ -308,6 +640,9 @@ class StudentT(Distribution):
         The degree.
     """
 
+    __slots__ = ('deg',)
+    _params = ('deg',)
+
     def __init__(self, deg):
         self.deg = deg
         super().__init__()
@@ -316,6 +651,32 @@ class StudentT(Distribution):
         np.random.seed(seed)
         return np.random.standard_t(self.deg)
 
+    def _batch_sampler(self, seed, n):
+        return np.random.default_rng(seed).standard_t(self.deg, n)
+
+    def _kernel(self):
+        return ('standard_t', self.deg)
+
+    def pdf(self, x):
+        return np.exp(self.logpdf(x))
+
+    def logpdf(self, x):
+        nu = self.deg
+        return (special.gammaln((nu + 1) / 2) - special.gammaln(nu / 2) - np.log(np.pi * nu) / 2
+                - (nu + 1) / 2 * np.log1p(np.square(x) / nu))[()]
+
+    def cdf(self, x, *args, **kwargs):
+        return special.stdtr(self.deg, x)[()]
+
+    def sf(self, x):
+        return special.stdtr(self.deg, -np.asarray(x))[()]
+
+    def ppf(self, q):
+        return special.stdtrit(self.deg, q)[()]
+
+    def isf(self, q):
+        return -special.stdtrit(self.deg, q)[()]
+
     def mean(self, **kwargs):
         if self.deg <= 1:
             return float('inf')
@@ -340,6 +701,9 @@ class Laplace(Distribution):
         The scale parameter.
     """
 
+    __slots__ = ('loc', 'scale')
+    _params = ('loc', 'scale')
+
     def __init__(self, loc=0, scale=1):
         self.loc = loc
         self.scale = scale
@@ -349,6 +713,42 @@ class Laplace(Distribution):
         np.random.seed(seed)
         return np.random.laplace(self.loc, self.scale)
 
+    def _batch_sampler(self, seed, n):
+        return np.random.default_rng(seed).laplace(self.loc, self.scale, n)
+
+    def _kernel(self):
+        return ('laplace', self.loc, self.scale)
+
+    def _pathwise(self, x, name):
+        if name == 'loc':
+            return np.ones_like(x)
+        elif name == 'scale':
+            return (x - self.loc) / self.scale
+
+    def pdf(self, x):
+        return np.exp(self.logpdf(x))
+
+    def logpdf(self, x):
+        return (-np.log(2 * self.scale) - np.abs(np.asarray(x) - self.loc) / self.scale)[()]
+
+    def cdf(self, x, *args, **kwargs):
+        z = (np.asarray(x) - self.loc) / self.scale
+        return _where(z < 0, np.exp(np.minimum(z, 0)) / 2, 1 - np.exp(-np.maximum(z, 0)) / 2)
+
+    def sf(self, x):
+        return self.cdf(2 * self.loc - np.asarray(x))
+
+    def ppf(self, q):
+        q = np.asarray(q) - 0.5
+        return (self.loc - self.scale * np.sign(q) * np.log1p(-2 * np.abs(q)))[()]
+
+    def isf(self, q):
+        return 2 * self.loc - self.ppf(q)
+
+    def cf(self, t):
+        t = np.asarray(t)
+        return np.exp(1j * self.loc * t) / (1 + (self.scale * t) ** 2)
+
     def mean(self, **kwargs):
         return self.loc
 
@@ -368,6 +768,9 @@ class Logistic(Distribution):
         The scale parameter.
     """
 
+    __slots__ = ('loc', 'scale')
+    _params = ('loc', 'scale')
+
     def __init__(self, loc=0, scale=1):
         self.loc = loc
         self.scale = scale
@@ -377,6 +780,44 @@ class Logistic(Distribution):
         np.random.seed(seed)
         return np.random.logistic(self.loc, self.scale)
 
+    def _batch_sampler(self, seed, n):
+        return np.random.default_rng(seed).logistic(self.loc, self.scale, n)
+
+    def _kernel(self):
+        return ('logistic', self.loc, self.scale)
+
+    def _pathwise(self, x, name):
+        if name == 'loc':
+            return np.ones_like(x)
+        elif name == 'scale':
+            return (x - self.loc) / self.scale
+
+    def pdf(self, x):
+        return np.exp(self.logpdf(x))
+
+    def logpdf(self, x):
+        z = np.abs(np.asarray(x) - self.loc) / self.scale
+        return (-z - np.log(self.scale) - 2 * np.log1p(np.exp(-z)))[()]
+
+    def cdf(self, x, *args, **kwargs):
+        return special.expit((np.asarray(x) - self.loc) / self.scale)[()]
+
+    def sf(self, x):
+        return special.expit((self.loc - np.asarray(x)) / self.scale)[()]
+
+    def ppf(self, q):
+        return (self.loc + self.scale * special.logit(q))[()]
+
+    def isf(self, q):
+        return (self.loc - self.scale * special.logit(q))[()]
+
+    def cf(self, t):
+        # x / sinh(x) written so as not to overflow
+        x = np.abs(np.pi * self.scale * np.asarray(t, dtype=float))
+        with np.errstate(invalid='ignore'):
+            ratio = np.where(x == 0, 1., 2 * x * np.exp(-x) / -np.expm1(-2 * x))
+        return np.exp(1j * self.loc * np.asarray(t)) * ratio
+
     def mean(self, **kwargs):
         return self.loc
 
@@ -396,17 +837,54 @@ class VonMises(Distribution):
         The kapp parameter.
     """
 
+    __slots__ = ('mu', 'kappa')
+    _params = ('mu', 'kappa')
+
     def __init__(self, mean=0, kappa=1):
-        self.mean = mean
+        self.mu = mean
         self.kappa = kappa
         super().__init__()
 
     def _sampler(self, seed):
         np.random.seed(seed)
-        return np.random.vonmises(self.mean, self.kappa)
+        return np.random.vonmises(self.mu, self.kappa)
+
+    def _batch_sampler(self, seed, n):
+        return np.random.default_rng(seed).vonmises(self.mu, self.kappa, n)
+
+    # Samples lie in [-pi, pi], so the density is that of the wrapped distribution
+
+    def _kernel(self):
+        return ('vonmises', self.mu, self.kappa)
+
+    def pdf(self, x):
+        return np.exp(self.logpdf(x))
+
+    def logpdf(self, x):
+        x = np.asarray(x)
+        logp = self.kappa * (np.cos(x - self.mu) - 1) - np.log(2 * np.pi * special.i0e(self.kappa))
+        return _where(np.abs(x) > np.pi, -np.inf, logp)
+
+    def cdf(self, x, *args, **kwargs):
+        # stats.vonmises.cdf is continued to the real line so that it increases by 1 per period
+        x = np.clip(x, -np.pi, np.pi)
+        return (stats.vonmises.cdf(x - self.mu, self.kappa)
+                - stats.vonmises.cdf(-np.pi - self.mu, self.kappa))[()]
+
+    def sf(self, x):
+        return (1 - np.asarray(self.cdf(x)))[()]
+
+    def ppf(self, q):
+        c = np.asarray(q) + stats.vonmises.cdf(-np.pi - self.mu, self.kappa)
+        periods = np.floor(c)
+        y = 2 * np.pi * periods + stats.vonmises.ppf(np.clip(c - periods, 1e-300, 1), self.kappa)
+        return np.clip(self.mu + y, -np.pi, np.pi)[()]
+
+    def isf(self, q):
+        return self.ppf(1 - np.asarray(q))
 
     def mean(self, **kwargs):
-        return self.mean
+        return self.mu
 
     def __str__(self):
-        return 'VonMises({}, {})'.format(self.mean, self.kappa)
+        return 'VonMises({}, {})'.format(self.mu, self.kappa)
@@ -1,10 +1,54 @@
+import itertools
+
 import numpy as np
+import scipy.special as special
 import scipy.stats as stats
-from math import factorial
 
+from ._tables import AliasTable, binomial_ppf, binomial_tables, poisson_ppf, poisson_tables
 from .distributions import Distribution
 
 
+def _uniform(seed):
+    np.random.seed(seed)
+    return np.random.random_sample()
+
+
+def _uniforms(seed, n):
+    return np.random.default_rng(seed).random(n)
+
+
+def _support(x, lo, hi):
+    # Returns `x` with values outside the integers in `[lo, hi]` replaced by `lo`,
+    # together with a mask of the values that were kept
+    x = np.asarray(x, dtype=float)
+    valid = (x == np.floor(x)) & (lo <= x) & (x <= hi)
+    return np.where(valid, x, lo), valid
+
+
+def _where(condition, x, y):
+    # Like np.where, but returns scalars for scalar inputs
+    return np.where(condition, x, y)[()]
+
+
+def _log_choose(n, k):
+    return special.gammaln(n + 1) - special.gammaln(k + 1) - special.gammaln(n - k + 1)
+
+
+def _cumulative(support, probs, x):
+    # Returns the cdf and survival function at `x` of a distribution with finite
+    # sorted support, summing the survival function from the right for accuracy
+    i = np.searchsorted(support, x, side='right')
+    head = np.concatenate([[0], np.cumsum(probs)])
+    tail = np.concatenate([np.cumsum(probs[::-1])[::-1], [0]])
+    return head[i][()], tail[i][()]
+
+
+def _lattice(distr, lo, hi):
+    # The probabilities of the integers from `lo` to `hi`, starting from `lo`
+    k = np.arange(int(lo), int(hi) + 1)
+    return int(lo), distr.pmf(k)
+
+
 # -------------------- Discrete uniform random variable -------------------- #
 
 class RandInt(Distribution):
@@ -19,6 +63,9 @@ class RandInt(Distribution):
         Highest possible value. Default is `a + 1`.
     """
 
+    __slots__ = ('a', 'b')
+    _params = ('a', 'b')
+
     def __init__(self, a, b):
         self.a = a
         self.b = b
@@ -28,15 +75,42 @@ class RandInt(Distribution):
         np.random.seed(seed)
         return np.random.randint(self.a, self.b + 1)
 
+    def _batch_sampler(self, seed, n):
+        dtype = self._dtype('i')
+        if dtype is None or dtype.kind not in 'iu':
+            dtype = np.int64
+        return np.random.default_rng(seed).integers(self.a, self.b + 1, n, dtype=dtype)
+
+    def _bound(self):
+        return max(np.max(np.abs(self.a)), np.max(np.abs(self.b)))
+
+    def _kernel(self):
+        return ('randint', self.a, self.b + 1)
+
+    def _inverse(self, u):
+        a, b = np.asarray(self.a), np.asarray(self.b)
+        return np.floor(a + u * (b - a + 1)).astype(np.int64)
+
+    def _lattice(self, tol):
+        # Returns the smallest outcome and the probabilities of successive integers
+        # from it, neglecting at most `tol` of the mass of unbounded supports
+        return self.a, np.full(self.b - self.a + 1, 1 / (self.b - self.a + 1))
+
+    def _shape(self):
+        return self._param_shape()
+
+    def pmf(self, x):
+        return np.exp(self.logpmf(x))
+
+    def logpmf(self, x):
+        _, valid = _support(x, self.a, self.b)
+        return _where(valid, -np.log(self.b - self.a + 1), -np.inf)
+
     def cdf(self, x, *args, **kwargs):
-        if x < self.a:
-            return 0
-        elif x <= self.b:
-            diff = np.ceil(x - self.a)
-            diff = diff + 1 if int(diff) == diff else diff
-            return diff / (self.b - self.a + 1)
-        else:
-            return 1
+        return np.clip((np.floor(x) - self.a + 1) / (self.b - self.a + 1), 0, 1)[()]
+
+    def sf(self, x):
+        return np.clip((self.b - np.floor(x)) / (self.b - self.a + 1), 0, 1)[()]
 
     def mean(self, *args, **kwargs):
         return (self.a + self.b) / 2
@@ -63,6 +137,8 @@ class Multinomial(Distribution):
         Success probabilities. Default is equal probabilities for each outcome.
     """
 
+    __slots__ = ('n', 'pvals')
+
     def __init__(self, n, pvals=None):
         self.n = n
         if not pvals:
@@ -75,13 +151,92 @@ class Multinomial(Distribution):
         np.random.seed(seed)
         return np.random.multinomial(self.n, self.pvals)
 
-    def cdf(self, *args, **kwargs):
-        if sum(args) == self.n:
-            num = factorial(self.n) * np.prod([p ** x for (p, x) in zip(self.pvals, args)])
-            denom = np.prod([factorial(x) for x in args])
-            return num / denom
-        else:
-            return 0
+    def _batch_sampler(self, seed, n):
+        return np.random.default_rng(seed).multinomial(self.n, self.pvals, n)
+
+    def _bound(self):
+        return self.n
+
+    def _outcomes(self, tol):
+        # Returns all outcomes and their probabilities. The vectors of counts are
+        # compositions of `n`, given by the positions of `k - 1` bars among `n + k - 1` slots
+        k = len(self.pvals)
+        bars = list(itertools.combinations(range(self.n + k - 1), k - 1))
+        bars = np.array(bars, dtype=np.int64).reshape(len(bars), k - 1)
+        edges = np.concatenate([np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), self.n + k - 1)], axis=1)
+        counts = np.diff(edges, axis=1) - 1
+        return counts, self.pmf(counts)
+
+    def _shape(self):
+        return (len(self.pvals),)
+
+    def pmf(self, x):
+        return np.exp(self.logpmf(x))
+
+    def logpmf(self, x):
+        """
+        Returns the log of the probability mass function.
+
+        :param x: array_like
+            Vectors of counts along the last axis.
+        """
+        x = np.asarray(x, dtype=float)
+        valid = np.all((x == np.floor(x)) & (x >= 0), axis=-1) & (np.sum(x, axis=-1) == self.n)
+        x = np.where(valid[..., None], x, 0)
+        logp = special.gammaln(self.n + 1) + np.sum(special.xlogy(x, self.pvals) - special.gammaln(x + 1),
+                                                    axis=-1)
+        return _where(valid, logp, -np.inf)
+
+    def cdf(self, x, *args, **kwargs):
+        """
+        Returns the probability that every count is at most the corresponding entry of `x`.
+
+        Computed exactly using Levin's representation of the multinomial distribution
+        in terms of independent Poisson random variables, for all points at once.
+
+        :param x: array_like
+            Vectors of counts along the last axis.
+        """
+        x = np.floor(np.asarray(x, dtype=float))
+        rows = x.reshape(-1, x.shape[-1])
+        counts = np.minimum(rows, self.n)
+        zero = np.any(rows < 0, axis=1) | (np.sum(counts, axis=1) < self.n)
+        one = ~zero & np.all(rows >= self.n, axis=1)
+
+        out = np.where(one, 1., 0.)
+        rest = ~(zero | one)
+        if np.any(rest):
+            out[rest] = self._cdf(counts[rest])
+        return np.reshape(out, x.shape[:-1])[()]
+
+    def sf(self, x):
+        """Returns `1 - cdf(x)`."""
+        return 1 - self.cdf(x)
+
+    def _cdf(self, x):
+        # The cdf at rows of counts `x`, each at most `n` and summing to at least `n`
+        rates = self.n * np.asarray(self.pvals, dtype=float)
+        support = np.arange(self.n + 1)
+
+        # Distributions of the sums of independent Pois(n * p) truncated to [0, x],
+        # convolved for all rows at once
+        conv = np.zeros((len(x), self.n + 1))
+        conv[:, 0] = 1
+        top = 0
+        for (rate, k) in zip(rates, x.T):
+            trunc = np.where(support <= k[:, None], stats.poisson.pmf(support, rate), 0)
+            trunc /= stats.poisson.cdf(k, rate)[:, None]
+            # Only the first `top + 1` entries of the convolution so far are nonzero
+            new = np.zeros_like(conv)
+            for j in range(int(np.max(k)) + 1):
+                width = min(top + 1, self.n + 1 - j)
+                new[:, j:j + width] += trunc[:, j, None] * conv[:, :width]
+            conv = new
+            top = min(top + int(np.max(k)), self.n)
+
+        log_cdf = special.gammaln(self.n + 1) - self.n * np.log(self.n) + self.n
+        log_cdf += np.sum(stats.poisson.logcdf(x, rates), axis=1) + np.log(conv[:, self.n])
+        return np.minimum(np.exp(log_cdf), 1.)
 
     def mean(self, **kwargs):
         return np.array([self.n * pval for pval in self.pvals])
@@ -109,16 +264,56 @@ class Bin(Multinomial):
         probability of success.
     """
 
+    __slots__ = ('p',)
+    _params = ('n', 'p')
+
     def __init__(self, n, p=0.5):
         self.p = p
         super().__init__(n, [1 - p, p])
 
+    # Inverts the cdf using a guide table once the parameters have been reused,
+    # except when the support is very large
     def _sampler(self, seed):
-        np.random.seed(seed)
-        return np.random.binomial(self.n, self.p)
+        table = binomial_tables.get(self.n, self.p)
+        if table is None:
+            return int(binomial_ppf(_uniform(seed), self.n, self.p))
+        return table.lookup(_uniform(seed))
+
+    def _batch_sampler(self, seed, n):
+        table = binomial_tables.get(self.n, self.p, reuse=True)
+        if table is None:
+            return np.random.default_rng(seed).binomial(self.n, self.p, n)
+        return table.lookup(_uniforms(seed, n))
+
+    def _kernel(self):
+        return ('binomial', self.n, self.p)
+
+    def _sum(self, n):
+        return Bin(n * self.n, self.p)
+
+    def _inverse(self, u):
+        return stats.binom.ppf(u, self.n, self.p).astype(np.int64)
+
+    def _lattice(self, tol):
+        # SciPy's pmf is accurate for very many trials
+        k = np.arange(stats.binom.ppf(tol / 2, self.n, self.p), stats.binom.isf(tol / 2, self.n, self.p) + 1)
+        return int(k[0]), stats.binom.pmf(k, self.n, self.p)
+
+    def _shape(self):
+        return self._param_shape()
+
+    def logpmf(self, x):
+        k, valid = _support(x, 0, self.n)
+        logp = _log_choose(self.n, k) + special.xlogy(k, self.p) + special.xlog1py(self.n - k, -self.p)
+        return _where(valid, logp, -np.inf)
 
     def cdf(self, x, *args, **kwargs):
-        return super().cdf(x)
+        k = np.clip(np.floor(x), 0, self.n)
+        return _where(np.less(x, 0), 0., special.bdtr(k, self.n, self.p))
+
+    def sf(self, x):
+        k = np.clip(np.floor(x), 0, self.n)
+        return _where(np.less(x, 0), 1., special.bdtrc(k, self.n, self.p))
 
     def mean(self, *args, **kwargs):
         return super().mean()[1]
@@ -142,7 +337,8 @@ class Ber(Bin):
         Probability that the outcome is `1`.
     """
 
-    # Uses np.random.binomial with n = 1 (much faster than np.random.choice)
+    __slots__ = ()
+
     def __init__(self, p=0.5):
         super().__init__(1, p)
 
@@ -159,6 +355,88 @@ class Ber(Bin):
         return 'Ber({})'.format(self.p)
 
 
+class Categorical(Distribution):
+    """
+    A categorical random variable.
+
+    Takes the value `values[i]` with probability `pvals[i]`. Samples are drawn in
+    constant time, independently of the number of outcomes, using an alias table.
+
+    Parameters
+    ----------
+    pvals : list or tuple
+        Probabilities of the outcomes. Normalized if they do not sum to `1`.
+    values : list or tuple, optional
+        The (scalar) outcomes. Default is `0, ..., len(pvals) - 1`.
+    """
+
+    __slots__ = ('pvals', 'values', 'table', 'support', 'probs')
+
+    def __init__(self, pvals, values=None):
+        self.pvals = np.asarray(pvals, dtype=float) / np.sum(pvals)
+        self.values = None if values is None else np.asarray(values)
+        if self.values is not None and self.values.shape != self.pvals.shape:
+            raise ValueError('Expected {} scalar values, got values of shape {}'.format(len(self.pvals),
+                                                                                       self.values.shape))
+        self.table = AliasTable(self.pvals)
+
+        # Sorted distinct outcomes and their probabilities
+        outcomes = np.arange(len(self.pvals)) if self.values is None else self.values
+        self.support, inverse = np.unique(outcomes, return_inverse=True)
+        self.probs = np.bincount(inverse.ravel(), weights=self.pvals)
+
+        super().__init__()
+
+    def _sampler(self, seed):
+        i = int(self.table.lookup(_uniform(seed)))
+        return i if self.values is None else self.values[i]
+
+    def _batch_sampler(self, seed, n):
+        i = self.table.lookup(_uniforms(seed, n))
+        return i if self.values is None else self.values[i]
+
+    def _bound(self):
+        return len(self.pvals) - 1 if self.values is None else None
+
+    def _lattice(self, tol):
+        if not np.issubdtype(self.support.dtype, np.integer):
+            return None
+        pmf = np.zeros(self.support[-1] - self.support[0] + 1)
+        pmf[self.support - self.support[0]] = self.probs
+        return int(self.support[0]), pmf
+
+    def _outcomes(self, tol):
+        return self.support, self.probs
+
+    def _shape(self):
+        return ()
+
+    def pmf(self, x):
+        i = np.minimum(np.searchsorted(self.support, x), len(self.support) - 1)
+        return _where(self.support[i] == x, self.probs[i], 0.)
+
+    def logpmf(self, x):
+        with np.errstate(divide='ignore'):
+            return np.log(self.pmf(x))
+
+    def cdf(self, x, *args, **kwargs):
+        return _cumulative(self.support, self.probs, x)[0]
+
+    def sf(self, x):
+        return _cumulative(self.support, self.probs, x)[1]
+
+    def mean(self, **kwargs):
+        values = np.arange(len(self.pvals)) if self.values is None else self.values
+        return np.dot(self.pvals, values)
+
+    def variance(self, *args, **kwargs):
+        values = np.arange(len(self.pvals)) if self.values is None else self.values
+        return np.dot(self.pvals, values ** 2) - self.mean() ** 2
+
+    def __str__(self):
+        return 'Categorical({})'.format(list(self.pvals))
+
+
 # ------------------------ Negative binomial family ------------------------ #
 
 class NegBin(Distribution):
@@ -177,6 +455,8 @@ class NegBin(Distribution):
         Probability of success.
     """
 
+    __slots__ = ('n', 'p')
+
     def __init__(self, n, p=0.5):
         self.n = n
         self.p = p
@@ -186,8 +466,34 @@ class NegBin(Distribution):
         np.random.seed(seed)
         return np.random.negative_binomial(self.n, self.p)
 
+    def _batch_sampler(self, seed, n):
+        return np.random.default_rng(seed).negative_binomial(self.n, self.p, n)
+
+    def _kernel(self):
+        return ('negative_binomial', self.n, self.p)
+
+    def _lattice(self, tol):
+        return _lattice(self, 0, stats.nbinom.isf(tol, self.n, self.p))
+
+    def _shape(self):
+        return ()
+
+    def pmf(self, x):
+        return np.exp(self.logpmf(x))
+
+    def logpmf(self, x):
+        k, valid = _support(x, 0, np.inf)
+        logp = (special.gammaln(k + self.n) - special.gammaln(k + 1) - special.gammaln(self.n)
+                + self.n * np.log(self.p) + special.xlog1py(k, -self.p))
+        return _where(valid, logp, -np.inf)
+
     def cdf(self, x, *args, **kwargs):
-        return stats.nbinom.cdf(x, self.n, self.p)
+        k = np.maximum(np.floor(x), 0)
+        return _where(np.less(x, 0), 0., special.betainc(self.n, k + 1, self.p))
+
+    def sf(self, x):
+        k = np.maximum(np.floor(x), 0)
+        return _where(np.less(x, 0), 1., special.betainc(k + 1, self.n, 1 - self.p))
 
     def mean(self, **kwargs):
         return self.n * (1 - self.p) / self.p
@@ -212,16 +518,40 @@ class Geom(NegBin):
         Probability of success.
     """
 
+    __slots__ = ()
+
     def __init__(self, p=0.5):
         super().__init__(1, p)
 
-    # Faster than using np.random.negative_binomial
+    # Inverts the cdf in closed form
     def _sampler(self, seed):
-        np.random.seed(seed)
-        return np.random.geometric(self.p)
+        return int(self._inverse(_uniform(seed)))
+
+    def _batch_sampler(self, seed, n):
+        return self._inverse(_uniforms(seed, n)).astype(np.int64)
+
+    def _kernel(self):
+        return ('geometric', self.p)
+
+    def _inverse(self, u):
+        if self.p == 1:
+            return np.ones_like(u)
+        return np.floor(np.log1p(-u) / np.log1p(-self.p)) + 1
+
+    def _lattice(self, tol):
+        return _lattice(self, 1, stats.geom.isf(tol, self.p))
+
+    def logpmf(self, x):
+        k, valid = _support(x, 1, np.inf)
+        return _where(valid, special.xlog1py(k - 1, -self.p) + np.log(self.p), -np.inf)
 
     def cdf(self, x, *args, **kwargs):
-        return 1 - (1 - self.p) ** x
+        k = np.maximum(np.floor(x), 1)
+        return _where(np.less(x, 1), 0., -np.expm1(k * np.log1p(-self.p)))
+
+    def sf(self, x):
+        k = np.maximum(np.floor(x), 1)
+        return _where(np.less(x, 1), 1., np.exp(k * np.log1p(-self.p)))
 
     def mean(self, **kwargs):
         return 1 / self.p
@@ -246,6 +576,8 @@ class HyperGeom(Distribution):
     nsample : int
     """
 
+    __slots__ = ('ngood', 'nbad', 'nsample')
+
     def __init__(self, ngood, nbad, nsample):
         self.ngood = ngood
         self.nbad = nbad
@@ -256,8 +588,44 @@ class HyperGeom(Distribution):
         np.random.seed(seed)
         return np.random.hypergeometric(self.ngood, self.nbad, self.nsample)
 
+    def _batch_sampler(self, seed, n):
+        return np.random.default_rng(seed).hypergeometric(self.ngood, self.nbad, self.nsample, n)
+
+    def _bound(self):
+        return min(self.ngood, self.nsample)
+
+    def _kernel(self):
+        return ('hypergeometric', self.ngood, self.nbad, self.nsample)
+
+    def _lattice(self, tol):
+        return _lattice(self, *self._bounds())
+
+    def _shape(self):
+        return ()
+
+    def pmf(self, x):
+        return np.exp(self.logpmf(x))
+
+    def logpmf(self, x):
+        k, valid = _support(x, *self._bounds())
+        total = self.ngood + self.nbad
+        logp = (_log_choose(self.ngood, k) + _log_choose(self.nbad, self.nsample - k)
+                - _log_choose(total, self.nsample))
+        return _where(valid, logp, -np.inf)
+
+    def cdf(self, x, *args, **kwargs):
+        support = np.arange(self._bounds()[0], self._bounds()[1] + 1)
+        return _cumulative(support, self.pmf(support), x)[0]
+
+    def sf(self, x):
+        support = np.arange(self._bounds()[0], self._bounds()[1] + 1)
+        return _cumulative(support, self.pmf(support), x)[1]
+
+    def _bounds(self):
+        return max(0, self.nsample - self.nbad), min(self.nsample, self.ngood)
+
     def mean(self, **kwargs):
-        return self.ngood * self.nbad / self.nsample
+        return self.nsample * self.ngood / (self.ngood + self.nbad)
 
     def __str__(self):
         return 'HyperGeom({}, {},'\
@@ -274,13 +642,57 @@ class Pois(Distribution):
         The rate parameter.
     """
 
+    __slots__ = ('rate',)
+    _params = ('rate',)
+
     def __init__(self, rate=1):
         self.rate = rate
         super().__init__()
 
+    # Inverts the cdf using a guide table once the parameters have been reused,
+    # except when the support is very large
     def _sampler(self, seed):
-        np.random.seed(seed)
-        return np.random.poisson(self.rate)
+        table = poisson_tables.get(self.rate)
+        if table is None:
+            return int(poisson_ppf(_uniform(seed), self.rate))
+        return table.lookup(_uniform(seed))
+
+    def _batch_sampler(self, seed, n):
+        table = poisson_tables.get(self.rate, reuse=True)
+        if table is None:
+            return np.random.default_rng(seed).poisson(self.rate, n)
+        return table.lookup(_uniforms(seed, n))
+
+    def _kernel(self):
+        return ('poisson', self.rate)
+
+    def _sum(self, n):
+        return Pois(n * self.rate)
+
+    def _inverse(self, u):
+        return stats.poisson.ppf(u, self.rate).astype(np.int64)
+
+    def _lattice(self, tol):
+        return _lattice(self, 0, stats.poisson.isf(tol, self.rate))
+
+    def _shape(self):
+        return self._param_shape()
+
+    def pmf(self, x):
+        return np.exp(self.logpmf(x))
+
+    def logpmf(self, x):
+        k, valid = _support(x, 0, np.inf)
+        logp = special.xlogy(k, self.rate) - self.rate - special.gammaln(k + 1)
+        return _where(valid, logp, -np.inf)
+
+    def cdf(self, x, *args, **kwargs):
+        k = np.maximum(np.floor(x), 0)
+        return _where(np.less(x, 0), 0., special.pdtr(k, self.rate))
+
+    def sf(self, x):
+        k = np.maximum(np.floor(x), 0)
+        return _where(np.less(x, 0), 1., special.pdtrc(k, self.rate))
 
     def mean(self, **kwargs):
         return self.rate
@@ -2,9 +2,14 @@
 Random variables following common distributions.
 """
 
+import copy
 import functools
 
-from ..core.random_variables import RandomVariable
+import numpy as np
+import scipy.integrate as integrate
+
+from .._exceptions import ConditionError
+from ..core.random_variables import Conditional, Constant, RandomVariable, Ufunc
 from ..lib import const
 
 
@@ -19,11 +24,16 @@ class Lift(type):
 
 
 class RandomDistribution(RandomVariable):
+    __slots__ = ('distr', 'rvs')
+
     def __init__(self, distr, *rvs):
         self.distr = distr
         self.rvs = rvs
         super().__init__()
 
+    def _dependencies(self):
+        return self.rvs
+
     def _sampler(self, seed=None):
         seed = self._seed(seed)
         # need to short-circuit to sampler for testability
@@ -43,7 +53,9 @@ class Distribution(RandomVariable, metaclass=Lift):
 
     It is also recommended, when these quantities are relatively simple to
     compute, to override `mean(self)`, `momen(self, p)`, `cmoment(self, p)`,
-    `variance(self)`, `cdf(self, x)`, and `pdf(self, x)`.
+    `variance(self)`, `cdf(self, x)`, and `pdf(self, x)`. Implementing the
+    characteristic function `cf(self, t)` allows the densities of linear
+    combinations to be computed by `density`.
 
     Example
     -------
@@ -59,11 +71,257 @@ class Distribution(RandomVariable, metaclass=Lift):
     ...     def _sampler(self, seed):
     ...         np.random.seed(seed)
     ...         return np.random.uniform(self.a, self.b)
+
+    Subclasses that do not declare `__slots__` store their attributes in an
+    instance dictionary as usual.
+
+    Parameter sweeps
+    ----------------
+    The parameters of univariate distributions may be arrays, in which case
+    they are broadcast against each other and each sample is an array of the
+    broadcast shape. Samples are drawn by inverse transform sampling of a single
+    uniform random variable shared by all parameters (common random numbers),
+    so that differences across parameters are not obscured by independent noise.
+
+    >>> X = pr.Normal(mu=np.linspace(0, 1, 5))
+    >>> X.sample(1000).shape
+    (1000, 5)
+
+    A subclass supports parameter sweeps by naming its parameter attributes in
+    `_params` and implementing `ppf` (or `_inverse`).
+
+    Attributes
+    ----------
+    dtype : dtype or str
+        The dtype of batches of samples (or `'auto'` for the narrowest integer
+        dtype holding the support). Default is None, meaning that set by `set_dtype`.
     """
+    __slots__ = ('dtype',)
+
+    # Names of the attributes holding parameters that may broadcast
+    _params = ()
+
     def __init__(self, *args, **kwargs):
         super().__init__()
+        self.dtype = None
+        self.make_independent()
+
+    def _default_op(self, seed):
+        if self._param_shape():
+            np.random.seed(seed)
+            return self._inverse(np.random.random_sample())
+        return super()._default_op(seed)
+
+    def _batch_call(self, seed, n, memo):
+        shape = self._param_shape()
+        if shape:
+            u = np.random.default_rng(seed).random(n).reshape((n,) + (1,) * len(shape))
+            out = np.asarray(self._inverse(u))
+        else:
+            out = super()._batch_call(seed, n, memo)
+        dtype = self._dtype(out.dtype.kind)
+        if dtype is None or out.dtype == dtype:
+            return out
+        return out.astype(dtype)
+
+    def _dtype(self, kind):
+        # The dtype of samples of the given kind ('f' or 'i'), if determined by a policy
+        dtype = self.dtype
+        if dtype is None:
+            kind = 'i' if kind in 'iu' else kind
+            if kind not in self._dtypes:
+                return None
+            dtype = self._dtypes[kind]
+        if isinstance(dtype, str) and dtype == 'auto':
+            return _narrowest(self._bound()) if kind in 'iu' else None
+        return np.dtype(dtype)
+
+    def _bound(self):
+        # Returns a bound on the absolute value of samples, if known
+        return None
+
+    def _param_shape(self):
+        # The broadcast shape of the parameters, which is the shape of samples of
+        # univariate distributions
+        return np.broadcast_shapes(*(np.shape(getattr(self, name)) for name in self._params))
+
+    def _inverse(self, u):
+        # Maps uniform samples to samples of the distribution, broadcasting against the parameters
+        return self.ppf(u)
+
+    def _pathwise(self, x, name):
+        # Returns the derivatives of samples `x` with respect to the parameter `name`,
+        # or None if the distribution cannot be reparameterized in this parameter.
+        # By default, differentiating F(x; theta) = u implicitly gives
+        # dx / dtheta = -(dF / dtheta) / f(x), and dF / dtheta is approximated by
+        # central differences
+        if not hasattr(self, 'pdf') or name not in self._params:
+            return None
+        theta = getattr(self, name)
+        h = 1e-6 * max(1, abs(theta))
+        lo, hi = copy.copy(self), copy.copy(self)
+        setattr(lo, name, theta - h)
+        setattr(hi, name, theta + h)
+        return -(hi.cdf(x) - lo.cdf(x)) / (2 * h) / self.pdf(x)
+
+    def given(self, *conditions):
+        """
+        Returns a conditional random variable.
+
+        If the conditions restrict `self` to an interval and the distribution
+        implements `ppf` (and preferably `sf` and `isf`), the result is sampled
+        exactly by inverse transform sampling rather than by rejection.
+
+        :param conditions: RandomVariable
+            Random variables with boolean samples.
+        """
+        interval = _interval(self, conditions)
+        if interval is not None and self._truncatable():
+            return Truncated(self, *interval)
+        return super().given(*conditions)
+
+    def quantile(self, q, *args, **kwargs):
+        # Exact for distributions implementing their quantile function
+        if hasattr(self, 'ppf') and self._truncatable():
+            return self.ppf(q)
+        return super().quantile(q, *args, **kwargs)
+
+    def _truncatable(self):
+        return hasattr(self, 'ppf') and not self._param_shape()
+
+    def _kernel(self):
+        # Returns the name of an equivalent sampler of `np.random` and its
+        # parameters, if any
+        return None
+
+    def _shape(self):
+        # Univariate families are recognized by their quantile functions
+        return self._param_shape() if hasattr(self, 'ppf') else None
+
+    def _truncated_sampler(self, u, a, b):
+        # Inverts the survival function above the median for accuracy in the upper tail
+        if hasattr(self, 'isf') and self.sf(a) < 0.5:
+            lo, hi = self.sf(b), self.sf(a)
+            return self.isf(hi - u * (hi - lo))
+        lo, hi = self.cdf(a), self.cdf(b)
+        return self.ppf(lo + u * (hi - lo))
+
+    def _truncated_cdf(self, x, a, b):
+        if hasattr(self, 'sf') and self.sf(a) < 0.5:
+            lo, hi = self.sf(b), self.sf(a)
+            return (hi - self.sf(x)) / (hi - lo)
+        lo, hi = self.cdf(a), self.cdf(b)
+        return (self.cdf(x) - lo) / (hi - lo)
+
+    def _truncated_mean(self, a, b):
+        # E[X | a <= X <= b] is the average of the quantile function over the interval
+        if hasattr(self, 'isf') and self.sf(a) < 0.5:
+            lo, hi = self.sf(b), self.sf(a)
+            quantile = self.isf
+        else:
+            lo, hi = self.cdf(a), self.cdf(b)
+            quantile = self.ppf
+        lo, hi = float(lo), float(hi)
+        return integrate.quad(quantile, lo, hi)[0] / (hi - lo)
+
+
+class Truncated(Conditional):
+    """
+    A random variable given by some distribution conditioned on an interval.
+
+    Samples are drawn by inverse transform sampling, so that conditioning on
+    events of small probability requires no rejections.
+
+    :param rv: Distribution
+        The distribution being truncated. Must implement `cdf` and `ppf`.
+    :param a: float
+        Left endpoint of the interval.
+    :param b: float
+        Right endpoint of the interval.
+    """
+
+    __slots__ = ('a', 'b')
+
+    def __init__(self, rv, a=-np.inf, b=np.inf):
+        super().__init__(rv, rv >= a, rv <= b)
+        self.a = a
+        self.b = b
         self.make_independent()
 
+        if not a < b:
+            raise ConditionError('Conditioning on an empty interval')
+
+    def _sampler(self, seed=None):
+        seed = self._seed(seed)
+        np.random.seed(seed)
+        return self.rv._truncated_sampler(np.random.random_sample(), self.a, self.b)
+
+    def _batch_sampler(self, seed, n):
+        u = np.random.default_rng(seed).random(n)
+        return self.rv._truncated_sampler(u, self.a, self.b)
+
+    def cdf(self, x, *args, **kwargs):
+        return self.rv._truncated_cdf(np.clip(x, self.a, self.b), self.a, self.b)
+
+    def mean(self, *args, **kwargs):
+        return self.rv._truncated_mean(self.a, self.b)
+
+    def __str__(self):
+        return '{} | [{}, {}]'.format(self.rv, self.a, self.b)
+
+
+# Comparison ufuncs, and the side of the interval that they bound when the random
+# variable is their first argument
+_bounds = {np.greater: 'a', np.greater_equal: 'a', np.less: 'b', np.less_equal: 'b'}
+_flipped = {'a': 'b', 'b': 'a'}
+
+
+def _narrowest(bound):
+    # The narrowest signed integer dtype holding integers up to `bound` in absolute value
+    for dtype in (np.int8, np.int16, np.int32):
+        if bound is not None and np.max(bound) <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _interval(rv, conditions):
+    """
+    Returns the interval `(a, b)` to which `conditions` restrict `rv` or `None` if
+    the conditions are not all comparisons of `rv` with constants.
+    """
+    a, b = -np.inf, np.inf
+    for condition in conditions:
+        if not isinstance(condition, Ufunc) or condition.method != '__call__':
+            return None
+
+        if condition.ufunc in (np.logical_and, np.bitwise_and):
+            interval = _interval(rv, condition.parents)
+        elif condition.ufunc in _bounds:
+            interval = _comparison(rv, condition)
+        else:
+            interval = None
+
+        if interval is None:
+            return None
+        a, b = max(a, interval[0]), min(b, interval[1])
+    return a, b
+
+
+def _comparison(rv, condition):
+    left, right = condition.parents
+    side = _bounds[condition.ufunc]
+    if left is rv and isinstance(right, Constant):
+        value = right.value
+    elif right is rv and isinstance(left, Constant):
+        value = left.value
+        side = _flipped[side]
+    else:
+        return None
+
+    if np.ndim(value) != 0:
+        return None
+    return (value, np.inf) if side == 'a' else (-np.inf, value)
+
 
 def model(*names):
     def decorator(f):
@@ -0,0 +1,446 @@
+"""
+Exact distributions of discrete random variables.
+
+The probability mass function of a sum of independent random variables is the
+convolution of theirs. Convolutions of probability mass functions on lattices
+are computed by the FFT, in time quasi-linear in the size of the support of the
+sum, so that sums of many variables (including sums of arrays of independent
+copies) are computed exactly rather than estimated by sampling.
+
+Other random variables depending on finitely many discrete random variables
+are computed by enumeration. Each node of the graph is represented by a table
+of its values indexed by the outcomes of the leaves it depends on. A node
+through which alone these leaves are used is replaced by a new leaf with its
+distribution, which eliminates them (as in variable elimination), so that
+tables stay small when the graph is built up from independent parts.
+"""
+
+import math
+
+import numpy as np
+import scipy.signal as signal
+import scipy.stats as stats
+
+from .._exceptions import ConditionError
+from ..core.random_variables import IID, Array, Conditional, Constant, Index, Reduction, Ufunc
+from .discrete import Categorical
+
+
+def exact(rv, tol=1e-12, max_size=10 ** 7):
+    """
+    Returns the exact distribution of a discrete random variable.
+
+    `rv` may be built from discrete distributions (such as `Ber`, `Bin`,
+    `RandInt`, `Multinomial`, `Pois` and `Categorical`) and constants by ufuncs,
+    indexing, arrays and conditioning. Distributions with unbounded supports are
+    truncated to all but `tol` of their mass.
+
+    Sums of independent integer-valued random variables (including sums and
+    means of arrays of independent copies, such as `np.sum(pr.iid(X, n))`) and
+    their multiples by constants are computed by FFT convolution. Other random
+    variables are computed by enumerating the outcomes of the distributions on
+    which they depend, eliminating those distributions as soon as they are no
+    longer needed. If either method requires a table (of probabilities or of
+    outcomes) of more than `max_size` entries, a `ValueError` reporting the size
+    of the table is raised instead.
+
+    Reductions of arrays of independent copies are not supported together with
+    entries of the same arrays (as in `np.sum(A) + A[0]`), since their dependence
+    is not tracked.
+
+    The result is a `Categorical` random variable with the same distribution,
+    whose `pmf`, `cdf` and `mean` are exact and whose samples are drawn from an
+    alias table.
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> import numpy as np
+    >>> S = pr.exact(np.sum(pr.iid(pr.Ber(0.3), 1000)) - 2 * pr.RandInt(0, 5))
+    >>> S.cdf(300)
+    >>> X, Y = pr.RandInt(1, 6), pr.RandInt(1, 6)
+    >>> pr.exact(X * Y).mean()
+    12.25
+    >>> pr.exact(X.given(X + Y > 9)).pmf(6)
+    0.5
+
+    :param rv: RandomVariable
+    :param tol: float, optional
+        Probability neglected in the tails of each distribution with unbounded support.
+    :param max_size: int, optional
+        The largest number of entries of a table of outcomes.
+    :return: Categorical
+    :raises ValueError: If `rv` is not supported or its computation exceeds `max_size`.
+    """
+    _check_copies(rv)
+    try:
+        lattice = _lattice(rv, 0, tol, max_size)
+    except _SizeError:
+        raise
+    except ValueError:
+        support, probs = _Enumeration([rv], tol, max_size).marginal(rv)
+        return Categorical(probs, values=support)
+    pmf = np.maximum(lattice.pmf, 0)
+    k = np.flatnonzero(pmf)
+    return Categorical(pmf[k], values=lattice.start + lattice.step * k)
+
+
+class _Lattice:
+    # A distribution on `start, start + step, start + 2 * step, ...` with probabilities
+    # `pmf`, together with the leaves of the random variable it is the distribution of
+
+    __slots__ = ('start', 'step', 'pmf', 'leaves')
+
+    def __init__(self, start, step, pmf, leaves=frozenset()):
+        self.start = start
+        self.step = step
+        self.pmf = np.asarray(pmf, dtype=float)
+        self.leaves = leaves
+
+    def add(self, other, max_size):
+        if self.leaves & other.leaves:
+            raise ValueError('Sums of dependent random variables are not supported')
+
+        # Common step of the lattices, on which both are spread out
+        if len(other.pmf) == 1:
+            step = self.step
+        elif len(self.pmf) == 1:
+            step = other.step
+        elif self.step == other.step:
+            step = self.step
+        elif float(self.step).is_integer() and float(other.step).is_integer():
+            step = math.gcd(int(self.step), int(other.step))
+        else:
+            raise ValueError('Cannot add lattices with steps {} and {}'.format(self.step, other.step))
+
+        pmf = _convolve(_spread(self.pmf, self.step, step), _spread(other.pmf, other.step, step), max_size)
+        return _Lattice(self.start + other.start, step, pmf, self.leaves | other.leaves)
+
+    def __neg__(self):
+        end = self.start + self.step * (len(self.pmf) - 1)
+        return _Lattice(-end, self.step, self.pmf[::-1], self.leaves)
+
+    def scale(self, c):
+        if c == 0:
+            return _Lattice(0, 1, [1.])
+        elif c < 0:
+            return -self.scale(-c)
+        return _Lattice(c * self.start, c * self.step, self.pmf, self.leaves)
+
+    def power(self, n, leaves, max_size):
+        # Distribution of the sum of `n` independent copies
+        size = n * (len(self.pmf) - 1) + 1
+        _check_size(size, max_size)
+        if len(self.pmf) == 1:
+            return _Lattice(n * self.start, self.step, self.pmf, leaves)
+        length = _fft_length(size)
+        pmf = np.fft.irfft(np.fft.rfft(self.pmf, length) ** n, length)[:size]
+        return _Lattice(n * self.start, self.step, np.maximum(pmf, 0), leaves)
+
+
+def _lattice(node, offset, tol, max_size):
+    # Distribution of `node` evaluated at seeds shifted by `offset`
+    offset = (offset + node._offset) % node._max_seed
+
+    if isinstance(node, Constant):
+        if np.ndim(node.value) != 0:
+            raise ValueError('Only scalar constants are supported')
+        return _Lattice(node.value, 1, [1.])
+    elif isinstance(node, Ufunc) and node.method == '__call__' and not node.kwargs:
+        return _ufunc(node, offset, tol, max_size)
+    elif isinstance(node, Ufunc) and node.ufunc is np.add and node.method == 'reduce':
+        # Sums of arrays of random variables
+        array, = node.parents
+        if not isinstance(array, Array) or (node.kwargs.get('axis', 0) is not None and len(array.shape_) != 1):
+            raise ValueError('Only sums of all entries of arrays are supported')
+        lattices = [_lattice(p, offset, tol, max_size) for p in array.parents]
+        total = lattices[0]
+        for lattice in lattices[1:]:
+            total = total.add(lattice, max_size)
+        return total
+    elif isinstance(node, Reduction):
+        return _reduction(node, offset, tol, max_size)
+    elif node.op is None and hasattr(node, '_lattice') and node._shape() == ():
+        spec = node._lattice(tol)
+        if spec is not None:
+            start, pmf = spec
+            _check_size(len(pmf), max_size)
+            return _Lattice(start, 1, pmf, frozenset([(id(node), offset)]))
+    raise ValueError('{} is not an integer-valued distribution'.format(node))
+
+
+def _ufunc(node, offset, tol, max_size):
+    ufunc = node.ufunc
+    if ufunc in (np.negative, np.positive):
+        x = _lattice(node.parents[0], offset, tol, max_size)
+        return -x if ufunc is np.negative else x
+    elif ufunc in (np.add, np.subtract):
+        x, y = (_lattice(p, offset, tol, max_size) for p in node.parents)
+        return x.add(-y if ufunc is np.subtract else y, max_size)
+    elif ufunc is np.multiply:
+        constants = [p for p in node.parents if isinstance(p, Constant) and np.ndim(p.value) == 0]
+        if constants:
+            other = node.parents[1] if constants[0] is node.parents[0] else node.parents[0]
+            return _lattice(other, offset, tol, max_size).scale(constants[0].value)
+    raise ValueError('{} of random variables is not supported'.format(ufunc.__name__))
+
+
+def _reduction(node, offset, tol, max_size):
+    iid = node.iid
+    offset = (offset + iid._offset) % iid._max_seed
+    leaves = frozenset([_copies(iid, offset)])
+    if node.name == 'count':
+        # The number of nonzero entries is binomial
+        x = _lattice(iid.rv, 0, tol, max_size)
+        values = x.start + x.step * np.arange(len(x.pmf))
+        p = np.clip(np.sum(x.pmf[values != 0]), 0, 1)
+        return _Lattice(0, 1, stats.binom.pmf(np.arange(iid.size + 1), iid.size, p), leaves)
+    elif node.name in ('sum', 'mean'):
+        total = _lattice(iid.rv, 0, tol, max_size).power(iid.size, leaves, max_size)
+        return total if node.name == 'sum' else total.scale(1 / iid.size)
+    raise ValueError('The {} of random variables is not supported'.format(node.name))
+
+
+def _spread(pmf, step, target):
+    # Spreads out a distribution on a lattice with step `step` over one with the
+    # finer step `target`
+    if len(pmf) == 1 or step == target:
+        return pmf
+    factor = int(step // target)
+    out = np.zeros(factor * (len(pmf) - 1) + 1)
+    out[::factor] = pmf
+    return out
+
+
+def _convolve(p, q, max_size):
+    _check_size(len(p) + len(q) - 1, max_size)
+    if min(len(p), len(q)) <= 64:
+        return np.convolve(p, q)
+    return np.maximum(signal.fftconvolve(p, q), 0)
+
+
+def _fft_length(size):
+    # The smallest power of two at least `size`, for which the FFT is fast
+    return 1 << (size - 1).bit_length()
+
+
+class _Enumeration:
+    # Tables of values of the nodes of a graph, indexed by the outcomes of leaves
+
+    def __init__(self, roots, tol, max_size):
+        self.tol = tol
+        self.max_size = max_size
+        self.private = _private(roots)
+        self.outcomes = []
+        self.probs = []
+        self.tables = {}
+        self.reductions = {}
+
+    def marginal(self, rv):
+        # The distinct values of `rv` and their probabilities
+        return self.distribution(*self.table(rv, 0))
+
+    def table(self, node, offset):
+        # Returns the scope of `node` (the indices of the leaves it depends on) and
+        # its values, indexed by their outcomes along the leading axes
+        offset = (offset + node._offset) % node._max_seed
+        key = (id(node), offset)
+        if key not in self.tables:
+            scope, values = self.compute(node, offset)
+            if key in self.private and len(scope) > 1 and np.ndim(values) == len(scope):
+                scope, values = self.leaf(*self.distribution(scope, values))
+            self.tables[key] = (scope, values)
+        return self.tables[key]
+
+    def compute(self, node, offset):
+        if isinstance(node, Constant):
+            return (), np.asarray(node.value)
+        elif isinstance(node, Ufunc) and node.method == '__call__':
+            scope, inputs = self.align([self.table(p, offset) for p in node.parents])
+            return scope, node.ufunc(*inputs, **node.kwargs)
+        elif isinstance(node, Ufunc) and node.method == 'reduce':
+            scope, values = self.table(node.parents[0], offset)
+            kwargs = dict(node.kwargs)
+            axis = kwargs.get('axis', 0)
+            if axis is None:
+                kwargs['axis'] = tuple(range(len(scope), np.ndim(values)))
+            else:
+                axes = axis if isinstance(axis, tuple) else (axis,)
+                kwargs['axis'] = tuple(a % (np.ndim(values) - len(scope)) + len(scope) for a in axes)
+            return scope, node.ufunc.reduce(values, **kwargs)
+        elif isinstance(node, Array):
+            scope, inputs = self.align([self.table(p, offset) for p in node.parents])
+            stacked = np.stack(np.broadcast_arrays(*inputs), axis=len(scope))
+            n = len(scope)
+            return scope, stacked.reshape(stacked.shape[:n] + node.shape_ + stacked.shape[n + 1:])
+        elif isinstance(node, Index):
+            scope, values = self.table(node.parents[0], offset)
+            key = node.key if isinstance(node.key, tuple) else (node.key,)
+            return scope, values[(slice(None),) * len(scope) + key]
+        elif isinstance(node, Conditional):
+            # Conditionals redraw their nodes, so they are independent of the rest of the graph
+            return self.leaf(*self.conditional(node))
+        elif isinstance(node, Reduction):
+            # Equal reductions of the same copies are the same leaf
+            key = (_copies(node.iid, (offset + node.iid._offset) % node._max_seed), node.name)
+            if key not in self.reductions:
+                lattice = _reduction(node, offset, self.tol, self.max_size)
+                k = np.flatnonzero(lattice.pmf > 0)
+                self.reductions[key] = self.leaf(lattice.start + lattice.step * k, lattice.pmf[k])
+            return self.reductions[key]
+        elif node.op is None:
+            spec = _outcomes(node, self.tol)
+            if spec is not None:
+                return self.leaf(*spec)
+        raise ValueError('Cannot enumerate the outcomes of {}'.format(node))
+
+    def conditional(self, node):
+        inner = _Enumeration((node.rv,) + node.conditions, self.tol, self.max_size)
+        scope, (values, *conditions) = inner.align([inner.table(x, 0) for x in (node.rv,) + node.conditions])
+        if np.ndim(values) != len(scope):
+            raise ValueError('Only conditionals of scalar random variables are supported')
+        values, probs, *conditions = np.broadcast_arrays(values, inner.weights(scope), *conditions)
+        probs = probs * np.logical_and.reduce([c.astype(bool) for c in conditions])
+        if not probs.any():
+            raise ConditionError('Conditioning on an event of probability zero')
+        support, inverse = np.unique(values, return_inverse=True)
+        probs = np.bincount(inverse.ravel(), weights=probs.ravel(), minlength=len(support))
+        return support, probs / probs.sum()
+
+    def leaf(self, outcomes, probs):
+        _check_size(len(outcomes), self.max_size)
+        self.outcomes.append(np.asarray(outcomes))
+        self.probs.append(np.asarray(probs, dtype=float))
+        return (len(self.outcomes) - 1,), self.outcomes[-1]
+
+    def align(self, tables):
+        # Broadcasts tables over the union of their scopes
+        scope = tuple(sorted(set().union(*(s for (s, _) in tables))))
+        _check_size(math.prod(len(self.outcomes[i]) for i in scope), self.max_size)
+        ndim = max(np.ndim(values) - len(s) for (s, values) in tables)
+        aligned = []
+        for (s, values) in tables:
+            values = np.asarray(values)
+            shape = tuple(len(self.outcomes[i]) if i in s else 1 for i in scope)
+            sample_shape = values.shape[len(s):]
+            aligned.append(values.reshape(shape + (1,) * (ndim - len(sample_shape)) + sample_shape))
+        return scope, aligned
+
+    def weights(self, scope):
+        # Joint probabilities of the outcomes of independent leaves
+        weights = np.ones(())
+        for i in scope:
+            weights = np.multiply.outer(weights, self.probs[i])
+        return weights
+
+    def distribution(self, scope, values):
+        if np.ndim(values) != len(scope):
+            raise ValueError('Only distributions of scalar random variables are supported')
+        probs = self.weights(scope)
+        support, inverse = np.unique(np.broadcast_to(values, probs.shape), return_inverse=True)
+        return support, np.bincount(inverse.ravel(), weights=probs.ravel(), minlength=len(support))
+
+
+def _outcomes(node, tol):
+    # The outcomes of a distribution and their probabilities, if finitely many
+    spec = node._lattice(tol) if hasattr(node, '_lattice') else None
+    if spec is not None:
+        start, pmf = spec
+        k = np.flatnonzero(pmf > 0)
+        return start + k, pmf[k]
+    return node._outcomes(tol) if hasattr(node, '_outcomes') else None
+
+
+def _private(roots):
+    # The keys of the nodes through which alone the nodes they depend on are used
+    children, referrers = {}, {}
+    for root in roots:
+        # Roots are also used from outside the graph
+        referrers.setdefault((id(root), root._offset % root._max_seed), set()).add(None)
+    stack = [(root, 0) for root in roots]
+    while stack:
+        node, offset = stack.pop()
+        offset = (offset + node._offset) % node._max_seed
+        key = (id(node), offset)
+        if key in children:
+            continue
+        parents = node.parents if isinstance(node, (Ufunc, Array, Index)) else ()
+        children[key] = [((id(p), (offset + p._offset) % p._max_seed)) for p in parents]
+        for (p, child) in zip(parents, children[key]):
+            referrers.setdefault(child, set()).add(key)
+            stack.append((p, offset))
+
+    descendants = {}
+
+    def below(key):
+        if key not in descendants:
+            descendants[key] = frozenset([key]).union(*(below(c) for c in children[key]))
+        return descendants[key]
+
+    return {key for key in children
+            if all(referrers[m] <= below(key) for m in below(key) if m != key)}
+
+
+def _copies(iid, offset):
+    # Identifies the copies of an array of independent copies evaluated at `offset`
+    positions = None if iid.positions is None else iid.positions.tobytes()
+    return id(iid.rv), iid.key, offset, positions
+
+
+def _check_copies(rv):
+    # Neither method tracks the dependence of a reduction of an array of copies on
+    # entries of the array used elsewhere (such as `np.sum(A) + A[0]`), which are
+    # identified here by the offsets of the leaves they depend on
+    leaves = set()
+    copies = {}
+    reductions = {}
+    _collect(rv, 0, leaves, copies, reductions, set())
+
+    groups = list(copies.values())
+    single = np.fromiter(leaves, dtype=np.int64, count=len(leaves))
+    for (i, offsets) in enumerate(groups):
+        if any(np.intersect1d(offsets, other).size for other in [single] + groups[i + 1:]):
+            raise ValueError('Random variables depending on both an array of independent copies '
+                             'and its entries are not supported')
+    if any(len(names) > 1 for names in reductions.values()):
+        raise ValueError('Different reductions of the same array of independent copies are not supported')
+
+
+def _collect(node, offset, leaves, copies, reductions, seen):
+    # Collects the offsets of the leaves of `node`, except those of arrays of copies,
+    # which are collected by array
+    offset = (offset + node._offset) % node._max_seed
+    if (id(node), offset) in seen:
+        return
+    seen.add((id(node), offset))
+
+    if isinstance(node, Reduction):
+        iid_offset = (offset + node.iid._offset) % node._max_seed
+        reductions.setdefault(_copies(node.iid, iid_offset), set()).add(node.name)
+        _collect(node.iid, offset, leaves, copies, reductions, seen)
+    elif isinstance(node, IID):
+        # The leaves of the copies, relative to the offsets of the copies
+        inner = set()
+        _collect(node.rv, -node.rv._offset, inner, {}, {}, set())
+        inner = np.fromiter(inner, dtype=np.int64, count=len(inner))
+        starts = offset + node._offsets(0, node.size)
+        copies[_copies(node, offset)] = np.unique((starts[:, None] + inner) % node._max_seed)
+    elif isinstance(node, Conditional):
+        # Conditionals redraw their nodes, so they are independent of the rest of the graph
+        return
+    elif node.op is None:
+        leaves.add(offset)
+    else:
+        for p in node.parents:
+            _collect(p, offset, leaves, copies, reductions, seen)
+
+
+class _SizeError(ValueError):
+    # Raised when a computation exceeds `max_size`, which no other method avoids
+    pass
+
+
+def _check_size(size, max_size):
+    if size > max_size:
+        raise _SizeError('Exact computation requires a table of {:.3g} entries, '
+                         'more than max_size = {}'.format(size, max_size))
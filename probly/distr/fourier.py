@@ -0,0 +1,182 @@
+"""
+Densities of linear combinations of independent random variables.
+
+The characteristic function of a linear combination `a_1 X_1 + ... + a_m X_m + b`
+of independent random variables is `exp(i b t)` times the product of the
+characteristic functions of the `X_k` at `a_k t`. Inverting it by the FFT gives
+the density on a grid of points, from which the distribution function follows
+by integration.
+"""
+
+import warnings
+
+import numpy as np
+import scipy.interpolate as interpolate
+
+from .._exceptions import ConvergenceWarning
+from ..core.random_variables import Constant, Ufunc
+from .distributions import Distribution
+
+
+class Tabulated(Distribution):
+    """
+    A continuous random variable given by its density on a grid of points.
+
+    The density is interpolated linearly between the points of the grid and the
+    distribution function by cubic Hermite interpolation (using the density as
+    its derivative). Samples are drawn by inverse transform sampling.
+
+    Parameters
+    ----------
+    x : array_like
+        Increasing points.
+    pdf : array_like
+        The density at the points `x`, which is assumed to vanish outside them.
+    cdf : array_like, optional
+        The distribution function at the points `x`. Default is obtained from the
+        density by the trapezoidal rule.
+    """
+
+    __slots__ = ('x', 'density', 'cumulative', 'spline')
+
+    def __init__(self, x, pdf, cdf=None):
+        self.x = np.asarray(x, dtype=float)
+        self.density = np.maximum(np.asarray(pdf, dtype=float), 0)
+        if cdf is None:
+            areas = np.diff(self.x) * (self.density[1:] + self.density[:-1]) / 2
+            cdf = np.concatenate([[0], np.cumsum(areas)]) / np.sum(areas)
+        self.cumulative = np.clip(np.maximum.accumulate(cdf), 0, 1)
+        self.spline = interpolate.CubicHermiteSpline(self.x, self.cumulative, self.density)
+        super().__init__()
+
+    def _sampler(self, seed):
+        np.random.seed(seed)
+        return self.ppf(np.random.random_sample())
+
+    def _batch_sampler(self, seed, n):
+        return self.ppf(np.random.default_rng(seed).random(n))
+
+    def pdf(self, x):
+        return np.interp(x, self.x, self.density, left=0, right=0)[()]
+
+    def cdf(self, x, *args, **kwargs):
+        x = np.asarray(x, dtype=float)
+        inside = np.clip(self.spline(np.clip(x, self.x[0], self.x[-1])), 0, 1)
+        return np.where(x < self.x[0], 0., np.where(x > self.x[-1], 1., inside))[()]
+
+    def ppf(self, q):
+        return np.interp(q, self.cumulative, self.x)[()]
+
+    def mean(self, **kwargs):
+        return np.trapz(self.x * self.density, self.x)
+
+    def variance(self, *args, **kwargs):
+        return np.trapz((self.x - self.mean()) ** 2 * self.density, self.x)
+
+    def __str__(self):
+        return 'Tabulated({} points on [{}, {}])'.format(len(self.x), self.x[0], self.x[-1])
+
+
+def density(rv, tol=1e-8, max_points=2 ** 22):
+    """
+    Returns the distribution of a linear combination of independent continuous random variables.
+
+    `rv` may be built from independent distributions implementing their
+    characteristic functions `cf` (such as `Normal`, `Gamma`, `Exp`, `Unif`,
+    `Laplace` and `Logistic`) and constants by addition, subtraction, negation,
+    and multiplication and division by constants. The characteristic function of
+    `rv` is inverted by the FFT on a grid covering all but `tol` of its mass
+    (determined from the quantiles of the terms), refined until the
+    characteristic function is at most `tol` at the largest frequency resolved
+    by the grid, or until the grid has `max_points` points.
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> Z = pr.density(pr.Gamma(2, 1) - 3 * pr.Laplace() + pr.Unif(0, 4))
+    >>> Z.cdf(0)
+
+    :param rv: RandomVariable
+    :param tol: float, optional
+    :param max_points: int, optional
+    :return: Tabulated
+    :raises ValueError: If `rv` is not a linear combination of independent random variables
+        implementing `cf`.
+    """
+    terms = {}
+    shift = _linear(rv, 0, 1, terms)
+    terms = [(node, coef) for (node, coef) in terms.values() if coef != 0]
+    if not terms:
+        raise ValueError('{} is constant'.format(rv))
+
+    def cf(t):
+        out = np.exp(1j * shift * t)
+        for (node, coef) in terms:
+            out = out * node.cf(coef * t)
+        return out
+
+    # The union bound gives an interval holding all but `tol` of the mass
+    lo, hi = shift, shift
+    for (node, coef) in terms:
+        q = tol / (2 * len(terms))
+        ends = coef * node.ppf(q), coef * (node.isf(q) if hasattr(node, 'isf') else node.ppf(1 - q))
+        lo, hi = lo + min(ends), hi + max(ends)
+
+    n = 2 ** 10
+    while True:
+        dx = (hi - lo) / n
+        t = (np.arange(n) - n // 2) * (2 * np.pi / (n * dx))
+        phi = cf(t)
+        if np.abs(phi[0]) <= tol:
+            break
+        elif 2 * n > max_points:
+            warnings.warn('Failed to resolve the characteristic function within {} points.'.format(n),
+                          ConvergenceWarning)
+            break
+        n *= 2
+
+    # f(lo + k dx) is (dt / 2 pi) (-1)^k times the FFT of phi(t_j) exp(-i t_j lo), and
+    # integrating each term from lo gives F(lo + k dx) likewise
+    x = lo + dx * np.arange(n)
+    dt = t[1] - t[0]
+    signs = np.where(np.arange(n) % 2 == 0, 1, -1)
+    g = phi * np.exp(-1j * t * lo)
+    pdf = np.real(np.fft.fft(g)) * signs * dt / (2 * np.pi)
+
+    g[n // 2] = 0
+    g[n // 2 + 1:] /= -1j * t[n // 2 + 1:]
+    g[:n // 2] /= -1j * t[:n // 2]
+    cdf = (np.real(np.fft.fft(g) * signs - np.sum(g)) + x - lo) * dt / (2 * np.pi)
+    return Tabulated(x, pdf, cdf)
+
+
+def _linear(node, offset, coef, terms):
+    # Adds `coef` times `node` to the linear combination `terms` (by node and seed)
+    # and returns its constant part
+    offset = (offset + node._offset) % node._max_seed
+
+    if isinstance(node, Constant) and np.ndim(node.value) == 0:
+        return coef * node.value
+    elif isinstance(node, Ufunc) and node.method == '__call__' and not node.kwargs:
+        ufunc, parents = node.ufunc, node.parents
+        if ufunc is np.add:
+            return sum(_linear(p, offset, coef, terms) for p in parents)
+        elif ufunc is np.subtract:
+            return _linear(parents[0], offset, coef, terms) + _linear(parents[1], offset, -coef, terms)
+        elif ufunc in (np.negative, np.positive):
+            return _linear(parents[0], offset, -coef if ufunc is np.negative else coef, terms)
+        elif ufunc is np.multiply and _scalar(parents[0]):
+            return _linear(parents[1], offset, coef * parents[0].value, terms)
+        elif ufunc is np.multiply and _scalar(parents[1]):
+            return _linear(parents[0], offset, coef * parents[1].value, terms)
+        elif ufunc is np.true_divide and _scalar(parents[1]):
+            return _linear(parents[0], offset, coef / parents[1].value, terms)
+        raise ValueError('{} of random variables is not linear'.format(ufunc.__name__))
+    elif node.op is None and hasattr(node, 'cf') and node._shape() == ():
+        terms.setdefault((id(node), offset), [node, 0])[1] += coef
+        return 0
+    raise ValueError('{} does not implement a characteristic function'.format(node))
+
+
+def _scalar(node):
+    return isinstance(node, Constant) and np.ndim(node.value) == 0
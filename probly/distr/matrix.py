@@ -1,6 +1,7 @@
 import numpy as np
 
-from probly.lib.utils import array
+from probly.core.random_variables import _leading, _shifted
+from probly.lib.utils import iid
 from probly.distr import Normal, Distribution
 
 
@@ -20,19 +21,39 @@ class Wigner(Distribution):
         a standard normal random variable.
     """
 
+    __slots__ = ('dim', 'rv', 'entries')
+
     def __init__(self, dim, rv=None):
         self.dim = dim
         if rv is None:
             self.rv = Normal()
         else:
             self.rv = rv
-        arr = [[self.rv.copy() for _ in range(dim)] for _ in range(dim)]
-        self.arr = array([[arr[i][j] if i <= j else arr[j][i] for i in range(dim)] for j in range(dim)])
+        # Only the upper triangle of the entries is used
+        self.entries = iid(self.rv, (dim, dim))
 
         super().__init__()
 
     def _sampler(self, seed):
-        return self.arr(seed)
+        return _symmetrize(self.entries(seed))
+
+    def _batch_sampler(self, seed, n):
+        return _symmetrize(self.entries._batch(seed, n, {}))
+
+    def _dependencies(self):
+        return (self.entries,)
+
+    def _shape(self):
+        return (self.dim, self.dim)
+
+    def _take(self, key):
+        # Entries below the diagonal are those above it
+        if not _leading(key, 2):
+            return None
+        rows = np.broadcast_to(np.arange(self.dim)[:, None], (self.dim, self.dim))[key]
+        cols = np.broadcast_to(np.arange(self.dim), (self.dim, self.dim))[key]
+        entries = self.entries[np.minimum(rows, cols), np.maximum(rows, cols)]
+        return _shifted(entries, self._offset)
 
     def __str__(self):
         return 'Wigner({}, {})'.format(self.dim, self.rv)
@@ -62,6 +83,8 @@ class Wishart(Distribution):
         The ratio `m / n`.
     """
 
+    __slots__ = ('m', 'n', 'lambda_', 'rv', 'rect')
+
     def __init__(self, m, n, rv=None):
         self.m = m
         self.n = n
@@ -70,12 +93,30 @@ class Wishart(Distribution):
             self.rv = Normal()
         else:
             self.rv = rv
-        rect = np.array([[self.rv.copy() for _ in range(n)] for _ in range(m)])
-        self.arr = array(np.dot(rect.T, rect))
+        self.rect = iid(self.rv, (m, n))
         super().__init__()
 
     def _sampler(self, seed):
-        return self.arr(seed)
+        return _gram(self.rect(seed))
+
+    def _batch_sampler(self, seed, n):
+        return _gram(self.rect._batch(seed, n, {}))
+
+    def _dependencies(self):
+        return (self.rect,)
+
+    def _shape(self):
+        return (self.n, self.n)
 
     def __str__(self):
         return 'Wishart({}, {}, {})'.format(self.m, self.n, self.rv)
+
+
+# Both helpers act on the last two axes, so they apply to batches of matrices too
+
+def _symmetrize(a):
+    return np.triu(a) + np.swapaxes(np.triu(a, 1), -1, -2)
+
+
+def _gram(a):
+    return np.swapaxes(a, -1, -2) @ a
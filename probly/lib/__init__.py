@@ -1,5 +1,7 @@
-from .utils import iid, const, hist, lift, array
-from .properties import mean, variance, cdf
+from .utils import iid, iid_sum, const, hist, lift, array, footprint
+from .properties import mean, variance, cdf, quantile, kde, summarize
+from .streaming import Reducer, Sum, Moments, MinMax, Histogram, ECDF, Quantiles, reduce
 
-__all__ = ['iid', 'const', 'hist', 'lift', 'array']
-__all__ += ['mean', 'variance', 'cdf']
+__all__ = ['iid', 'iid_sum', 'const', 'hist', 'lift', 'array', 'footprint']
+__all__ += ['mean', 'variance', 'cdf', 'quantile', 'kde', 'summarize']
+__all__ += ['Reducer', 'Sum', 'Moments', 'MinMax', 'Histogram', 'ECDF', 'Quantiles', 'reduce']
@@ -1,3 +1,11 @@
+import warnings
+
+import numpy as np
+
+from .._exceptions import ConvergenceWarning
+from .streaming import ECDF, Moments, Quantiles, _check_probabilities, _quantile_samples
+
+
 def mean(rv, max_iter=int(1e5), tol=1e-5):
     """
     Returns the mean of `rv`.
@@ -36,3 +44,153 @@ def cdf(rv, x, *args, **kwargs):
     :return: float
     """
     return rv.cdf(x, *args, **kwargs)
+
+
+def quantile(rv, q, *args, **kwargs):
+    """
+    Returns quantiles of `rv`.
+
+    In general estimated from a bounded-memory sketch of samples of `rv` (see
+    `RandomVariable.quantile`), but computed exactly for distributions with a
+    known quantile function.
+
+    :param rv: RandomVariable
+    :param q: float or array_like
+        Probabilities in `(0, 1)`.
+    :return: float or numpy.ndarray
+    """
+    return rv.quantile(q, *args, **kwargs)
+
+
+def kde(rv, grid, *args, **kwargs):
+    """
+    Returns a kernel density estimate of the density of `rv` on a grid.
+
+    See `RandomVariable.kde`.
+
+    :param rv: RandomVariable
+    :param grid: array_like
+        Equally spaced, increasing points.
+    :return: numpy.ndarray
+    """
+    return rv.kde(grid, *args, **kwargs)
+
+
+def summarize(rv, stats, tol=1e-3, rel_err=0.01, max_samples=10 ** 8, chunk_size=2 ** 16, seed=None):
+    """
+    Estimates several statistics of `rv` from a single stream of samples.
+
+    The statistics are planned together: each chunk of samples is fed to at most
+    one accumulator of each kind (moments, an empirical distribution function at
+    all requested points, and a quantile sketch), and sampling stops as soon as
+    every estimate meets its error target (with probability about 95%). Moments
+    and values of the distribution function are estimated within `tol`, and
+    quantiles within a relative rank error of `rel_err` (see `RandomVariable.quantile`).
+
+    Statistics are specified by the names `'mean'`, `'variance'`, `'std'`,
+    `'skewness'` and `'kurtosis'`, and by pairs `('cdf', x)` and `('quantile', q)`
+    where `x` is a scalar and `q` a probability in `(0, 1)`.
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> X = pr.Normal() * pr.Exp()
+    >>> pr.summarize(X, ['mean', 'variance', ('cdf', 0.5), ('quantile', 0.9)], tol=1e-3)
+
+    :param rv: RandomVariable
+    :param stats: list
+        The statistics to estimate.
+    :param tol: float, optional
+        The absolute error target of moments and of values of the distribution function.
+    :param rel_err: float, optional
+        The relative rank error target of quantiles.
+    :param max_samples: int, optional
+        The number of samples after which to stop even if targets are not met.
+    :param chunk_size: int, optional
+        The number of samples held in memory at once.
+    :param seed: int, optional
+    :return: dict
+        The estimates, keyed by the elements of `stats`.
+    :raises ValueError: If a statistic is not recognized or its argument is not a scalar.
+    """
+    plan = [_parse(stat) for stat in stats]
+    points = [arg for (name, arg) in plan if name == 'cdf']
+    probs = [arg for (name, arg) in plan if name == 'quantile']
+
+    moments = Moments() if any(name in _moments for (name, _) in plan) else None
+    ecdf = ECDF(points) if points else None
+    sketch = Quantiles(rel_err / 2) if probs else None
+    reducers = [r for r in (moments, ecdf, sketch) if r is not None]
+
+    # The rank error of quantiles depends only on the number of samples
+    min_samples = 0
+    if probs:
+        min_samples = min(max_samples, _quantile_samples(probs, rel_err))
+
+    count = 0
+    for chunk in rv.stream(chunk_size, seed):
+        for reducer in reducers:
+            reducer.update(chunk)
+        count += len(chunk)
+        if count >= min_samples and _error(plan, moments, ecdf) <= tol:
+            break
+        elif count >= max_samples:
+            warnings.warn('Failed to meet error targets within {} samples.'.format(count), ConvergenceWarning)
+            break
+
+    results = {}
+    for (stat, (name, arg)) in zip(stats, plan):
+        if name == 'cdf':
+            results[stat] = ecdf.result()[points.index(arg)]
+        elif name == 'quantile':
+            results[stat] = sketch.quantile(arg)
+        elif name == 'std':
+            results[stat] = np.sqrt(moments.variance)
+        else:
+            results[stat] = getattr(moments, name)
+    return results
+
+
+# Statistics estimated from central moments
+_moments = ('mean', 'variance', 'std', 'skewness', 'kurtosis')
+
+
+def _parse(stat):
+    # Returns the name and argument of a statistic
+    if isinstance(stat, str) and stat in _moments:
+        return stat, None
+    elif isinstance(stat, tuple) and len(stat) == 2 and stat[0] in ('cdf', 'quantile'):
+        # Statistics key the results, so their arguments must be hashable
+        if np.ndim(stat[1]) != 0 or not np.isscalar(stat[1]):
+            raise ValueError('The argument of {!r} must be a scalar'.format(stat[0]))
+        if stat[0] == 'quantile':
+            _check_probabilities(stat[1])
+        return stat
+    raise ValueError('Unknown statistic {!r}'.format(stat))
+
+
+def _error(plan, moments, ecdf):
+    # The largest half-width of approximate 95% confidence intervals of the estimates
+    # of moments and of the distribution function
+    errors = [0]
+    if moments is not None:
+        n = moments.count
+        variance = moments.variance
+        # The variance of the sample variance is (m4 - variance^2) / n
+        variance_error = np.sqrt(np.maximum(moments.m4 / n - variance ** 2, 0) / n)
+        for (name, _) in plan:
+            if name == 'mean':
+                errors.append(np.sqrt(variance / n))
+            elif name == 'variance':
+                errors.append(variance_error)
+            elif name == 'std':
+                errors.append(variance_error / (2 * np.sqrt(variance)) if np.all(variance > 0) else 0)
+            elif name == 'skewness':
+                errors.append(np.sqrt(6 / n))
+            elif name == 'kurtosis':
+                errors.append(np.sqrt(24 / n))
+    if ecdf is not None:
+        # Smoothed, so that estimates of 0 or 1 are not taken to be exact
+        p = (ecdf.counts + 1) / (ecdf.count + 2)
+        errors.append(np.sqrt(p * (1 - p) / ecdf.count))
+    return 2 * max(np.max(e) for e in errors)
@@ -0,0 +1,349 @@
+"""
+Reducers that summarize streams of samples in constant memory.
+
+Reducers consume the chunks yielded by `RandomVariable.stream` one at a time.
+Reducers of the same type that have consumed different parts of a stream (for
+instance, in different processes) can be merged.
+"""
+
+import itertools
+
+import numpy as np
+import scipy.special as special
+
+
+class Reducer:
+    """
+    The base class for streaming reducers.
+
+    Subclassing
+    -----------
+    A subclass should implement `update(self, chunk)`, which incorporates a
+    chunk of samples (stacked along the first axis), `merge(self, other)`,
+    which incorporates the state of another reducer of the same type, and
+    `result(self)`.
+    """
+
+    def update(self, chunk):
+        raise NotImplementedError("update not defined")
+
+    def merge(self, other):
+        raise NotImplementedError("merge not defined")
+
+    def result(self):
+        raise NotImplementedError("result not defined")
+
+
+class Sum(Reducer):
+    """
+    Computes the sum of a stream of samples.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+
+    def update(self, chunk):
+        self.count += len(chunk)
+        self.total = self.total + np.sum(chunk, axis=0)
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.total = self.total + other.total
+        return self
+
+    def result(self):
+        return self.total
+
+
+class Moments(Reducer):
+    """
+    Computes the mean, variance, skewness and (excess) kurtosis of a stream of samples.
+
+    Central moments of chunks are combined using the pairwise update formulas of
+    Chan et al. and Pébay, which avoid the cancellation incurred by accumulating
+    raw power sums.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+        self.m3 = 0.
+        self.m4 = 0.
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk, dtype=float)
+        other = Moments()
+        other.count = len(chunk)
+        other.mean = np.mean(chunk, axis=0)
+        dev = chunk - other.mean
+        other.m2 = np.sum(dev ** 2, axis=0)
+        other.m3 = np.sum(dev ** 3, axis=0)
+        other.m4 = np.sum(dev ** 4, axis=0)
+        return self.merge(other)
+
+    def merge(self, other):
+        na, nb = self.count, other.count
+        n = na + nb
+        if nb == 0:
+            return self
+
+        delta = other.mean - self.mean
+        m2 = self.m2 + other.m2 + delta ** 2 * na * nb / n
+        m3 = (self.m3 + other.m3 + delta ** 3 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+        m4 = (self.m4 + other.m4 + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+              + 6 * delta ** 2 * (na ** 2 * other.m2 + nb ** 2 * self.m2) / n ** 2
+              + 4 * delta * (na * other.m3 - nb * self.m3) / n)
+
+        self.count = n
+        self.mean = self.mean + delta * nb / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        return self
+
+    @property
+    def variance(self):
+        """The (biased) sample variance."""
+        return self.m2 / self.count
+
+    @property
+    def skewness(self):
+        return np.sqrt(self.count) * self.m3 / self.m2 ** 1.5
+
+    @property
+    def kurtosis(self):
+        return self.count * self.m4 / self.m2 ** 2 - 3
+
+    def result(self):
+        return self.mean, self.variance, self.skewness, self.kurtosis
+
+
+class MinMax(Reducer):
+    """
+    Computes the minimum and maximum of a stream of samples.
+    """
+
+    def __init__(self):
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, chunk):
+        self.min = np.minimum(self.min, np.min(chunk, axis=0))
+        self.max = np.maximum(self.max, np.max(chunk, axis=0))
+        return self
+
+    def merge(self, other):
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        return self
+
+    def result(self):
+        return self.min, self.max
+
+
+class Histogram(Reducer):
+    """
+    Computes a histogram of a stream of samples over fixed bins.
+
+    Parameters
+    ----------
+    bins : int or sequence
+        The bin edges, or the number of bins if `range` is specified.
+    range : tuple of floats, optional
+        The lower and upper edges of the bins.
+    density : bool, optional
+        If True, the result is normalized to form a probability density.
+    """
+
+    def __init__(self, bins, range=None, density=False):
+        if np.ndim(bins) == 0:
+            if range is None:
+                raise ValueError('range must be specified with a number of bins')
+            bins = np.linspace(range[0], range[1], bins + 1)
+        self.edges = np.asarray(bins, dtype=float)
+        self.density = density
+        self.count = 0
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+
+    def update(self, chunk):
+        self.count += np.size(chunk)
+        self.counts += np.histogram(chunk, self.edges)[0]
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.counts += other.counts
+        return self
+
+    def result(self):
+        if self.density:
+            return self.counts / (np.sum(self.counts) * np.diff(self.edges)), self.edges
+        return self.counts, self.edges
+
+
+class ECDF(Reducer):
+    """
+    Computes the empirical distribution function of a stream of samples at fixed points.
+
+    Parameters
+    ----------
+    points : array_like
+        The points at which to evaluate the distribution function.
+    """
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float)
+        self.count = 0
+        self.counts = 0
+
+    def update(self, chunk):
+        chunk = np.asarray(chunk)
+        points = self.points.reshape(self.points.shape + (1,) * chunk.ndim)
+        self.count += len(chunk)
+        self.counts = self.counts + np.sum(chunk <= points, axis=self.points.ndim)
+        return self
+
+    def merge(self, other):
+        self.count += other.count
+        self.counts = self.counts + other.counts
+        return self
+
+    def result(self):
+        """The proportion of samples at most each point (along the leading axes)."""
+        return self.counts / self.count
+
+
+class Quantiles(Reducer):
+    """
+    A mergeable sketch of the quantiles of a stream of samples.
+
+    The sketch is a t-digest: samples are summarized by weighted centroids, which
+    are merged wherever the resulting centroid would span ranks `[r, r (1 + rel_err)]`
+    or less, counting ranks from the nearer end of the distribution. Tail quantiles
+    are therefore estimated with small relative error in rank, and a stream of `n`
+    samples is summarized by `O(log(n) / rel_err)` centroids.
+
+    Entries of array-valued samples are pooled.
+
+    Example
+    -------
+    Estimate the median and the 99.9th percentile of a stream in bounded memory.
+
+    >>> import probly as pr
+    >>> X = pr.Normal() ** 2
+    >>> sketch = pr.reduce(X.stream(10 ** 6), pr.Quantiles(), chunks=100)
+    >>> sketch.quantile([0.5, 0.999])
+
+    Parameters
+    ----------
+    rel_err : float, optional
+        The relative rank resolution.
+    """
+
+    def __init__(self, rel_err=0.01):
+        self.rel_err = rel_err
+        self.count = 0
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, chunk):
+        chunk = np.ravel(chunk).astype(float)
+        if not len(chunk):
+            return self
+        self.min = min(self.min, np.min(chunk))
+        self.max = max(self.max, np.max(chunk))
+        return self._compress(chunk, np.ones(len(chunk)))
+
+    def merge(self, other):
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self._compress(other.means, other.weights)
+
+    def _compress(self, means, weights):
+        means = np.concatenate([self.means, means])
+        weights = np.concatenate([self.weights, weights])
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        # Centroids whose mid-ranks fall in the same bin are merged, where bins
+        # are of equal width on the logistic scale
+        self.count = np.sum(weights)
+        mid = (np.cumsum(weights) - weights / 2) / self.count
+        bins = np.floor(special.logit(mid) / np.log1p(self.rel_err))
+        starts = np.flatnonzero(np.diff(bins, prepend=np.nan))
+
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(weights * means, starts) / self.weights
+        return self
+
+    def quantile(self, q):
+        """
+        Estimates quantiles.
+
+        :param q: float or array_like
+            Probabilities in `[0, 1]`.
+        """
+        if not self.count:
+            raise ValueError('no samples')
+        # Interpolates between the mid-ranks of centroids and the extremes
+        ranks = np.concatenate([[0], np.cumsum(self.weights) - self.weights / 2, [self.count]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(np.multiply(q, self.count), ranks, values)[()]
+
+    def cdf(self, x):
+        """
+        Estimates the cumulative distribution function.
+
+        :param x: float or array_like
+        """
+        if not self.count:
+            raise ValueError('no samples')
+        ranks = np.concatenate([[0], np.cumsum(self.weights) - self.weights / 2, [self.count]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return (np.interp(x, values, ranks) / self.count)[()]
+
+    def result(self):
+        return self.means, self.weights
+
+
+def _check_probabilities(q):
+    if not np.all((np.asarray(q) > 0) & (np.asarray(q) < 1)):
+        raise ValueError('Probabilities of quantiles must be in (0, 1), got {}'.format(q))
+
+
+def _quantile_samples(q, rel_err):
+    # The number of samples for which the ranks of estimates of the quantiles `q`
+    # are within a relative error of `rel_err` (with probability about 95%)
+    _check_probabilities(q)
+    tail = np.min(np.minimum(q, np.subtract(1, q)))
+    return int(np.ceil(4 * (1 - tail) / (rel_err ** 2 * tail)))
+
+
+def reduce(stream, *reducers, chunks=None):
+    """
+    Feeds the chunks of a stream of samples to reducers.
+
+    Example
+    -------
+    Compute the mean, variance and range of 10^8 samples in constant memory.
+
+    >>> import probly as pr
+    >>> X = pr.Normal() ** 2
+    >>> moments, extremes = pr.reduce(X.stream(10 ** 6), pr.Moments(), pr.MinMax(), chunks=100)
+    >>> moments.mean, moments.variance, extremes.result()
+
+    :param stream: iterable
+        Chunks of samples, as yielded by `RandomVariable.stream`.
+    :param reducers: Reducer
+    :param chunks: int, optional
+        The number of chunks to consume. Default is to consume the entire stream.
+    :return: The reducers, if more than one is passed, or else the reducer.
+    """
+    for chunk in itertools.islice(stream, chunks):
+        for reducer in reducers:
+            reducer.update(chunk)
+    return reducers if len(reducers) != 1 else reducers[0]
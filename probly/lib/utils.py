@@ -1,10 +1,12 @@
+import sys
+from collections import Counter
 from functools import partial, wraps
 
 import matplotlib.pyplot as plt
 import numpy as np
 
 from probly.core.random_variables import RandomVariable
-from ..core.random_variables import RandomVariable
+from ..core.random_variables import IID, Array, Constant, RandomVariable
 
 
 def const(c):
@@ -17,7 +19,7 @@ def const(c):
     if isinstance(c, RandomVariable):
         return c
     else:
-        return RandomVariable(c)
+        return Constant(c)
 
 
 def hist(rv, num_samples, bins=None, density=True):
@@ -77,8 +79,35 @@ def iid(rv, shape):
     :param shape: int or tuple of ints
     :return: RandomVariable
     """
-    arr = np.array([rv.copy() for _ in np.nditer(np.ndarray(shape))]).reshape(shape)
-    return array(arr)
+    shape = (shape,) if np.ndim(shape) == 0 else shape
+    key = RandomVariable._generator.integers(RandomVariable._max_seed)
+    return IID(rv, key, tuple(int(n) for n in shape))
+
+
+def iid_sum(rv, n):
+    """
+    Returns the sum of `n` independent copies of a random variable.
+
+    If the distribution of `rv` is closed under sums (as are the normal,
+    gamma, Poisson and binomial distributions), the sum is sampled from its
+    closed form. Otherwise, the copies are summed in chunks, in constant memory.
+
+    Unlike `np.sum(pr.iid(rv, n))`, the result does not depend on any particular
+    array of copies.
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> Z = pr.iid_sum(pr.Ber(), 10 ** 9)
+
+    :param rv: RandomVariable
+    :param n: int
+    :return: RandomVariable
+    """
+    closed_form = rv._sum(n)
+    if closed_form is None:
+        return np.sum(iid(rv, n))
+    return closed_form
 
 
 def array(arr):
@@ -89,8 +118,56 @@ def array(arr):
     :return: RandomVariable
     """
     arr = np.array(arr)
-    def op(*inputs):
-        return np.array(inputs).reshape(np.shape(arr))
-    rv = RandomVariable(op, *arr.flatten())
-    rv.shape_ = arr.shape
-    return rv
+    return Array(arr.shape, *(const(x) for x in arr.flatten()))
+
+
+def footprint(rv):
+    """
+    Reports the memory used by the computational graph of a random variable.
+
+    Each node and each distinct object it references (such as a parameter or an
+    array of offsets) is counted once, using `sys.getsizeof`. Objects shared
+    between graphs are included.
+
+    Example
+    -------
+    >>> import probly as pr
+    >>> pr.footprint(pr.iid(pr.Normal(), 10 ** 5))['bytes']
+
+    :param rv: RandomVariable
+    :return: dict
+        The number of nodes (`'nodes'`), the number of bytes (`'bytes'`) and the
+        number of nodes of each type (`'types'`).
+    """
+    nodes = {}
+    stack = [rv]
+    while stack:
+        node = stack.pop()
+        if id(node) not in nodes:
+            nodes[id(node)] = node
+            stack.extend(node._dependencies())
+
+    seen = set(nodes)
+    total = 0
+    for node in nodes.values():
+        total += sys.getsizeof(node)
+        for value in _attributes(node):
+            if id(value) not in seen:
+                seen.add(id(value))
+                total += sys.getsizeof(value)
+
+    types = Counter(type(node).__name__ for node in nodes.values())
+    return {'nodes': len(nodes), 'bytes': total, 'types': dict(types)}
+
+
+def _attributes(obj):
+    # Values of the slots and instance attributes of an object
+    names = set(getattr(obj, '__dict__', ()))
+    for cls in type(obj).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        names.update((slots,) if isinstance(slots, str) else slots)
+    names.discard('__dict__')
+    names.discard('__weakref__')
+    for name in names:
+        if hasattr(obj, name):
+            yield getattr(obj, name)
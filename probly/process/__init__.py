@@ -0,0 +1,9 @@
+from .processes import Process, HittingTime
+from .processes import RandomWalk, BrownianMotion
+from .processes import PoissonProcess, CompoundPoisson
+from .processes import OrnsteinUhlenbeck
+
+__all__ = ['Process', 'HittingTime']
+__all__ += ['RandomWalk', 'BrownianMotion']
+__all__ += ['PoissonProcess', 'CompoundPoisson']
+__all__ += ['OrnsteinUhlenbeck']
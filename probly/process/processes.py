@@ -0,0 +1,344 @@
+"""
+Stochastic processes in discrete time.
+
+A process is a random variable whose samples are paths, that is, arrays of its
+values at the increasing times `times`. A batch of `n` samples is an array of
+shape `(n, steps)` generated at once, rather than from `steps` copies of a
+random variable.
+"""
+
+import functools
+
+import numpy as np
+import scipy.signal as signal
+
+from ..core.random_variables import RandomVariable
+
+
+class Process(RandomVariable):
+    """
+    A stochastic process observed at the times `T / steps, 2 T / steps, ..., T`.
+
+    Samples are paths of `steps` values (the initial value `start` at time 0 is
+    not included).
+
+    Subclassing
+    -----------
+    Subclasses should call `super().__init__(steps, T, start)` in their
+    initializers and implement `_batch_sampler(self, seed, n)`, which produces
+    an array of `n` paths from a given integer seed.
+
+    Parameters
+    ----------
+    steps : int
+        The number of times at which the process is observed.
+    T : float, optional
+        The final time.
+    start : float, optional
+        The value of the process at time 0.
+
+    Attributes
+    ----------
+    times : numpy.ndarray
+        The times at which the process is observed.
+    """
+
+    __slots__ = ('steps', 'T', 'start', 'times')
+
+    def __init__(self, steps, T=1, start=0):
+        super().__init__()
+        self.steps = steps
+        self.T = T
+        self.start = start
+        self.times = T * np.arange(1, steps + 1) / steps
+        self.make_independent()
+
+    def _sampler(self, seed):
+        return self._batch_sampler(seed, 1)[0]
+
+    def _shape(self):
+        return (self.steps,)
+
+    def running_max(self):
+        """
+        Returns the running maximum of the process.
+
+        :return: RandomVariable
+            A random variable whose samples are the paths `max(X_1, ..., X_k)`.
+        """
+        return np.maximum.accumulate(self, axis=0)
+
+    def hitting_time(self, level):
+        """
+        Returns the first time at which the process reaches `level`.
+
+        The process reaches `level` when it is at least `level`, if `level` is
+        at least `start`, and when it is at most `level` otherwise. The hitting
+        time is infinite on paths that do not reach `level`.
+
+        :param level: float
+        :return: RandomVariable
+        """
+        return HittingTime(self, level)
+
+
+class HittingTime(RandomVariable):
+    """
+    The first time at which a process reaches a level.
+
+    :param process: Process
+    :param level: float
+    """
+
+    __slots__ = ('times', 'level', 'upward')
+
+    def __init__(self, process, level):
+        upward = bool(np.all(level >= np.asarray(process.start)))
+        super().__init__(functools.partial(_first, process.times, level, upward, axis=0), process)
+        self.times = process.times
+        self.level = level
+        self.upward = upward
+
+    def _batch_op(self, paths):
+        return _first(self.times, self.level, self.upward, paths, axis=1)
+
+    def _shape(self):
+        return self.parents[0]._shape()[1:]
+
+
+def _first(times, level, upward, paths, axis):
+    # The first of `times` at which `paths` reach `level` along `axis`
+    reached = paths >= level if upward else paths <= level
+    first = np.argmax(reached, axis=axis)
+    return np.where(np.any(reached, axis=axis), times[first], np.inf)[()]
+
+
+class RandomWalk(Process):
+    """
+    A random walk with independent steps distributed as `step`.
+
+    Parameters
+    ----------
+    step : RandomVariable
+        A random variable whose distribution the steps share.
+    steps : int
+        The number of steps.
+    start : float, optional
+        The initial position.
+    """
+
+    __slots__ = ('step',)
+
+    def __init__(self, step, steps, start=0):
+        self.step = step
+        super().__init__(steps, steps, start)
+
+    def _dependencies(self):
+        return (self.step,)
+
+    def _batch_sampler(self, seed, n):
+        # All steps of all paths are sampled as a single batch of the step
+        increments = self.step._batch(seed, n * self.steps, {})
+        increments = np.reshape(increments, (n, self.steps) + np.shape(increments)[1:])
+        return self.start + np.cumsum(increments, axis=1)
+
+    def _shape(self):
+        shape = self.step._shape()
+        return None if shape is None else (self.steps,) + tuple(shape)
+
+    def __str__(self):
+        return 'RandomWalk({}, {})'.format(self.step, self.steps)
+
+
+class BrownianMotion(Process):
+    """
+    A Brownian motion with drift `mu` and volatility `sigma`.
+
+    Paths are generated from independent normal increments and may be refined
+    by Brownian bridge interpolation (see `refine`).
+
+    Parameters
+    ----------
+    steps : int
+        The number of times at which the process is observed.
+    T : float, optional
+        The final time.
+    mu : float, optional
+        The drift.
+    sigma : float, optional
+        The volatility.
+    start : float, optional
+        The initial value.
+    """
+
+    __slots__ = ('mu', 'sigma', 'levels', 'coarse')
+
+    def __init__(self, steps, T=1, mu=0, sigma=1, start=0):
+        self.mu = mu
+        self.sigma = sigma
+        self.levels = 0
+        self.coarse = steps
+        super().__init__(steps, T, start)
+
+    def refine(self, levels=1):
+        """
+        Returns the process observed at `2 ** levels` times as many times.
+
+        The new times are the midpoints of the old ones, at which the values
+        are sampled from the Brownian bridge between the neighbouring values.
+        The refined process is sampled jointly with `self`, so that each path
+        of the refined process passes through the corresponding path of `self`.
+
+        Example
+        -------
+        >>> import probly as pr
+        >>> B = pr.BrownianMotion(4)
+        >>> fine = B.refine(2)
+        >>> fine[3::4].sample(5, seed=1) - B.sample(5, seed=1)
+
+        :param levels: int, optional
+        :return: BrownianMotion
+        """
+        refined = BrownianMotion(self.coarse, self.T, self.mu, self.sigma, self.start)
+        refined.levels = self.levels + levels
+        refined.steps = self.coarse * 2 ** refined.levels
+        refined.times = self.T * np.arange(1, refined.steps + 1) / refined.steps
+        refined._offset = self._offset
+        return refined
+
+    def _batch_sampler(self, seed, n):
+        dt = self.T / self.coarse
+        w = np.cumsum(np.sqrt(dt) * np.random.default_rng(seed).standard_normal((n, self.coarse)), axis=1)
+
+        # Each level halves the time step and draws from its own stream, so that
+        # coarser levels are unaffected by refinement
+        for level in range(1, self.levels + 1):
+            dt /= 2
+            left = np.concatenate([np.zeros((n, 1)), w[:, :-1]], axis=1)
+            noise = np.random.default_rng([seed, level]).standard_normal(w.shape)
+            mid = (left + w) / 2 + np.sqrt(dt / 2) * noise
+            w = np.stack([mid, w], axis=2).reshape(n, -1)
+        return self.start + self.mu * self.times + self.sigma * w
+
+    def __str__(self):
+        return 'BrownianMotion({}, {}, {}, {})'.format(self.steps, self.T, self.mu, self.sigma)
+
+
+class PoissonProcess(Process):
+    """
+    A Poisson process with rate `rate`.
+
+    Parameters
+    ----------
+    rate : float
+        The rate of arrivals.
+    steps : int
+        The number of times at which the process is observed.
+    T : float, optional
+        The final time.
+    """
+
+    __slots__ = ('rate',)
+
+    def __init__(self, rate, steps, T=1):
+        self.rate = rate
+        super().__init__(steps, T)
+
+    def _batch_sampler(self, seed, n):
+        counts = np.random.default_rng(seed).poisson(self.rate * self.T / self.steps, (n, self.steps))
+        return np.cumsum(counts, axis=1)
+
+    def __str__(self):
+        return 'PoissonProcess({}, {}, {})'.format(self.rate, self.steps, self.T)
+
+
+class CompoundPoisson(Process):
+    """
+    A compound Poisson process with rate `rate` and jumps distributed as `jump`.
+
+    Parameters
+    ----------
+    rate : float
+        The rate of jumps.
+    jump : RandomVariable
+        A scalar random variable whose distribution the jumps share.
+    steps : int
+        The number of times at which the process is observed.
+    T : float, optional
+        The final time.
+    start : float, optional
+        The initial value.
+    """
+
+    __slots__ = ('rate', 'jump')
+
+    def __init__(self, rate, jump, steps, T=1, start=0):
+        self.rate = rate
+        self.jump = jump
+        super().__init__(steps, T, start)
+
+    def _dependencies(self):
+        return (self.jump,)
+
+    def _batch_sampler(self, seed, n):
+        rng = np.random.default_rng(seed)
+        counts = rng.poisson(self.rate * self.T / self.steps, n * self.steps)
+        total = int(np.sum(counts))
+
+        # The jumps of all intervals of all paths are sampled as a single batch
+        # and summed by interval
+        increments = np.zeros(n * self.steps)
+        if total:
+            jumps = self.jump._batch(int(rng.integers(self._max_seed)), total, {})
+            increments = np.bincount(np.repeat(np.arange(n * self.steps), counts), jumps, n * self.steps)
+        return self.start + np.cumsum(increments.reshape(n, self.steps), axis=1)
+
+    def __str__(self):
+        return 'CompoundPoisson({}, {}, {}, {})'.format(self.rate, self.jump, self.steps, self.T)
+
+
+class OrnsteinUhlenbeck(Process):
+    """
+    An Ornstein-Uhlenbeck process.
+
+    The process solves `dX = theta (mu - X) dt + sigma dW` and is sampled
+    exactly at the times of observation.
+
+    Parameters
+    ----------
+    theta : float
+        The (positive) rate of mean reversion.
+    mu : float
+        The long-term mean.
+    sigma : float
+        The volatility.
+    steps : int
+        The number of times at which the process is observed.
+    T : float, optional
+        The final time.
+    start : float, optional
+        The initial value.
+    """
+
+    __slots__ = ('theta', 'mu', 'sigma')
+
+    def __init__(self, theta, mu, sigma, steps, T=1, start=0):
+        self.theta = theta
+        self.mu = mu
+        self.sigma = sigma
+        super().__init__(steps, T, start)
+
+    def _batch_sampler(self, seed, n):
+        dt = self.T / self.steps
+        decay = np.exp(-self.theta * dt)
+        scale = self.sigma * np.sqrt(-np.expm1(-2 * self.theta * dt) / (2 * self.theta))
+        noise = scale * np.random.default_rng(seed).standard_normal((n, self.steps))
+
+        # The deviations from the mean satisfy Y_k = decay Y_{k-1} + noise_k,
+        # which is a linear filter along the paths
+        initial = np.full((n, 1), decay * (self.start - self.mu))
+        deviations, _ = signal.lfilter([1], [1, -decay], noise, axis=1, zi=initial)
+        return self.mu + deviations
+
+    def __str__(self):
+        return 'OrnsteinUhlenbeck({}, {}, {}, {}, {})'.format(self.theta, self.mu, self.sigma, self.steps, self.T)
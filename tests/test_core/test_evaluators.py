@@ -0,0 +1,144 @@
+import os
+import tempfile
+import tracemalloc
+
+import numpy as np
+
+from unittest import TestCase
+
+import probly as pr
+
+
+class TestThreadedEvaluator(TestCase):
+    def setUp(self):
+        self.seed = 31
+        self.evaluator = pr.ThreadedEvaluator(max_workers=2)
+
+    def test_shared_dependencies(self):
+        X = pr.Normal()
+        Y = X + 1
+        Z = (Y * X + X).given(X > 0) + Y
+        self.assertEqual(self.evaluator(Z, self.seed), Z(self.seed))
+
+    def test_matrices(self):
+        Det = pr.lift(np.linalg.det)
+        X = Det(pr.Wigner(5)) - Det(pr.Wigner(5))
+        self.assertEqual(self.evaluator(X, self.seed), X(self.seed))
+
+    def test_swept_parameters(self):
+        Y = pr.Normal(mu=np.linspace(0, 1, 5))
+        np.testing.assert_array_equal(self.evaluator(Y, self.seed), Y(self.seed))
+        np.testing.assert_array_equal(self.evaluator(Y - 1, self.seed), Y(self.seed) - 1)
+
+
+class TestBatchEvaluator(TestCase):
+    def setUp(self):
+        self.seed = 31
+        self.evaluator = pr.BatchEvaluator()
+
+    def test_samples(self):
+        X = pr.Normal()
+        Y = X + 1
+        Z = (Y * X + X).given(X > 0) + Y ** 2 - (X > 1) + pr.Bin(3, 0.5)
+        np.testing.assert_array_equal(self.evaluator(Z, 100, self.seed), Z.sample(100, self.seed))
+
+        W = pr.Wigner(3)
+        V = W[0] + 2 * W[1] + np.linalg.det(W)
+        np.testing.assert_array_equal(self.evaluator(V, 100, self.seed), V.sample(100, self.seed))
+
+        # Integer results that do not fit the dtype of an input are not written into it
+        X = pr.RandInt(0, 5)
+        X.dtype = np.int8
+        np.testing.assert_array_equal(self.evaluator((X + 1) + 1000, 10, self.seed),
+                                      ((X + 1) + 1000).sample(10, self.seed))
+
+    def test_memory(self):
+        n = 10 ** 5
+        X = pr.Normal()
+        Y = X
+        for _ in range(20):
+            Y = (Y + 1) * 0.5
+        Y = Y - X
+
+        tracemalloc.start()
+        samples = self.evaluator(Y, n, self.seed)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        np.testing.assert_array_equal(samples, Y.sample(n, self.seed))
+        self.assertLess(peak, 5 * samples.nbytes)
+        self.assertEqual(self.evaluator.reused, 40)
+
+
+class TestCachedEvaluator(TestCase):
+    def setUp(self):
+        self.seed = 31
+        self.evaluator = pr.CachedEvaluator(seed=self.seed)
+
+    def test_reuse(self):
+        n = 1000
+        X = pr.Normal()
+        E = pr.Exp()
+        Y = np.sin(X) * E + X
+
+        np.testing.assert_array_equal(self.evaluator(Y, n), Y.sample(n, self.seed))
+        self.assertEqual(self.evaluator.computed, 5)
+        self.evaluator(Y, n)
+        self.assertEqual(self.evaluator.computed, 0)
+
+        # Changing E only recomputes E, the product and the sum
+        E.scale = 3
+        self.assertAlmostEqual(self.evaluator.mean(Y, n), Y.sample(n, self.seed).mean())
+        self.assertEqual(self.evaluator.computed, 3)
+
+        # Changes within the dependencies of distributions are detected
+        W = pr.RandomWalk(X, 10)
+        Z = W[-1] + 1
+        self.evaluator(Z, n)
+        X.mu = np.array(2.)
+        self.evaluator(Z, n)
+        self.assertEqual(self.evaluator.computed, 3)
+        X.mu[()] = 3.
+        np.testing.assert_array_equal(self.evaluator(Z, n), Z.sample(n, self.seed))
+
+        # Other sample sizes and seeds are computed anew
+        self.evaluator(Z, n, seed=1)
+        self.assertEqual(self.evaluator.computed, 4)
+        with self.assertRaises(ValueError):
+            self.evaluator(Z, n)[0] = 0
+
+
+class TestParallelSampler(TestCase):
+    def setUp(self):
+        self.seed = 31
+        self.sampler = pr.ParallelSampler(processes=2, chunk_size=100)
+
+    def test_samples(self):
+        X = pr.Normal() * pr.Exp() + pr.Wigner(2)[0, 1]
+        samples = self.sampler(X, 1050, self.seed)
+        self.assertIsInstance(samples, np.memmap)
+        expected = np.concatenate([X.sample(100, self.seed + k * 100) for k in range(11)])[:1050]
+        np.testing.assert_array_equal(samples, expected)
+
+        # Chunks are assigned seeds independently of the number of processes
+        np.testing.assert_array_equal(pr.ParallelSampler(3, chunk_size=100)(X, 1050, self.seed), expected)
+
+    def test_failure(self):
+        # Chunks sampled by workers fail, and the file backing the output is still removed
+        parent = os.getpid()
+        X = pr.lift(lambda x: x if os.getpid() == parent else 1 / 0)(pr.Normal())
+        with tempfile.TemporaryDirectory() as dir:
+            with self.assertRaises(ZeroDivisionError):
+                pr.ParallelSampler(processes=2, chunk_size=100, dir=dir)(X, 300, self.seed)
+            self.assertEqual(os.listdir(dir), [])
+
+    def test_out(self):
+        X = pr.Normal(np.zeros(2))
+        with tempfile.TemporaryDirectory() as dir:
+            out = np.memmap(os.path.join(dir, 'samples'), dtype=float, mode='w+', shape=(250, 2))
+            self.assertIs(self.sampler(X, 250, self.seed, out=out), out)
+            np.testing.assert_array_equal(out[200:], X.sample(100, self.seed + 200)[:50])
+
+            with self.assertRaises(ValueError):
+                self.sampler(X, 200, self.seed, out=out)
+            del out
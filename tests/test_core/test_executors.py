@@ -0,0 +1,63 @@
+import itertools
+
+import numpy as np
+
+from unittest import TestCase
+
+import probly as pr
+from probly.core.executors import Scheduler
+
+
+class TestExecutors(TestCase):
+    def setUp(self):
+        self.seed = 11
+        self.X = pr.Normal().given(pr.Normal() > 1) + pr.array([pr.Exp(), pr.Normal()])
+        self.samples = np.concatenate(list(itertools.islice(self.X.stream(100, self.seed), 11)))[:1050]
+
+    def check(self, executor):
+        with executor:
+            np.testing.assert_array_equal(executor.sample(self.X, 1050, self.seed, chunk_size=100), self.samples)
+
+            moments, extremes = executor.reduce(self.X, 1050, pr.Moments(), pr.MinMax(),
+                                                seed=self.seed, chunk_size=100)
+            np.testing.assert_allclose(moments.mean, np.mean(self.samples, axis=0))
+            np.testing.assert_allclose(moments.variance, np.var(self.samples, axis=0))
+            np.testing.assert_array_equal(extremes.max, np.max(self.samples, axis=0))
+            np.testing.assert_allclose(executor.mean(self.X, 1050, self.seed, chunk_size=100),
+                                       np.mean(self.samples, axis=0))
+
+            # Lambdas are shipped to workers, and errors are raised in the caller
+            Y = pr.lift(lambda x: x + 1)(pr.Normal())
+            np.testing.assert_array_equal(executor.sample(Y, 10, self.seed, chunk_size=5),
+                                          np.concatenate(list(itertools.islice(Y.stream(5, self.seed), 2))))
+            def fail(x):
+                raise ValueError('failed')
+
+            with self.assertRaises(ValueError):
+                executor.sample(pr.lift(fail)(pr.Normal()), 10, self.seed, chunk_size=4)
+
+    def test_in_process(self):
+        self.check(pr.InProcessExecutor())
+
+    def test_threads(self):
+        self.check(pr.ThreadExecutor(3))
+
+    def test_processes(self):
+        self.check(pr.ProcessExecutor(2))
+
+    def test_sockets(self):
+        self.check(pr.SocketExecutor.spawn(2))
+
+    def test_scheduler(self):
+        scheduler = Scheduler(10, 2)
+        self.assertEqual([scheduler.next(0) for _ in range(5)], [0, 1, 2, 3, 4])
+        self.assertEqual(scheduler.next(1), 5)
+
+        # An idle worker steals the later half of the remaining chunks of another
+        scheduler = Scheduler(10, 2)
+        scheduler.next(1)
+        self.assertEqual([scheduler.next(1) for _ in range(4)], [6, 7, 8, 9])
+        self.assertEqual(scheduler.next(1), 2)
+        self.assertEqual(scheduler.stolen, 3)
+        self.assertEqual([scheduler.next(0) for _ in range(4)], [0, 1, 4, 3])
+        self.assertIsNone(scheduler.next(1))
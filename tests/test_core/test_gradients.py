@@ -0,0 +1,29 @@
+import numpy as np
+
+from unittest import TestCase
+
+import probly as pr
+
+
+class TestGradients(TestCase):
+    def test_grad_mean(self):
+        X, Y = pr.Normal(1, 2), pr.Gamma(3, 2)
+        Z = X ** 2 + 3 * Y - pr.const(1)
+        grads = pr.grad_mean(Z, [(X, 'mu'), (X, 'cov'), (Y, 'shape'), (Y, 'scale')], 10 ** 5, seed=1)
+        np.testing.assert_allclose(grads, [2, 1, 6, 9], rtol=0.05)
+
+        # E[max(L, 0)] has derivative P(L > 0) with respect to the location
+        U, E, L = pr.Unif(1, 3), pr.Exp(2), pr.Laplace(1, 2)
+        W = np.exp(-U) * E + np.maximum(L, 0)
+        grads = pr.grad_mean(W, [(U, 'b'), (E, 'rate'), (L, 'loc')], 10 ** 5, seed=2)
+        mean_exp = (np.exp(-1) - np.exp(-3)) / 2
+        expected = [(np.exp(-3) / 2 - mean_exp / 2) / 2, -mean_exp / 4, 1 - np.exp(-0.5) / 2]
+        np.testing.assert_allclose(grads, expected, rtol=0.05)
+
+    def test_unsupported(self):
+        X = pr.Normal()
+        np.testing.assert_array_equal(pr.grad_mean(pr.Unif(), [(X, 'mu')], 10), [0])
+        with self.assertRaises(NotImplementedError):
+            pr.grad_mean(X, [(X, 'dim')], 10)
+        with self.assertRaises(NotImplementedError):
+            pr.grad_mean(X.given(X > 0), [(X, 'mu')], 10)
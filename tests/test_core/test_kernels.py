@@ -0,0 +1,62 @@
+import numpy as np
+
+from unittest import TestCase
+
+import probly as pr
+from probly.core import kernels
+
+
+class TestKernels(TestCase):
+    def setUp(self):
+        self.seed = 3
+        self.X = pr.Normal(1, 2)
+        self.Y = pr.Unif()
+
+    def run_kernel(self, kernel, n=20000):
+        # Runs the generated kernel as plain Python, since Numba may not be installed
+        return kernel._run(kernel.function, n, self.seed)
+
+    def test_arithmetic(self):
+        Z = self.X ** 2 + 2 * self.Y
+        kernel = pr.jit(Z)
+        self.assertEqual(kernel.inputs, [])
+        samples = self.run_kernel(kernel)
+        self.assertEqual(samples.dtype, np.float64)
+        self.assertAlmostEqual(np.mean(samples), 4, delta=0.1)
+
+    def test_discrete(self):
+        Z = pr.Pois(3) + 2 * pr.Bin(10, 0.3)
+        samples = self.run_kernel(pr.jit(Z))
+        self.assertEqual(samples.dtype, np.int64)
+        self.assertAlmostEqual(np.mean(samples), 9, delta=0.1)
+
+    def test_conditional(self):
+        Z = (self.X + self.Y).given(self.Y > 0.5)
+        kernel = pr.jit(Z)
+        self.assertIn('while True', kernel.source)
+        samples = self.run_kernel(kernel)
+        self.assertAlmostEqual(np.mean(samples), 1.75, delta=0.05)
+
+    def test_inputs(self):
+        # Nodes on which unsupported nodes depend are sampled outside the kernel
+        Z = pr.lift(np.sin)(self.X) + self.X + self.Y
+        kernel = pr.jit(Z)
+        self.assertEqual(len(kernel.inputs), 2)
+        samples = self.run_kernel(kernel, 10)
+        np.testing.assert_allclose(samples - Z.sample(10, self.seed), 0, atol=1)
+
+        copies = self.X + self.X.copy()
+        self.assertEqual(pr.jit(copies).source.count('np.random.normal'), 2)
+
+    def test_fallback(self):
+        numba = kernels.numba
+        kernels.numba = None
+        try:
+            Z = self.X + self.Y
+            kernel = pr.jit(Z)
+            self.assertEqual(kernel.backend, 'python')
+            np.testing.assert_array_equal(kernel.sample(10, self.seed), Z.sample(10, self.seed))
+        finally:
+            kernels.numba = numba
+
+        self.assertIsNone(pr.jit(pr.lift(np.sin)(self.X)).function)
@@ -18,3 +18,53 @@ class TestRandomArrays(TestCase):
         X = probly.lib.utils.iid(pr.const(10), 10)
         Y = np.sum(X)
         self.assertEqual(Y(), 100)
+
+    def test_array_function(self):
+        seed = 3
+        M = pr.iid(pr.Normal(), (3, 4))
+        v = pr.iid(pr.Normal(), 4)
+        m = M.sample(5, seed)
+
+        G = np.dot(np.transpose(M), M)
+        self.assertEqual(pr.footprint(G)['nodes'], 4)
+        np.testing.assert_allclose(G(seed), M(seed).T @ M(seed))
+        np.testing.assert_allclose(G.sample(5, seed), np.transpose(m, (0, 2, 1)) @ m)
+
+        Y = np.concatenate([M, np.linalg.det(G[:3, :3]) * M], axis=1)
+        self.assertEqual(Y(seed).shape, (3, 8))
+        self.assertEqual(Y.sample(5, seed).shape, (5, 3, 8))
+
+        np.testing.assert_allclose(np.dot(M, v).sample(5, seed), np.einsum('nij,nj->ni', m, v.sample(5, seed)))
+        np.testing.assert_allclose(np.mean(M, axis=0).sample(5, seed), np.mean(m, axis=1))
+        np.testing.assert_allclose(np.trace(G).sample(5, seed), np.sum(m ** 2, axis=(1, 2)))
+        self.assertEqual(np.shape(M), (3, 4))
+
+    def test_getitem_pushdown(self):
+        seed = 7
+        M = pr.iid(pr.Normal(), (4, 5))
+        W = pr.Wigner(5)
+        A = pr.array([[pr.Normal(), pr.Unif()], [pr.Exp(), pr.Normal()]])
+        cases = [(M, 0), (M, (1, 2)), (M, (slice(1, 3), [0, 2])), (np.exp(M) * M + 1, (2, 3)),
+                 (A, (1, 0)), (2 * A, 1), (W, (3, 1)), (W.copy(), (slice(None), 4))]
+        for (X, key) in cases:
+            Y = X[key]
+            self.assertNotIsInstance(Y, probly.core.random_variables.Index)
+            np.testing.assert_allclose(Y(seed), X(seed)[key])
+            batch_key = (slice(None),) + (key if isinstance(key, tuple) else (key,))
+            np.testing.assert_allclose(Y.sample(3, seed), X.sample(3, seed)[batch_key])
+
+        self.assertEqual(pr.footprint(pr.iid(pr.Normal(), 10 ** 6)[0])['nodes'], 1)
+
+    def test_reduction(self):
+        seed = 5
+        M = pr.iid(pr.Normal(), (30, 7))
+        m = M.sample(4, seed)
+        for f in (np.sum, np.mean, np.max, np.min):
+            R = f(M)
+            self.assertIsInstance(R, probly.core.random_variables.Reduction)
+            self.assertAlmostEqual(R(seed), f(M(seed)))
+            np.testing.assert_allclose(R.sample(4, seed), f(m, axis=(1, 2)))
+
+        C = np.count_nonzero(pr.iid(pr.Unif() < 0.5, 100))
+        self.assertTrue(0 <= C(seed) <= 100)
+        self.assertNotIsInstance(np.sum(M, axis=0), probly.core.random_variables.Reduction)
@@ -1,3 +1,5 @@
+import numpy as np
+
 from unittest import TestCase
 
 import probly as pr
@@ -33,3 +35,50 @@ class TestConditional(TestCase):
         y = x + 1
         Z = Y.given(X == x)
         self.assertEqual(Z(), y)
+
+
+class TestSample(TestCase):
+    def test_sample_arithmetic(self):
+        X = pr.Unif(0, 1)
+        Y = X + X
+        samples = Y.sample(100)
+        self.assertEqual(samples.shape, (100,))
+        self.assertTrue(((0 <= samples) & (samples <= 2)).all())
+
+    def test_sample_array(self):
+        X = pr.iid(pr.Normal(), (3, 2))
+        self.assertEqual(X.sample(10).shape, (10, 3, 2))
+        self.assertEqual(np.sum(X).sample(10).shape, (10,))
+        self.assertEqual(X[0].sample(10).shape, (10, 2))
+
+    def test_sample_conditional(self):
+        X = pr.Normal()
+        Y = pr.Unif()
+        Z = (X + Y).given(Y > 0.5)
+        self.assertEqual(Z.sample(100).shape, (100,))
+
+
+class TestKDE(TestCase):
+    def test_kde(self):
+        grid = np.linspace(-6, 8, 701)
+        f = pr.Normal(1, 4).kde(grid, seed=1)
+        expected = np.exp(-(grid - 1) ** 2 / 8) / np.sqrt(8 * np.pi)
+        np.testing.assert_allclose(f, expected, atol=0.005)
+        self.assertAlmostEqual(np.sum(f) * (grid[1] - grid[0]), 1, places=3)
+
+        # Coarse grids and small bandwidths conserve mass
+        grid = np.linspace(0.5, 3, 6)
+        np.testing.assert_allclose(pr.kde(pr.Exp(), grid, bandwidth=0.01, seed=2), np.exp(-grid), rtol=0.1)
+
+        with self.assertRaises(ValueError):
+            pr.Normal().kde([0, 1, 3])
+        with self.assertRaises(ValueError):
+            pr.Normal().kde([0])
+        with self.assertRaises(ValueError):
+            pr.Normal().kde(grid, bandwidth=0)
+
+        # Constant samples give a spike of unit mass rather than a bandwidth of zero
+        grid = np.linspace(-2, 4, 61)
+        f = pr.const(1.).kde(grid, num_samples=100)
+        self.assertTrue(np.all(np.isfinite(f)))
+        self.assertAlmostEqual(np.sum(f) * (grid[1] - grid[0]), 1)
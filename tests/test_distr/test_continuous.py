@@ -1,5 +1,6 @@
 import itertools
 import numpy as np
+import scipy.stats as stats
 
 from unittest import TestCase
 
@@ -16,3 +17,48 @@ class TestContinuous(TestDistributions):
         np.random.seed(self.seed(X))
         x = np.random.uniform(a, b)
         self.assertEqual(X(self.user_seed), x)
+
+    def test_truncated_normal(self):
+        a = 40
+        X = pr.Normal()
+        Y = X.given(X > a)
+        self.assertIsInstance(Y, pr.distr.distributions.Truncated)
+        self.assertGreaterEqual(Y(self.user_seed), a)
+        self.assertAlmostEqual(Y.mean(), 40.02497, places=5)
+
+    def test_truncated_exp(self):
+        rate = 2
+        a = 1
+        b = 3
+        X = pr.Exp(rate)
+        Y = X.given((X > a) & (X < b))
+        mean = a + 1 / rate - (b - a) * np.exp(-rate * (b - a)) / (1 - np.exp(-rate * (b - a)))
+        self.assertAlmostEqual(Y.mean(), mean)
+        self.assertEqual(Y.cdf(a), 0)
+        self.assertAlmostEqual(Y.cdf(b), 1)
+
+    def test_pdf_cdf_ppf(self):
+        x = np.linspace(-3, 6, 37)
+        q = np.linspace(0.01, 0.99, 21)
+        cases = [(pr.Gamma(2.5, 1.5), stats.gamma(2.5, scale=1.5)),
+                 (pr.Exp(2), stats.expon(scale=0.5)),
+                 (pr.Unif(-1, 2), stats.uniform(-1, 3)),
+                 (pr.Normal(1, 4), stats.norm(1, 2)),
+                 (pr.Beta(2, 3), stats.beta(2, 3)),
+                 (pr.F(5, 7), stats.f(5, 7)),
+                 (pr.StudentT(4), stats.t(4)),
+                 (pr.Laplace(1, 2), stats.laplace(1, 2)),
+                 (pr.Logistic(1, 2), stats.logistic(1, 2))]
+        for (X, distr) in cases:
+            np.testing.assert_allclose(X.pdf(x), distr.pdf(x), atol=1e-12)
+            np.testing.assert_allclose(X.logpdf(x), distr.logpdf(x))
+            np.testing.assert_allclose(X.cdf(x), distr.cdf(x), atol=1e-12)
+            np.testing.assert_allclose(X.sf(x), distr.sf(x), atol=1e-12)
+            np.testing.assert_allclose(X.ppf(q), distr.ppf(q))
+            np.testing.assert_allclose(X.isf(q), distr.isf(q))
+
+    def test_von_mises(self):
+        X = pr.VonMises(0, 2)
+        x = np.linspace(-3, 3, 13)
+        np.testing.assert_allclose(X.cdf(x), stats.vonmises(2).cdf(x))
+        self.assertEqual(X.mean(), 0)
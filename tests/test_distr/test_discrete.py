@@ -1,10 +1,12 @@
 import itertools
 import numpy as np
+import scipy.stats as stats
 
 from numpy.testing import assert_array_equal
 from unittest import TestCase
 
 import probly as pr
+from probly.distr import _tables
 
 from .test_distributions import TestDistributions
 
@@ -25,3 +27,73 @@ class TestDiscrete(TestDistributions):
         np.random.seed(self.seed(X))
         x = np.random.multinomial(n, pvals)
         assert_array_equal(X(self.user_seed), x)
+
+    def test_bin(self):
+        n = 20
+        p = 0.3
+        X = pr.Bin(n, p)
+        np.random.seed(self.seed(X))
+        x = stats.binom.ppf(np.random.random_sample(), n, p)
+        self.assertEqual(X(self.user_seed), x)
+
+    def test_pois(self):
+        rate = 4.5
+        X = pr.Pois(rate)
+        u = np.random.default_rng(self.seed(X)).random(1000)
+        assert_array_equal(X.sample(1000, self.user_seed), stats.poisson.ppf(u, rate))
+
+    def test_random_parameters(self):
+        # Parameters used only once are sampled without building guide tables
+        built = []
+        build = _tables.binomial_tables.build
+        _tables.binomial_tables.build = lambda *params: built.append(params) or build(*params)
+        try:
+            X = pr.Bin(10, pr.Unif())
+            samples = [X(seed) for seed in range(100)]
+        finally:
+            _tables.binomial_tables.build = build
+        self.assertEqual(built, [])
+        self.assertTrue(all(0 <= x <= 10 for x in samples))
+
+        # Reused parameters are sampled from a table, with the same results
+        X = pr.Bin(13, 0.37)
+        self.assertEqual([X(seed) for seed in range(100)], [X(seed) for seed in range(100)])
+        self.assertIn((13, 0.37), _tables.binomial_tables.tables)
+
+    def test_categorical(self):
+        pvals = [0.1, 0.2, 0.3, 0.4]
+        X = pr.Categorical(pvals, ['a', 'b', 'c', 'd'])
+        samples = X.sample(100000, self.user_seed)
+        freqs = [np.mean(samples == x) for x in 'abcd']
+        np.testing.assert_allclose(freqs, pvals, atol=0.01)
+        with self.assertRaises(ValueError):
+            pr.Categorical([0.5, 0.5], values=[[1, 2], [3, 4]])
+
+    def test_pmf_cdf(self):
+        x = np.arange(-2, 30)
+        cases = [(pr.Bin(20, 0.3), stats.binom(20, 0.3)),
+                 (pr.Pois(4.5), stats.poisson(4.5)),
+                 (pr.NegBin(3, 0.4), stats.nbinom(3, 0.4)),
+                 (pr.Geom(0.3), stats.geom(0.3)),
+                 (pr.HyperGeom(7, 12, 9), stats.hypergeom(19, 7, 9))]
+        for (X, distr) in cases:
+            np.testing.assert_allclose(X.pmf(x), distr.pmf(x))
+            np.testing.assert_allclose(X.logpmf(x), distr.logpmf(x))
+            np.testing.assert_allclose(X.cdf(x), distr.cdf(x))
+            np.testing.assert_allclose(X.sf(x), distr.sf(x))
+
+    def test_multinomial_cdf(self):
+        n = 6
+        pvals = [0.2, 0.3, 0.5]
+        X = pr.Multinomial(n, pvals)
+        x = [2, 2, 3]
+        counts = itertools.product(range(n + 1), repeat=len(pvals))
+        cdf = sum(X.pmf(c) for c in counts if all(np.less_equal(c, x)))
+        self.assertAlmostEqual(X.cdf(x), cdf)
+
+        # Many points, including counts above `n`, are evaluated at once
+        points = np.array(list(itertools.product(range(-1, n + 3), repeat=len(pvals))))
+        outcomes = [c for c in itertools.product(range(n + 1), repeat=len(pvals)) if sum(c) == n]
+        cdf = [sum(X.pmf(c) for c in outcomes if all(np.less_equal(c, p))) for p in points]
+        np.testing.assert_allclose(X.cdf(points.reshape(10, -1, 3)), np.reshape(cdf, (10, -1)), atol=1e-14)
+        self.assertAlmostEqual(X.pmf([1, 2, 3]), stats.multinomial(n, pvals).pmf([1, 2, 3]))
@@ -1,5 +1,6 @@
 import itertools
 import numpy as np
+import scipy.stats as stats
 
 from unittest import TestCase
 
@@ -28,5 +29,53 @@ class TestRandomDistributions(TestDistributions):
         np.random.seed(self.seed(U))
         u = np.random.uniform(p)
         np.random.seed(self.user_seed)
-        x = np.random.binomial(n, u)
+        x = stats.binom.ppf(np.random.random_sample(), n, u)
         self.assertEqual(X(self.user_seed), x)
+
+
+class TestDtypes(TestCase):
+    def tearDown(self):
+        pr.set_dtype(float=np.float64, int=np.int64)
+
+    def test_set_dtype(self):
+        pr.set_dtype(float=np.float32)
+        for X in (pr.Normal(1, 4), pr.Unif(-1, 2), pr.Exp(2), pr.Gamma(3, 2), pr.ChiSquared(3)):
+            x = X.sample(1000, 1)
+            self.assertEqual(x.dtype, np.float32)
+            self.assertTrue(np.all(np.isfinite(x)))
+        self.assertEqual((pr.Normal() + pr.Unif()).sample(10, 1).dtype, np.float32)
+        self.assertIsInstance(pr.Normal()(1), float)
+
+        pr.set_dtype(int='auto')
+        self.assertEqual(pr.Bin(100).sample(10, 1).dtype, np.int8)
+        self.assertEqual(pr.RandInt(0, 1000).sample(10, 1).dtype, np.int16)
+        self.assertEqual(pr.Pois(3).sample(10, 1).dtype, np.int64)
+
+    def test_attribute(self):
+        X = pr.Normal()
+        X.dtype = np.float32
+        self.assertEqual(X.sample(10, 1).dtype, np.float32)
+        self.assertEqual(pr.Normal().sample(10, 1).dtype, np.float64)
+        Y = pr.RandInt(0, 5)
+        Y.dtype = np.uint8
+        self.assertEqual(Y.sample(10, 1).dtype, np.uint8)
+
+
+class TestParameterSweeps(TestCase):
+    def test_broadcasting(self):
+        mu = np.linspace(0, 1, 5)
+        X = pr.Normal(mu)
+        x = X.sample(1000, 3)
+        self.assertEqual(x.shape, (1000, 5))
+        self.assertEqual(X(3).shape, (5,))
+        # Common random numbers: samples differ only by the shift of the mean
+        np.testing.assert_allclose(x - x[:, :1], np.broadcast_to(mu, x.shape), atol=1e-12)
+        self.assertEqual((2 * X + pr.Unif()).sample(10, 3).shape, (10, 5))
+
+        B = pr.Bin(np.array([[10], [20]]), np.array([0.2, 0.5, 0.8]))
+        b = B.sample(1000, 3)
+        self.assertEqual(b.shape, (1000, 2, 3))
+        self.assertTrue(np.all(np.diff(b, axis=2) >= 0))
+        np.testing.assert_allclose(b.mean(axis=0), [[2, 5, 8], [4, 10, 16]], rtol=0.1)
+        self.assertEqual(pr.Pois([1, 4]).sample(10, 3).shape, (10, 2))
+        self.assertEqual(pr.Normal().sample(10, 3).shape, (10,))
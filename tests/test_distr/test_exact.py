@@ -0,0 +1,63 @@
+import numpy as np
+import scipy.stats as stats
+
+from unittest import TestCase
+
+import probly as pr
+
+
+class TestExact(TestCase):
+    def test_sums(self):
+        S = pr.exact(np.sum(pr.iid(pr.Ber(0.3), 1000)))
+        k = np.arange(1001)
+        np.testing.assert_allclose(S.pmf(k), stats.binom.pmf(k, 1000, 0.3), atol=1e-14)
+
+        X, Y = pr.Pois(2), pr.Bin(5, 0.5)
+        Z = pr.exact(3 * X - Y + 1)
+        self.assertAlmostEqual(Z.mean(), 4.5, places=8)
+        self.assertAlmostEqual(Z.cdf(-4), stats.poisson.pmf(0, 2) * stats.binom.sf(4, 5, 0.5))
+        self.assertEqual(pr.exact(2 * X).pmf(3), 0)
+
+        D = pr.exact(np.sum(pr.array([pr.Ber(), pr.RandInt(0, 3)])))
+        np.testing.assert_allclose(D.pmf(np.arange(5)), [1 / 8, 1 / 4, 1 / 4, 1 / 4, 1 / 8])
+        self.assertAlmostEqual(pr.exact(np.mean(pr.iid(pr.RandInt(1, 6), 3))).mean(), 3.5)
+        self.assertEqual(Z.sample(10, 1).shape, (10,))
+
+    def test_enumeration(self):
+        X, Y = pr.RandInt(1, 6), pr.RandInt(1, 6)
+        self.assertAlmostEqual(pr.exact(X * Y).mean(), 12.25)
+        self.assertAlmostEqual(pr.exact(X + X).mean(), 7)
+        np.testing.assert_array_equal(pr.exact(X - X).support, [0])
+        self.assertAlmostEqual(pr.exact(np.maximum(X, Y) > 4).pmf(True), 1 - (4 / 6) ** 2)
+        self.assertAlmostEqual(pr.exact(X.given(X + Y > 9)).pmf(6), 0.5)
+
+        M = pr.Multinomial(4, [0.2, 0.3, 0.5])
+        self.assertAlmostEqual(pr.exact(M[0] * M[1]).mean(), 4 * 3 * 0.2 * 0.3)
+
+        # Partial sums are eliminated as they are built, so the table never has 2 ** 30 entries
+        S = pr.const(0)
+        for _ in range(30):
+            B = pr.Ber()
+            S = S + B * B
+        self.assertAlmostEqual(pr.exact(S, max_size=1000).mean(), 15)
+
+        # Reductions of copies are leaves of the enumeration, shared by equal reductions
+        A = pr.iid(pr.Ber(0.5), 2)
+        np.testing.assert_allclose(pr.exact(np.sum(A) * pr.Ber(0.5)).probs, [0.625, 0.25, 0.125])
+        np.testing.assert_allclose(pr.exact(np.sum(A) + np.sum(A)).probs, [0.25, 0.5, 0.25])
+
+    def test_unsupported(self):
+        with self.assertRaises(ValueError):
+            pr.exact(pr.Pois(2) + pr.Normal())
+        with self.assertRaisesRegex(ValueError, '1.05e\\+10 entries'):
+            pr.exact(np.prod(pr.array([pr.RandInt(0, 100) for _ in range(5)])))
+        # The dependence of a reduction of copies on their entries is not tracked
+        A = pr.iid(pr.Ber(0.5), 2)
+        with self.assertRaisesRegex(ValueError, 'entries'):
+            pr.exact(np.sum(A) + A[0])
+        with self.assertRaisesRegex(ValueError, 'entries'):
+            pr.exact(np.sum(A) + np.sum(A[:1]))
+        with self.assertRaisesRegex(ValueError, 'max_size = 500'):
+            pr.exact(np.sum(pr.iid(pr.Ber(0.3), 1000)), max_size=500)
+        with self.assertRaisesRegex(ValueError, 'max_size = 100'):
+            pr.exact(pr.Bin(60, 0.5) + pr.Bin(60, 0.5), max_size=100)
@@ -0,0 +1,35 @@
+import numpy as np
+import scipy.stats as stats
+
+from unittest import TestCase
+
+import probly as pr
+
+
+class TestDensity(TestCase):
+    def test_cf(self):
+        t = np.array([0, 0.5, 3])
+        for X in (pr.Gamma(2, 3), pr.Unif(1, 4), pr.Normal(1, 2), pr.Laplace(1, 2), pr.Logistic(1, 2)):
+            x = X.sample(10 ** 5, 1)
+            np.testing.assert_allclose(X.cf(t), np.mean(np.exp(1j * np.outer(x, t)), axis=0), atol=0.01)
+
+    def test_density(self):
+        x = np.array([-2, 0.1, 1, 3])
+        Z = pr.density(pr.Normal(1, 4) + 2 * pr.Normal())
+        np.testing.assert_allclose(Z.cdf(x), stats.norm.cdf(x, 1, np.sqrt(8)), atol=1e-9)
+        np.testing.assert_allclose(Z.pdf(x), stats.norm.pdf(x, 1, np.sqrt(8)), atol=1e-5)
+        self.assertAlmostEqual(Z.mean(), 1)
+
+        X = pr.Exp(1)
+        G = pr.density(X / 4 + X / 4 + pr.Exp(2) + pr.Exp(2) - 1)
+        np.testing.assert_allclose(G.cdf(x), stats.gamma.cdf(x + 1, 3, scale=0.5), atol=1e-9)
+
+        U = pr.density(pr.Unif() + pr.Unif())
+        np.testing.assert_allclose(U.cdf([0.5, 1, 1.7]), [0.125, 0.5, 1 - 0.3 ** 2 / 2], atol=1e-8)
+        self.assertEqual(U.sample(10, 1).shape, (10,))
+
+    def test_unsupported(self):
+        X = pr.Normal()
+        for rv in (X * X, X + pr.Bin(3), pr.const(1) + 0 * X):
+            with self.assertRaises(ValueError):
+                pr.density(rv)
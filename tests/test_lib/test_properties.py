@@ -0,0 +1,49 @@
+import warnings
+
+import numpy as np
+import scipy.stats as stats
+
+from unittest import TestCase
+
+import probly as pr
+from probly._exceptions import ConvergenceWarning
+
+
+class TestSummarize(TestCase):
+    def setUp(self):
+        self.seed = 7
+
+    def test_summarize(self):
+        X = pr.Gamma(2, 1)
+        queries = ['mean', 'variance', 'std', ('cdf', 1), ('cdf', 4), ('quantile', 0.5), ('quantile', 0.95)]
+        summary = pr.summarize(X, queries, tol=0.01, rel_err=0.05, seed=self.seed)
+        self.assertEqual(list(summary), queries)
+
+        self.assertAlmostEqual(summary['mean'], 2, delta=0.01)
+        self.assertAlmostEqual(summary['variance'], 2, delta=0.02)
+        self.assertAlmostEqual(summary['std'], np.sqrt(2), delta=0.01)
+        self.assertAlmostEqual(summary[('cdf', 1)], stats.gamma.cdf(1, 2), delta=0.01)
+        self.assertAlmostEqual(summary[('cdf', 4)], stats.gamma.cdf(4, 2), delta=0.01)
+        for q in (0.5, 0.95):
+            rank = stats.gamma.cdf(summary[('quantile', q)], 2)
+            self.assertAlmostEqual(rank, q, delta=0.05 * min(q, 1 - q))
+
+    def test_stopping(self):
+        # Constant random variables need a single chunk
+        summary = pr.summarize(pr.const(1), ['mean', 'variance'], chunk_size=100)
+        self.assertEqual(summary, {'mean': 1, 'variance': 0})
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            pr.summarize(pr.Normal(), ['mean'], tol=1e-6, max_samples=1000, chunk_size=100, seed=self.seed)
+        self.assertTrue(any(issubclass(w.category, ConvergenceWarning) for w in caught))
+
+        with self.assertRaises(ValueError):
+            pr.summarize(pr.Normal(), ['median'])
+        with self.assertRaises(ValueError):
+            pr.summarize(pr.Normal(), [('cdf', [0, 1])])
+        with self.assertRaises(ValueError):
+            pr.summarize(pr.Normal(), [('quantile', np.array(0.5))])
+        for q in (0, 1, -0.5):
+            with self.assertRaises(ValueError):
+                pr.summarize(pr.Normal(), [('quantile', q)])
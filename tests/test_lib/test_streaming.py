@@ -0,0 +1,67 @@
+import itertools
+import numpy as np
+import scipy.stats as stats
+
+from unittest import TestCase
+
+import probly as pr
+
+
+class TestStreaming(TestCase):
+    def setUp(self):
+        self.seed = 19
+        self.X = pr.Normal() ** 2
+        self.chunks = list(itertools.islice(self.X.stream(1000, self.seed), 5))
+        self.samples = np.concatenate(self.chunks)
+
+    def test_resume(self):
+        chunk = next(self.X.stream(1000, self.seed, start=3))
+        np.testing.assert_array_equal(chunk, self.chunks[3])
+
+    def test_reducers(self):
+        total, moments, extremes, histogram = pr.reduce(iter(self.chunks), pr.Sum(), pr.Moments(),
+                                                        pr.MinMax(), pr.Histogram(10, (0, 5)))
+        x = self.samples
+        self.assertAlmostEqual(total.result(), np.sum(x))
+        np.testing.assert_allclose(moments.result(), (np.mean(x), np.var(x), stats.skew(x), stats.kurtosis(x)))
+        self.assertEqual(extremes.result(), (np.min(x), np.max(x)))
+        np.testing.assert_array_equal(histogram.result()[0], np.histogram(x, 10, (0, 5))[0])
+
+    def test_ecdf(self):
+        points = [0.1, 1, 3]
+        first = pr.reduce(iter(self.chunks[:2]), pr.ECDF(points))
+        second = pr.reduce(iter(self.chunks[2:]), pr.ECDF(points))
+        expected = np.mean(self.samples <= np.array(points)[:, None], axis=1)
+        np.testing.assert_allclose(first.merge(second).result(), expected)
+
+    def test_merge(self):
+        first = pr.reduce(iter(self.chunks[:2]), pr.Moments())
+        second = pr.reduce(iter(self.chunks[2:]), pr.Moments())
+        whole = pr.reduce(iter(self.chunks), pr.Moments())
+        np.testing.assert_allclose(first.merge(second).result(), whole.result())
+
+    def test_quantiles(self):
+        q = np.array([0.001, 0.01, 0.5, 0.99, 0.999])
+        x = np.random.default_rng(self.seed).exponential(size=10 ** 6)
+        chunks = np.split(x, 20)
+
+        sketch = pr.reduce(iter(chunks), pr.Quantiles(0.01))
+        parts = [pr.reduce(iter(chunks[i::4]), pr.Quantiles(0.01)) for i in range(4)]
+        merged = parts[0]
+        for part in parts[1:]:
+            merged.merge(part)
+
+        for s in (sketch, merged):
+            self.assertEqual(s.count, len(x))
+            self.assertLess(len(s.means), 3000)
+            ranks = np.searchsorted(np.sort(x), s.quantile(q)) / len(x)
+            self.assertTrue(np.all(np.abs(ranks - q) <= 0.01 * np.minimum(q, 1 - q)))
+            self.assertAlmostEqual(s.cdf(s.quantile(0.3)), 0.3, places=3)
+
+    def test_rv_quantile(self):
+        median = self.X.quantile(0.5, num_samples=10 ** 5, seed=self.seed)
+        self.assertAlmostEqual(median, stats.chi2.ppf(0.5, 1), places=1)
+        self.assertEqual(pr.quantile(pr.Normal(), 0.5), 0)
+        for q in (0, 1, [0.5, 1.5]):
+            with self.assertRaises(ValueError):
+                self.X.quantile(q)
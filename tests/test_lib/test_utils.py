@@ -1,5 +1,7 @@
 from unittest import TestCase
 
+import numpy as np
+
 import probly as pr
 
 
@@ -18,3 +20,32 @@ class TestUtils(TestCase):
         X = f(self.C)
         x = f(self.c)
         self.assertEqual(X(), x)
+
+    def test_iid(self):
+        X = pr.iid(pr.Normal(), (3, 2))
+        copies = np.array(X)
+        self.assertEqual(copies.shape, (3, 2))
+        x = X(5)
+        for index in np.ndindex(3, 2):
+            self.assertEqual(x[index], copies[index](5))
+        self.assertNotEqual(x[0, 0], x[0, 1])
+
+    def test_footprint(self):
+        X = pr.iid(pr.Normal(), 1000)
+        report = pr.footprint(X)
+        self.assertEqual(report['nodes'], 2)
+        self.assertEqual(report['types'], {'IID': 1, 'Normal': 1})
+
+        Y = pr.array(np.array(X))
+        self.assertEqual(pr.footprint(Y)['nodes'], 1001)
+        self.assertLess(5 * report['bytes'], pr.footprint(Y)['bytes'])
+
+    def test_iid_sum(self):
+        Z = pr.iid_sum(pr.Ber(0.25), 10 ** 9)
+        self.assertIsInstance(Z, pr.Bin)
+        self.assertEqual(Z.n, 10 ** 9)
+        self.assertAlmostEqual(np.mean(Z.sample(100)) / 10 ** 9, 0.25, places=3)
+
+        self.assertIsInstance(pr.iid_sum(pr.Exp(2), 10), pr.Gamma)
+        self.assertEqual(pr.iid_sum(self.C, 10)(), 10 * self.c)
+        self.assertEqual(pr.iid_sum(pr.Unif(), 10).sample(5).shape, (5,))
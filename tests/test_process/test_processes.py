@@ -0,0 +1,58 @@
+import numpy as np
+
+from unittest import TestCase
+
+import probly as pr
+
+
+class TestProcesses(TestCase):
+    def test_random_walk(self):
+        W = pr.RandomWalk(pr.Normal(), 100, start=1)
+        paths = W.sample(10 ** 4, 1)
+        self.assertEqual(paths.shape, (10 ** 4, 100))
+        self.assertAlmostEqual(np.mean(paths[:, -1]), 1, delta=0.5)
+        self.assertAlmostEqual(np.var(paths[:, -1]) / 100, 1, delta=0.05)
+        np.testing.assert_array_equal(W.times, np.arange(1, 101))
+        self.assertEqual(W(1).shape, (100,))
+
+        self.assertEqual(pr.RandomWalk(pr.Normal(np.zeros(2)), 10).sample(5, 1).shape, (5, 10, 2))
+
+    def test_brownian_motion(self):
+        B = pr.BrownianMotion(4, T=2, mu=1, sigma=2, start=1)
+        fine = B.refine(2)
+        self.assertEqual(fine.steps, 16)
+        np.testing.assert_allclose(fine[3::4].sample(10, 1), B.sample(10, 1))
+
+        paths = fine.sample(10 ** 5, 2)
+        np.testing.assert_allclose(np.mean(paths, axis=0), 1 + fine.times, atol=0.05)
+        np.testing.assert_allclose(np.var(paths, axis=0), 4 * fine.times, rtol=0.02)
+        increments = np.diff(paths, axis=1)
+        self.assertAlmostEqual(np.corrcoef(increments[:, 2], increments[:, 3])[0, 1], 0, delta=0.02)
+
+    def test_poisson(self):
+        N = pr.PoissonProcess(3, 10, T=2).sample(10 ** 5, 1)
+        self.assertAlmostEqual(np.mean(N[:, 4]), 3, delta=0.05)
+        self.assertAlmostEqual(np.var(N[:, -1]), 6, delta=0.1)
+
+        C = pr.CompoundPoisson(3, pr.Exp(2), 10, T=2).sample(10 ** 5, 1)
+        self.assertAlmostEqual(np.mean(C[:, -1]), 3, delta=0.05)
+        self.assertAlmostEqual(np.var(C[:, -1]), 3, delta=0.1)
+
+    def test_ornstein_uhlenbeck(self):
+        X = pr.OrnsteinUhlenbeck(2, 1, 0.5, 50, T=3, start=-1).sample(10 ** 5, 1)
+        self.assertAlmostEqual(np.mean(X[:, -1]), 1 - 2 * np.exp(-6), delta=0.01)
+        self.assertAlmostEqual(np.var(X[:, -1]), (1 - np.exp(-12)) / 16, delta=0.002)
+
+    def test_functionals(self):
+        B = pr.BrownianMotion(1000)
+        M = B.running_max().sample(10, 1)
+        np.testing.assert_array_equal(M, np.maximum.accumulate(B.sample(10, 1), axis=1))
+
+        # By the reflection principle, P(tau_1 <= 1) = 2 P(B_1 >= 1)
+        tau = B.hitting_time(1).sample(10 ** 4, 1)
+        self.assertAlmostEqual(np.mean(tau <= 1), 0.3173, delta=0.02)
+        self.assertTrue(np.all((tau == np.inf) | np.isin(tau, B.times)))
+
+        tau = pr.RandomWalk(pr.Ber(0.5) - 1, 20, start=0).hitting_time(-3)
+        self.assertEqual(tau.sample(10, 1).shape, (10,))
+        self.assertTrue(np.all(tau.sample(10, 1) >= 3))